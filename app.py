@@ -1,34 +1,72 @@
 from threading import Timer
 import webbrowser
-from flask import Flask, render_template, request, redirect, url_for, flash, session, send_from_directory, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, session, send_file, jsonify, Response, abort, g, has_request_context
+from flask.sessions import SessionInterface, SessionMixin, session_json_serializer
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate, upgrade as upgrade_database
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects import postgresql, sqlite as sqlite_dialect
+import click
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
-from io import BytesIO
+from werkzeug.utils import secure_filename, safe_join
+from io import BytesIO, StringIO, TextIOWrapper
 import base64
+import http.cookiejar
+import urllib.error
+import urllib.parse
+import urllib.request
+import csv
+import binascii
+import hashlib
+import hmac
 import os
+import secrets
+import shutil
+import tempfile
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import re
 import random
 import string
 import json
+import gzip
+import heapq
+import mimetypes
+import queue
+import threading
+import time
+import math
+import sqlite3
 import logging
+from collections import OrderedDict, deque
+from functools import wraps
+from types import SimpleNamespace
 from logging.handlers import RotatingFileHandler
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+try:
+    import brotli  # Optional: br encoding for API responses and the asset build
+except ImportError:
+    brotli = None
 
 
 # Add after imports
 MAX_LOGIN_ATTEMPTS = 5
+MAX_LOGIN_ATTEMPTS_PER_IP = 50  # Across all emails, to slow credential stuffing
 LOGIN_TIMEOUT_MINUTES = 15
-login_attempts = {}  # Store failed attempts
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', os.urandom(24).hex())
-app.config['SESSION_TYPE'] = 'filesystem'
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
+app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=2)
+
+# Behind Render's proxy request.remote_addr is the proxy; trust one X-Forwarded-For hop there
+proxy_hops = int(os.environ.get('PROXY_FIX_X_FOR', '1' if os.environ.get('RENDER') == 'true' else '0'))
+if proxy_hops:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops)
 
 # Database configuration
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -69,11 +107,18 @@ if os.environ.get('FLASK_ENV') == 'production':
     app.logger.info('LearnSync startup')
 
 db = SQLAlchemy(app)
+def include_schema_object(obj, name, type_, reflected, compare_to):
+    """Keep autogenerate away from the search indexes, which have no model (FTS5 tables, GIN expressions)"""
+    return not (reflected and name and name.startswith(('search_', 'ix_search_')))
+
+migrate = Migrate(app, db, render_as_batch=True,  # Schema changes live in migrations/; run `flask db upgrade`
+                  include_object=include_schema_object)
 
 # Association Table for Student/Class Enrollment
 enrollments = db.Table('enrollments',
     db.Column('student_id', db.Integer, db.ForeignKey('student.id'), primary_key=True),
-    db.Column('class_id', db.Integer, db.ForeignKey('class.id'), primary_key=True)
+    db.Column('class_id', db.Integer, db.ForeignKey('class.id'), primary_key=True),
+    db.Column('updated_at', db.DateTime, default=datetime.utcnow, index=True)
 )
 
 
@@ -88,6 +133,7 @@ class Student(db.Model):
     course = db.Column(db.String(100))
     year_level = db.Column(db.String(50))
     user_type = db.Column(db.String(20), default='student')
+    avatar_url = db.Column(db.String(500), nullable=True)
     
     classes = db.relationship('Class', secondary=enrollments, lazy='subquery',
                               backref=db.backref('students', lazy=True))
@@ -105,6 +151,7 @@ class Professor(db.Model):
     professor_id = db.Column(db.String(50), unique=True)
     department = db.Column(db.String(100))
     user_type = db.Column(db.String(20), default='professor')
+    avatar_url = db.Column(db.String(500), nullable=True)
 
     classes = db.relationship('Class', backref='professor', lazy=True)
 
@@ -120,6 +167,7 @@ class Class(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     professor_id = db.Column(db.Integer, db.ForeignKey('professor.id'), nullable=False)
     archived = db.Column(db.Boolean, default=False)  # ADD THIS LINE
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     def __repr__(self):
         return f'<Class {self.name} ({self.code})>'
@@ -130,10 +178,19 @@ class Material(db.Model):
     class_id = db.Column(db.Integer, db.ForeignKey('class.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    date = db.Column(db.DateTime, default=datetime.utcnow)
+    date = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # Page sort key, so never null
     deadline = db.Column(db.DateTime, nullable=True)
     resource_link = db.Column(db.String(500), nullable=True)
-    files = db.Column(db.Text, nullable=True)  # Store as JSON string
+    reminders_sent = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Deadline reminder stages already fired
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    
+    attachments = db.relationship('Attachment', viewonly=True, order_by='Attachment.position',
+                                  primaryjoin="and_(Attachment.owner_type == 'material', foreign(Attachment.owner_id) == Material.id)")
+    
+    __table_args__ = (
+        db.Index('ix_material_class_id_date', 'class_id', 'date'),
+        db.Index('ix_material_deadline', 'deadline'),
+    )
     
     def __repr__(self):
         return f'<Material {self.title}>'
@@ -148,9 +205,19 @@ class Assignment(db.Model):
     due_date = db.Column(db.DateTime, nullable=False)
     points = db.Column(db.Integer, default=100)
     date_created = db.Column(db.DateTime, default=datetime.utcnow)
-    files = db.Column(db.Text, nullable=True)  # Store as JSON string
+    reminders_sent = db.Column(db.Integer, default=0, server_default='0', nullable=False)  # Deadline reminder stages already fired
+    closed_at = db.Column(db.DateTime, nullable=True)  # Set by the deadline scheduler once due_date passes
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     submissions = db.relationship('Submission', backref='assignment', lazy=True, cascade='all, delete-orphan')
+    attachments = db.relationship('Attachment', viewonly=True, order_by='Attachment.position',
+                                  primaryjoin="and_(Attachment.owner_type == 'assignment', foreign(Attachment.owner_id) == Assignment.id)")
+    
+    __table_args__ = (
+        db.Index('ix_assignment_class_id_due_date', 'class_id', 'due_date'),
+        # The scheduler's range read: still-open assignments by due date
+        db.Index('ix_assignment_closed_at_due_date', 'closed_at', 'due_date'),
+    )
     
     def __repr__(self):
         return f'<Assignment {self.title}>'
@@ -161,14 +228,181 @@ class Submission(db.Model):
     assignment_id = db.Column(db.Integer, db.ForeignKey('assignment.id'), nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
-    files = db.Column(db.Text, nullable=True)  # Store as JSON string
     date = db.Column(db.DateTime, default=datetime.utcnow)
     grade = db.Column(db.Float, nullable=True)
     feedback = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    
+    attachments = db.relationship('Attachment', viewonly=True, order_by='Attachment.position',
+                                  primaryjoin="and_(Attachment.owner_type == 'submission', foreign(Attachment.owner_id) == Submission.id)")
+    
+    __table_args__ = (
+        # One submission per student per assignment; also serves lookups by assignment_id alone
+        db.Index('uq_submission_assignment_student', 'assignment_id', 'student_id', unique=True),
+        db.Index('ix_submission_student_id', 'student_id'),
+        # Pages go by id: date moves on every resubmit, so a date cursor would skip or repeat rows
+        db.Index('ix_submission_assignment_id_id', 'assignment_id', 'id'),
+    )
     
     def __repr__(self):
         return f'<Submission {self.id}>'
 
+# Attachment Model - one row per file on a material, assignment or submission
+class Attachment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    owner_type = db.Column(db.String(20), nullable=False)  # material, assignment, submission
+    owner_id = db.Column(db.Integer, nullable=False)
+    class_id = db.Column(db.Integer, nullable=False, index=True)  # Denormalized for per-class storage totals
+    position = db.Column(db.Integer, default=0, nullable=False)
+    name = db.Column(db.String(255), nullable=True)
+    mime_type = db.Column(db.String(150), nullable=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    blob_sha256 = db.Column(db.String(64), nullable=True, index=True)  # Null for legacy /uploads/ and external links
+    url = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_attachment_owner', 'owner_type', 'owner_id', 'position'),
+    )
+
+    def to_file_ref(self):
+        """The {name, type, size, url} shape the dashboards already use"""
+        file_ref = {'name': self.name, 'type': self.mime_type, 'size': self.size, 'url': self.url}
+        if self.blob_sha256:
+            file_ref['file_id'] = self.blob_sha256
+        return file_ref
+
+    def __repr__(self):
+        return f'<Attachment {self.owner_type} {self.owner_id} {self.name}>'
+
+# Gradebook Models - per-class totals kept current as submissions and grades change
+class GradebookStudent(db.Model):
+    class_id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, primary_key=True)
+    submitted_count = db.Column(db.Integer, default=0, nullable=False)
+    graded_count = db.Column(db.Integer, default=0, nullable=False)
+    points_earned = db.Column(db.Float, default=0, nullable=False)
+    points_possible = db.Column(db.Float, default=0, nullable=False)  # Points of the graded assignments only
+
+    def __repr__(self):
+        return f'<GradebookStudent {self.class_id}/{self.student_id}>'
+
+class GradebookAssignment(db.Model):
+    assignment_id = db.Column(db.Integer, primary_key=True)
+    class_id = db.Column(db.Integer, nullable=False, index=True)
+    submitted_count = db.Column(db.Integer, default=0, nullable=False)
+    graded_count = db.Column(db.Integer, default=0, nullable=False)
+    grade_sum = db.Column(db.Float, default=0, nullable=False)
+
+    def __repr__(self):
+        return f'<GradebookAssignment {self.assignment_id}>'
+
+# Tombstone Model - remembers deletes so delta syncs can report them
+class Tombstone(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(20), nullable=False)  # class, material, assignment, submission, enrollment
+    entity_id = db.Column(db.Integer, nullable=False)
+    class_id = db.Column(db.Integer, nullable=True, index=True)
+    student_id = db.Column(db.Integer, nullable=True, index=True)
+    professor_id = db.Column(db.Integer, nullable=True, index=True)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<Tombstone {self.entity_type} {self.entity_id}>'
+
+# Notification Model - one row per recipient, written when the event happens
+class Notification(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    recipient_type = db.Column(db.String(20), nullable=False)  # student, professor
+    recipient_id = db.Column(db.Integer, nullable=False)
+    type = db.Column(db.String(20), nullable=False)  # assignment, material, deadline, grade
+    title = db.Column(db.String(255), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    class_id = db.Column(db.Integer, nullable=True)
+    assignment_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        # Every feed read is a range scan on (recipient, id > cursor)
+        db.Index('ix_notification_recipient', 'recipient_type', 'recipient_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f'<Notification {self.recipient_type}:{self.recipient_id} {self.type}>'
+
+# Notification Cursor Model - the highest notification id each user has read
+class NotificationCursor(db.Model):
+    recipient_type = db.Column(db.String(20), primary_key=True)
+    recipient_id = db.Column(db.Integer, primary_key=True)
+    last_read_id = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<NotificationCursor {self.recipient_type}:{self.recipient_id} {self.last_read_id}>'
+
+# Blob Model - one row per unique file content, keyed by SHA-256
+class Blob(db.Model):
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    content_type = db.Column(db.String(150), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Blob {self.sha256[:12]}>'
+
+# Upload Session Model - tracks an in-progress chunked upload so it can resume
+class UploadSession(db.Model):
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    owner_id = db.Column(db.Integer, nullable=False)
+    owner_type = db.Column(db.String(20), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    content_type = db.Column(db.String(150), nullable=True)
+    total_size = db.Column(db.BigInteger, nullable=False)
+    received = db.Column(db.BigInteger, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<UploadSession {self.id} {self.received}/{self.total_size}>'
+
+# Class Access Version Model - bumped whenever a user's owned or enrolled classes change,
+# so every worker's cached class-id sets for that user go stale at once
+class ClassAccessVersion(db.Model):
+    user_type = db.Column(db.String(20), primary_key=True)
+    user_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ClassAccessVersion {self.user_type} {self.user_id} v{self.version}>'
+
+# User Session Model - server-side session data, keyed by the SHA-256 of the cookie's random id
+class UserSession(db.Model):
+    id = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<UserSession {self.id[:12]}>'
+
+# Outbound Email Model - durable outbox drained by the background mail sender
+class OutboundEmail(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    sender = db.Column(db.String(150), nullable=False)
+    recipient = db.Column(db.String(150), nullable=False)
+    reply_to = db.Column(db.String(150), nullable=True)
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, sent, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    claim_token = db.Column(db.String(36), nullable=True, index=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<OutboundEmail {self.id} {self.status}>'
+
 # Password Reset Token model
 class PasswordResetToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -182,53 +416,100 @@ class PasswordResetToken(db.Model):
     def __repr__(self):
         return f'<PasswordResetToken {self.token}>' 
 
-# Database initialization with better error handling
-def cleanup_expired_tokens():
-    """Remove expired password reset tokens from database"""
-    try:
-        expired_tokens = PasswordResetToken.query.filter(
-            PasswordResetToken.expires_at < datetime.utcnow()
-        ).all()
-        
-        for token in expired_tokens:
-            db.session.delete(token)
-        
-        db.session.commit()
-        print(f"✓ Cleaned up {len(expired_tokens)} expired tokens")
-    except Exception as e:
-        db.session.rollback()
-        print(f"✗ Error cleaning up tokens: {e}")
-
 def generate_reset_token():
     """Generate a unique reset token"""
     return str(uuid.uuid4())
 
-# Database initialization with better error handling
-def init_db():
-    """Initialize database with all tables"""
-    try:
-        with app.app_context():
-            db.create_all()
-            cleanup_expired_tokens()  # ✅ Now this function is defined above
-            print("✓ Database initialized successfully!")
-    except Exception as e:
-        print(f"✗ Database initialization error: {e}")
-        raise
+def upsert_statement(model, values, index_elements, update_fields):
+    """INSERT ... ON CONFLICT DO UPDATE, so concurrent writers never race a read-then-write.
 
-# Initialize database only when app starts, not during imports
-def initialize_app():
-    with app.app_context():
-        try:
-            db.create_all()
-            cleanup_expired_tokens()
-            print("✅ Database initialized successfully!")
-        except Exception as e:
-            print(f"❌ Database initialization error: {e}")
-            raise
+    ``values`` is one row's dict or a list of them for a multi-row upsert.
+    """
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite_dialect
+    statement = dialect.insert(model).values(values)
+    return statement.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={field: statement.excluded[field] for field in update_fields}
+    )
 
-# Call initialization when the app starts
-with app.app_context():
-    initialize_app()
+def upsert_submission(assignment_id, student_id, **fields):
+    """Create or replace a student's submission; returns its id"""
+    fields['updated_at'] = datetime.utcnow()
+    statement = upsert_statement(
+        Submission,
+        dict(fields, assignment_id=assignment_id, student_id=student_id),
+        ['assignment_id', 'student_id'],
+        list(fields)
+    ).returning(Submission.id)
+    return db.session.execute(statement).scalar_one()
+
+def is_enrolled(student_id, class_id):
+    """Indexed EXISTS on the enrollments primary key; never loads the roster"""
+    return db.session.query(db.exists().where(
+        enrollments.c.student_id == student_id,
+        enrollments.c.class_id == class_id
+    )).scalar()
+
+def enrolled_classes(student_id):
+    """A student's classes straight from the enrollments table, without loading the Student"""
+    return Class.query.join(enrollments, enrollments.c.class_id == Class.id).filter(
+        enrollments.c.student_id == student_id
+    ).order_by(Class.id).all()
+
+def enroll_students(class_id, student_ids):
+    """Enroll many students in one multi-row INSERT that skips existing rows; returns the newly enrolled ids"""
+    if not student_ids:
+        return set()
+    now = datetime.utcnow()
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite_dialect
+    statement = dialect.insert(enrollments).values([
+        {'student_id': student_id, 'class_id': class_id, 'updated_at': now} for student_id in student_ids
+    ]).on_conflict_do_nothing(index_elements=['student_id', 'class_id']).returning(enrollments.c.student_id)
+    return set(db.session.execute(statement).scalars())
+
+def assignment_is_open(assignment, now=None):
+    """Submissions are accepted until the due date; closed_at records that the scheduler saw it pass"""
+    return assignment.closed_at is None and (now or datetime.utcnow()) <= assignment.due_date
+
+def unenroll_student(student_id, class_id):
+    """Delete one enrollment row; returns False if the student was not enrolled"""
+    result = db.session.execute(enrollments.delete().where(
+        enrollments.c.student_id == student_id,
+        enrollments.c.class_id == class_id
+    ))
+    return result.rowcount > 0
+
+class TTLCache:
+    """Small per-process cache whose entries expire after ``ttl`` seconds"""
+
+    def __init__(self, ttl, max_keys=10000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_or_compute(self, key, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        
+        value = compute()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
 
 
 # Configure upload folder
@@ -248,53 +529,415 @@ if not os.path.exists(UPLOAD_FOLDER):
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024  # ✅ Increased to 500MB for video files
 
+# ===============================
+# BLOB STORAGE
+# ===============================
+
+BLOB_CHUNK_SIZE = 1024 * 1024  # 1MB reads keep memory flat regardless of file size
+BLOB_CACHE_MAX_AGE = 365 * 24 * 60 * 60  # Content-addressed, so it never changes
+BLOB_URL_PREFIX = '/uploads/blobs/'
+SHA256_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+# Blob types come from the allowed file extension, never from the uploading client
+BLOB_CONTENT_TYPES = {ext: mimetypes.guess_type(f'file.{ext}')[0] or 'application/octet-stream'
+                      for ext in ALLOWED_EXTENSIONS}
+AVATAR_CONTENT_TYPES = {'image/png', 'image/jpeg', 'image/gif', 'image/webp'}
+INLINE_BLOB_TYPES = AVATAR_CONTENT_TYPES | {'application/pdf'}  # Everything else downloads
+
+def blob_content_type(filename):
+    """Stored type for an upload named ``filename``; unknown extensions are opaque bytes"""
+    extension = filename.rsplit('.', 1)[1].lower() if filename and '.' in filename else None
+    return BLOB_CONTENT_TYPES.get(extension, 'application/octet-stream')
+
+class FilesystemBlobBackend:
+    """Stores blobs on local disk behind the same calls the S3 client exposes"""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def local_path(self, key):
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put_object(self, Key, Body, ContentType=None):
+        path = self.local_path(Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        # Write next to the target and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                shutil.copyfileobj(Body, out, BLOB_CHUNK_SIZE)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def upload_file(self, Filename, Key, ContentType=None):
+        """Move a finished local file into place without reading it"""
+        path = self.local_path(Key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(Filename, path)
+
+    def get_object(self, Key):
+        path = self.local_path(Key)
+        return {'Body': open(path, 'rb'), 'ContentLength': os.path.getsize(path)}
+
+    def head_object(self, Key):
+        return {'ContentLength': os.path.getsize(self.local_path(Key))}
+
+    def delete_object(self, Key):
+        path = self.local_path(Key)
+        if os.path.exists(path):
+            os.remove(path)
+
+class S3BlobBackend:
+    """Stores blobs in an S3 bucket (AWS, MinIO or any S3-compatible endpoint)"""
+
+    def __init__(self, bucket, endpoint_url=None):
+        import boto3  # Optional dependency, only needed when BLOB_STORAGE=s3
+        self.bucket = bucket
+        self.client = boto3.client('s3', endpoint_url=endpoint_url)
+
+    def local_path(self, key):
+        return None
+
+    def put_object(self, Key, Body, ContentType=None):
+        extra_args = {'ContentType': ContentType} if ContentType else None
+        self.client.upload_fileobj(Body, self.bucket, Key, ExtraArgs=extra_args)
+
+    def upload_file(self, Filename, Key, ContentType=None):
+        extra_args = {'ContentType': ContentType} if ContentType else None
+        self.client.upload_file(Filename, self.bucket, Key, ExtraArgs=extra_args)
+
+    def get_object(self, Key):
+        return self.client.get_object(Bucket=self.bucket, Key=Key)
+
+    def head_object(self, Key):
+        return self.client.head_object(Bucket=self.bucket, Key=Key)
+
+    def delete_object(self, Key):
+        self.client.delete_object(Bucket=self.bucket, Key=Key)
+
+class BlobStore:
+    """Content-addressed storage: identical uploads are stored once"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def save(self, stream, content_type=None):
+        """Hash and spool ``stream`` in chunks, then store it unless the content already exists"""
+        hasher = hashlib.sha256()
+        size = 0
+        
+        with tempfile.TemporaryFile() as spool:
+            for chunk in iter(lambda: stream.read(BLOB_CHUNK_SIZE), b''):
+                hasher.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+            
+            digest = hasher.hexdigest()
+            blob = Blob.query.get(digest)
+            if blob:
+                return blob
+            
+            spool.seek(0)
+            self.backend.put_object(Key=digest, Body=spool, ContentType=content_type)
+        
+        return self._record(digest, size, content_type)
+
+    def save_file(self, path, digest, size, content_type=None):
+        """Store a file already on local disk whose SHA-256 is known; ``path`` is consumed"""
+        blob = Blob.query.get(digest)
+        if not blob:
+            self.backend.upload_file(Filename=path, Key=digest, ContentType=content_type)
+            blob = self._record(digest, size, content_type)
+        if os.path.exists(path):
+            os.remove(path)
+        return blob
+
+    def _record(self, digest, size, content_type):
+        """Add the Blob row in the caller's transaction; the caller commits.
+
+        ON CONFLICT DO NOTHING covers a concurrent upload of the same content
+        without a rollback that would discard the caller's pending rows.
+        """
+        dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite_dialect
+        db.session.execute(dialect.insert(Blob).values(
+            sha256=digest, size=size, content_type=content_type, created_at=datetime.utcnow()
+        ).on_conflict_do_nothing(index_elements=['sha256']))
+        return db.session.get(Blob, digest)
+
+    def url_for(self, blob):
+        return f"{BLOB_URL_PREFIX}{blob.sha256}"
+
+def create_blob_store():
+    if os.environ.get('BLOB_STORAGE') == 's3':
+        return BlobStore(S3BlobBackend(os.environ['S3_BUCKET'], os.environ.get('S3_ENDPOINT_URL')))
+    return BlobStore(FilesystemBlobBackend(os.path.join(UPLOAD_FOLDER, 'blobs')))
+
+blob_store = create_blob_store()
+
+def normalize_file_refs(files):
+    """Move inline base64 data URLs into the blob store so JSON columns only hold references"""
+    normalized = []
+    for file_ref in files or []:
+        url = file_ref.get('url') if isinstance(file_ref, dict) else None
+        if url and url.startswith('data:') and ';base64,' in url:
+            header, encoded = url.split(',', 1)
+            try:
+                blob = blob_store.save(BytesIO(base64.b64decode(encoded)), blob_content_type(file_ref.get('name')))
+            except (binascii.Error, ValueError):
+                normalized.append(file_ref)
+                continue
+            file_ref = dict(file_ref, url=blob_store.url_for(blob), file_id=blob.sha256, size=blob.size)
+        normalized.append(file_ref)
+    return normalized
+
+def blob_sha256_from_url(url):
+    sha256 = url[len(BLOB_URL_PREFIX):] if url and url.startswith(BLOB_URL_PREFIX) else None
+    return sha256 if sha256 and SHA256_PATTERN.match(sha256) else None
+
+def build_attachments(owner_type, owner_id, class_id, files):
+    """Attachment rows for a list of {name, type, size, url} file refs.
+
+    Size and type of blob-backed files come from their Blob row, not the
+    client, so storage totals and served types can't be spoofed.
+    """
+    refs = [file_ref for file_ref in normalize_file_refs(files)
+                 if isinstance(file_ref, dict) and file_ref.get('url')]
+    digests = {blob_sha256_from_url(file_ref['url']) for file_ref in refs} - {None}
+    blobs = {blob.sha256: blob for blob in Blob.query.filter(Blob.sha256.in_(digests))} if digests else {}
+    
+    attachments = []
+    for position, file_ref in enumerate(refs):
+        url = file_ref['url']
+        digest = blob_sha256_from_url(url)
+        if digest:
+            blob = blobs.get(digest)
+            size, mime_type = (blob.size, blob.content_type) if blob else (None, None)
+        else:
+            size = file_ref.get('size')
+            size = int(size) if isinstance(size, (int, float)) else None
+            mime_type = file_ref.get('type') or None
+        attachments.append(Attachment(
+            owner_type=owner_type,
+            owner_id=owner_id,
+            class_id=class_id,
+            position=position,
+            name=(file_ref.get('name') or url.rsplit('/', 1)[-1])[:255],
+            mime_type=mime_type,
+            size=size,
+            blob_sha256=digest,
+            url=url
+        ))
+    return attachments
+
+def replace_attachments(owner_type, owner_id, class_id, files):
+    """Swap an owner's attachments for ``files``; the caller commits"""
+    delete_attachments(owner_type, [owner_id])
+    attachments = build_attachments(owner_type, owner_id, class_id, files)
+    db.session.add_all(attachments)
+    return attachments
+
+def delete_attachments(owner_type, owner_ids):
+    if owner_ids:
+        Attachment.query.filter(
+            Attachment.owner_type == owner_type,
+            Attachment.owner_id.in_(owner_ids)
+        ).delete(synchronize_session=False)
+
+def file_refs(record):
+    """Serialized attachments of a material, assignment or submission"""
+    return [attachment.to_file_ref() for attachment in record.attachments]
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+# ===============================
+# STATIC ASSETS
+# ===============================
+
+STATIC_FOLDER = os.path.join(basedir, 'static')
+DIST_FOLDER = os.path.join(STATIC_FOLDER, 'dist')
+ASSET_MANIFEST_PATH = os.path.join(DIST_FOLDER, 'manifest.json')
+ASSET_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+ASSET_VERSION_LENGTH = 12
+
+# Largest CSS box (px) each image is shown in; `flask build-assets` encodes
+# WebP/AVIF variants at twice this size for high-DPI screens
+IMAGE_DISPLAY_SIZES = {
+    'images/LMS-logo.png': 45,
+    'images/UCC.png': 70,
+    'images/COE.png': 70,
+    'images/Asugas.jpg': 165,
+    'images/Regondola.jpg': 165,
+    'images/Ruperto.jpg': 165,
+    'images/Villacin.jpg': 165,
+    'images/Villanueva.jpg': 165,
+}
+
+# path -> ((mtime_ns, size), sha256); a file is only re-hashed when it changes on disk
+asset_hashes = {}
+
+def asset_hash(path):
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = asset_hashes.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    asset_hashes[path] = (signature, digest)
+    return digest
+
+# (mtime_ns, manifest) for static/dist/manifest.json; reloaded when a new build lands
+asset_manifest_cache = [None, {}]
+
+def asset_manifest():
+    try:
+        mtime = os.stat(ASSET_MANIFEST_PATH).st_mtime_ns
+    except OSError:
+        return {}
+    if asset_manifest_cache[0] != mtime:
+        with open(ASSET_MANIFEST_PATH) as f:
+            asset_manifest_cache[1] = json.load(f)
+        asset_manifest_cache[0] = mtime
+    return asset_manifest_cache[1]
+
+def asset_version(filename):
+    """Short content hash used in ?v= so a changed file gets a new URL"""
+    entry = asset_manifest().get(filename)
+    if entry:
+        return entry['version']
+    
+    path = safe_join(STATIC_FOLDER, filename)
+    if not path or not os.path.isfile(path):
+        return None
+    return asset_hash(path)[:ASSET_VERSION_LENGTH]
+
+def serve_asset(directory, filename, immutable=False):
+    """Send a file with a strong content ETag, Range support and 304s.
+
+    Files requested with a matching ?v=<hash> (or marked ``immutable``) are
+    cached for a year; anything else must revalidate, which costs a 304.
+    """
+    path = safe_join(directory, filename)
+    if not path or not os.path.isfile(path):
+        abort(404)
+    
+    digest = asset_hash(path)
+    versioned = immutable or request.args.get('v') == digest[:ASSET_VERSION_LENGTH]
+    
+    response = send_file(path, conditional=True, etag=digest,
+                         max_age=ASSET_CACHE_MAX_AGE if versioned else None)
+    response.accept_ranges = 'bytes'
+    response.cache_control.public = True
+    if versioned:
+        response.cache_control.immutable = True
+    return response
+
+@app.url_defaults
+def add_asset_version(endpoint, values):
+    # url_for('static', filename=...) emits content-hashed URLs in every template
+    if endpoint == 'static' and 'filename' in values and 'v' not in values:
+        # Byte-identical files share one canonical URL so browsers fetch them once
+        entry = asset_manifest().get(values['filename'])
+        if entry:
+            values['filename'] = entry.get('canonical', values['filename'])
+        
+        version = asset_version(values['filename'])
+        if version:
+            values['v'] = version
+
+def serve_built_asset(filename, entry):
+    """Send the build output for ``filename``, picking the smallest variant the client accepts"""
+    path = os.path.join(DIST_FOLDER, entry['file'])
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    representation = ''
+    vary = []
+    
+    if entry.get('variants'):
+        vary.append('Accept')
+        accept = request.headers.get('Accept', '')
+        for variant_type, variant_file in entry['variants']:
+            if variant_type in accept:
+                path = os.path.join(DIST_FOLDER, variant_file)
+                mimetype = variant_type
+                representation = variant_type.split('/')[1]
+                break
+    
+    content_encoding = None
+    if entry.get('encodings'):
+        vary.append('Accept-Encoding')
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if encoding in entry['encodings'] and request.accept_encodings[encoding]:
+                path += suffix
+                content_encoding = encoding
+                representation = encoding
+                break
+    
+    versioned = request.args.get('v') == entry['version']
+    etag = f"{entry['hash']}-{representation}" if representation else entry['hash']
+    response = send_file(path, mimetype=mimetype, conditional=True, etag=etag,
+                         max_age=ASSET_CACHE_MAX_AGE if versioned else None)
+    if content_encoding:
+        response.content_encoding = content_encoding
+    for header in vary:
+        response.vary.add(header)
+    response.accept_ranges = 'bytes'
+    response.cache_control.public = True
+    if versioned:
+        response.cache_control.immutable = True
+    return response
+
 # Static file routes
 @app.route('/css/<path:filename>')
 def serve_css(filename):
-    return send_from_directory(os.path.join(basedir, 'css'), filename)
+    return serve_asset(os.path.join(STATIC_FOLDER, 'css'), filename)
 
 @app.route('/js/<path:filename>')
 def serve_js(filename):
-    return send_from_directory(os.path.join(basedir, 'js'), filename)
+    return serve_asset(os.path.join(STATIC_FOLDER, 'js'), filename)
 
 @app.route('/images/<path:filename>')
 def serve_images(filename):
-    return send_from_directory(os.path.join(basedir, 'images'), filename)
+    return serve_asset(os.path.join(STATIC_FOLDER, 'images'), filename)
 
 @app.route('/professor-styles.css')
 def serve_professor_css():
-    return send_from_directory(basedir, 'professor-styles.css')
+    return serve_asset(os.path.join(STATIC_FOLDER, 'css'), 'professor-styles.css')
 
 @app.route('/professor-script.js')
 def serve_professor_js():
-    return send_from_directory(basedir, 'professor-script.js')
+    return serve_asset(os.path.join(STATIC_FOLDER, 'js'), 'professor-script.js')
 
 @app.route('/student-styles.css')
 def serve_student_css():
-    return send_from_directory(basedir, 'student-styles.css')
+    return serve_asset(os.path.join(STATIC_FOLDER, 'css'), 'student-styles.css')
 
 @app.route('/student-script.js')
 def serve_student_js():
-    return send_from_directory(basedir, 'student-script.js')
+    return serve_asset(os.path.join(STATIC_FOLDER, 'js'), 'student-script.js')
 
 @app.route('/login.css')
 def serve_login_css():
-    return send_from_directory(basedir, 'login.css')
+    return serve_asset(os.path.join(STATIC_FOLDER, 'css'), 'login.css')
 
 @app.route('/signup.css')
 def serve_signup_css():
-    return send_from_directory(basedir, 'signup.css')
+    return serve_asset(os.path.join(STATIC_FOLDER, 'css'), 'signup.css')
 
 @app.route('/styles.css')
 def serve_styles_css():
-    return send_from_directory(basedir, 'styles.css')
+    return serve_asset(os.path.join(STATIC_FOLDER, 'css'), 'styles.css')
 
 @app.route('/script.js')
 def serve_script_js():
-    return send_from_directory(basedir, 'script.js')
+    return serve_asset(os.path.join(STATIC_FOLDER, 'js'), 'script.js')
 
 # Error handlers
 @app.errorhandler(404)
@@ -328,11 +971,11 @@ def get_profile():
     if 'user_id' not in session:
         return {'error': 'Unauthorized'}, 401
     
-    user_type = session.get('user_type')
-    user_id = session.get('user_id')
+    user = current_user()
+    if not user:
+        return {'error': 'User not found'}, 404
     
-    if user_type == 'student':
-        user = Student.query.get(user_id)
+    if user.user_type == 'student':
         return {
             'id': user.id,
             'student_id': user.student_id,
@@ -344,7 +987,6 @@ def get_profile():
             'user_type': 'student'
         }
     else:
-        user = Professor.query.get(user_id)
         return {
             'id': user.id,
             'professor_id': user.professor_id,
@@ -515,18 +1157,523 @@ def validate_email(email):
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
     return re.match(pattern, email) is not None
 
+# ===============================
+# LOGIN THROTTLING
+# ===============================
+# Sliding-window counters: each key keeps the count for the current fixed
+# window and the one before it, and the estimate weights the previous count
+# by how much of it still overlaps the sliding window. Every check is O(1)
+# and every key is a few numbers, whichever backend holds them.
+
+LOGIN_WINDOW_SECONDS = LOGIN_TIMEOUT_MINUTES * 60
+
+def roll_window(state, index):
+    """Advance a stored (index, current, previous) triple to window ``index``"""
+    if state is None:
+        return (index, 0, 0)
+    stored_index, current, previous = state
+    if stored_index == index:
+        return state
+    if stored_index == index - 1:
+        return (index, 0, current)
+    return (index, 0, 0)
+
+class MemoryThrottleBackend:
+    """Per-process LRU map with a hard key limit, so bursts cannot grow memory without bound"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._counters = OrderedDict()
+
+    def _update(self, key, window, increment):
+        index = int(time.time() // window)
+        with self._lock:
+            state = roll_window(self._counters.get(key), index)
+            if increment:
+                state = (state[0], state[1] + increment, state[2])
+            if state[1] or state[2]:
+                self._counters[key] = state
+                self._counters.move_to_end(key)
+                while len(self._counters) > self.max_keys:
+                    self._counters.popitem(last=False)
+            else:
+                self._counters.pop(key, None)
+            return state
+
+    def hit(self, key, window):
+        return self._update(key, window, 1)
+
+    def get(self, key, window):
+        return self._update(key, window, 0)
+
+    def reset(self, key):
+        with self._lock:
+            self._counters.pop(key, None)
+
+class SQLiteThrottleBackend:
+    """Counters in a shared SQLite file, so every worker on the host enforces the same lockouts"""
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+        with self._connect() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS throttle ('
+                         'key TEXT PRIMARY KEY, window_index INTEGER, current INTEGER, previous INTEGER)')
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _update(self, key, window, increment):
+        index = int(time.time() // window)
+        conn = self._connect()
+        
+        if not increment:
+            row = conn.execute('SELECT window_index, current, previous FROM throttle WHERE key = ?', (key,)).fetchone()
+            return roll_window(tuple(row) if row else None, index)
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT window_index, current, previous FROM throttle WHERE key = ?', (key,)).fetchone()
+            state = roll_window(tuple(row) if row else None, index)
+            state = (state[0], state[1] + increment, state[2])
+            conn.execute('INSERT OR REPLACE INTO throttle (key, window_index, current, previous) VALUES (?, ?, ?, ?)',
+                         (key, state[0], state[1], state[2]))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        
+        self._hits += 1
+        if self._hits % self.PRUNE_EVERY == 0:
+            # Anything older than the previous window no longer affects an estimate
+            conn.execute('DELETE FROM throttle WHERE window_index < ?', (index - 1,))
+        return state
+
+    def hit(self, key, window):
+        return self._update(key, window, 1)
+
+    def get(self, key, window):
+        return self._update(key, window, 0)
+
+    def reset(self, key):
+        self._connect().execute('DELETE FROM throttle WHERE key = ?', (key,))
+
+class RedisThrottleBackend:
+    """Counters in any Redis-protocol server; one key per window that expires on its own"""
+
+    def __init__(self, url):
+        import redis  # Optional dependency, only needed for redis:// throttle URLs
+        self._client = redis.Redis.from_url(url)
+
+    def _read(self, key, window, increment):
+        index = int(time.time() // window)
+        current_key = f'throttle:{key}:{index}'
+        pipe = self._client.pipeline()
+        if increment:
+            pipe.incrby(current_key, increment)
+            pipe.expire(current_key, window * 2)
+        else:
+            pipe.get(current_key)
+        pipe.get(f'throttle:{key}:{index - 1}')
+        results = pipe.execute()
+        current = results[0]
+        previous = results[-1]
+        return (index, int(current or 0), int(previous or 0))
+
+    def hit(self, key, window):
+        return self._read(key, window, 1)
+
+    def get(self, key, window):
+        return self._read(key, window, 0)
+
+    def reset(self, key):
+        index = int(time.time() // LOGIN_WINDOW_SECONDS)
+        self._client.delete(f'throttle:{key}:{index}', f'throttle:{key}:{index - 1}')
+
+def create_throttle_backend():
+    url = os.environ.get('THROTTLE_BACKEND_URL', '')
+    if url.startswith('redis://') or url.startswith('rediss://'):
+        return RedisThrottleBackend(url)
+    if url.startswith('sqlite:///'):
+        return SQLiteThrottleBackend(url[len('sqlite:///'):])
+    return MemoryThrottleBackend()
+
+throttle_backend = create_throttle_backend()
+
+def throttle_estimate(state, window, now):
+    index, current, previous = state
+    elapsed = now - index * window
+    return previous * (1 - elapsed / window) + current
+
+def throttle_retry_after(state, limit, window, now):
+    """Seconds until the sliding estimate drops back under ``limit``"""
+    index, current, previous = state
+    window_start = index * window
+    if current >= limit:
+        # Wait for the next window, then for this window's weight to decay enough
+        return (window_start + window - now) + window * (1 - limit / current)
+    # Only the previous window keeps us over; it decays within this window
+    return max(0, window_start + window * (1 - (limit - current) / previous) - now)
+
+def login_throttle_keys(email):
+    return [
+        (f'login:email:{email}', MAX_LOGIN_ATTEMPTS),
+        (f'login:ip:{request.remote_addr}', MAX_LOGIN_ATTEMPTS_PER_IP),
+    ]
+
 def check_login_attempts(email):
-    """Check if user has exceeded login attempts"""
-    if email in login_attempts:
-        attempts, locked_until = login_attempts[email]
-        if locked_until and datetime.utcnow() < locked_until:
-            remaining = (locked_until - datetime.utcnow()).seconds // 60
+    """Check if this email or client IP has exceeded login attempts"""
+    now = time.time()
+    for key, limit in login_throttle_keys(email):
+        state = throttle_backend.get(key, LOGIN_WINDOW_SECONDS)
+        if throttle_estimate(state, LOGIN_WINDOW_SECONDS, now) >= limit:
+            retry_after = throttle_retry_after(state, limit, LOGIN_WINDOW_SECONDS, now)
+            remaining = max(1, math.ceil(retry_after / 60))
             return False, f"Account locked. Try again in {remaining} minutes."
-        elif locked_until and datetime.utcnow() >= locked_until:
-            # Reset after timeout
-            login_attempts[email] = [0, None]
     return True, ""
 
+def record_failed_login(email):
+    """Count a failed attempt; returns how many attempts this email has left"""
+    now = time.time()
+    attempts_left = MAX_LOGIN_ATTEMPTS
+    for key, limit in login_throttle_keys(email):
+        state = throttle_backend.hit(key, LOGIN_WINDOW_SECONDS)
+        if key.startswith('login:email:'):
+            attempts_left = limit - math.ceil(throttle_estimate(state, LOGIN_WINDOW_SECONDS, now))
+    return attempts_left
+
+def reset_login_attempts(email):
+    throttle_backend.reset(f'login:email:{email}')
+
+
+# ===============================
+# SESSIONS
+# ===============================
+# The session cookie carries only a random id; the data lives server-side
+# under the SHA-256 of that id, so a leaked session table holds no usable
+# cookies. Sessions load on first access, so requests that never touch
+# `session` (static files, built assets) cost no lookup, and a session is
+# written back only when it changes or its expiry is due to be extended.
+
+SESSION_TOUCH_SECONDS = 300  # Extend a live session's expiry at most this often
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}$')  # secrets.token_urlsafe(32)
+
+def session_key(sid):
+    return hashlib.sha256(sid.encode()).hexdigest()
+
+class ServerSession(SessionMixin):
+    """Session data fetched from the session backend the first time it is read or written"""
+
+    def __init__(self, backend, sid=None):
+        self.backend = backend
+        self.sid = sid
+        self.expires_at = None
+        self.modified = False
+        self.accessed = False
+        self.discarded_sid = None
+        self._data = None
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def _load(self):
+        self.accessed = True
+        if self._data is None:
+            record = self.backend.load(session_key(self.sid)) if self.sid else None
+            if record is None:
+                # Unknown or expired id: start empty, and let save_session drop the stale cookie
+                self.modified = self.sid is not None
+                self.sid = None
+                self._data = {}
+            else:
+                data, self.expires_at = record
+                self._data = session_json_serializer.loads(data)
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+        self.modified = True
+
+    def __delitem__(self, key):
+        del self._load()[key]
+        self.modified = True
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def regenerate(self):
+        """Move the data to a fresh id, so an id planted before login is worthless after it"""
+        self._load()
+        if self.sid:
+            self.discarded_sid = self.sid
+        self.sid = None
+        self.modified = True
+
+    def clear(self):
+        """Drop the data and its id; anything stored afterwards (a logout flash) gets a fresh id"""
+        self.regenerate()
+        self._data.clear()
+
+class ServerSessionInterface(SessionInterface):
+    def __init__(self, backend):
+        self.backend = backend
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        return ServerSession(self.backend, sid if sid and SESSION_ID_PATTERN.match(sid) else None)
+
+    def save_session(self, app, session, response):
+        if session.discarded_sid:
+            self.backend.delete(session_key(session.discarded_sid))
+        if not session.loaded:
+            return
+        response.vary.add('Cookie')
+        
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+        
+        if not session:
+            if session.modified:
+                if session.sid:
+                    self.backend.delete(session_key(session.sid))
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+            return
+        
+        now = datetime.utcnow()
+        lifetime = app.permanent_session_lifetime
+        if session.modified or session.sid is None:
+            session.sid = session.sid or secrets.token_urlsafe(32)
+            self.backend.save(session_key(session.sid), session_json_serializer.dumps(dict(session)), now + lifetime)
+        elif session.expires_at - now < lifetime - timedelta(seconds=SESSION_TOUCH_SECONDS):
+            self.backend.touch(session_key(session.sid), now + lifetime)
+        else:
+            return
+        
+        response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                            domain=domain, path=path, secure=secure, samesite=samesite, httponly=httponly)
+
+class DatabaseSessionBackend:
+    """Sessions as rows of the user_session table, on the app's own database (SQLite or PostgreSQL)
+
+    Uses its own connection rather than db.session, so saving a session after
+    the view never commits, or trips over, the view's unit of work.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self):
+        self._saves = 0
+
+    def load(self, key):
+        with db.engine.connect() as conn:
+            row = conn.execute(db.select(UserSession.data, UserSession.expires_at).where(
+                UserSession.id == key, UserSession.expires_at > datetime.utcnow()
+            )).first()
+        return (row.data, row.expires_at) if row else None
+
+    def save(self, key, data, expires_at):
+        with db.engine.begin() as conn:
+            conn.execute(upsert_statement(UserSession, {'id': key, 'data': data, 'expires_at': expires_at},
+                                          ['id'], ['data', 'expires_at']))
+            self._saves += 1
+            if self._saves % self.PRUNE_EVERY == 0:
+                conn.execute(db.delete(UserSession).where(UserSession.expires_at <= datetime.utcnow()))
+
+    def touch(self, key, expires_at):
+        with db.engine.begin() as conn:
+            conn.execute(db.update(UserSession).where(UserSession.id == key).values(expires_at=expires_at))
+
+    def delete(self, key):
+        with db.engine.begin() as conn:
+            conn.execute(db.delete(UserSession).where(UserSession.id == key))
+
+class RedisSessionBackend:
+    """Sessions in any Redis-protocol server; each key expires on its own"""
+
+    def __init__(self, url):
+        import redis  # Optional dependency, only needed for redis:// session URLs
+        self._client = redis.Redis.from_url(url)
+
+    def load(self, key):
+        pipe = self._client.pipeline()
+        pipe.get(f'session:{key}')
+        pipe.ttl(f'session:{key}')
+        data, ttl = pipe.execute()
+        if data is None:
+            return None
+        return (data.decode(), datetime.utcnow() + timedelta(seconds=max(ttl, 0)))
+
+    def save(self, key, data, expires_at):
+        self._client.set(f'session:{key}', data, ex=max(1, int((expires_at - datetime.utcnow()).total_seconds())))
+
+    def touch(self, key, expires_at):
+        self._client.expire(f'session:{key}', max(1, int((expires_at - datetime.utcnow()).total_seconds())))
+
+    def delete(self, key):
+        self._client.delete(f'session:{key}')
+
+def create_session_backend():
+    url = os.environ.get('SESSION_BACKEND_URL', '')
+    if url.startswith('redis://') or url.startswith('rediss://'):
+        return RedisSessionBackend(url)
+    return DatabaseSessionBackend()
+
+app.session_interface = ServerSessionInterface(create_session_backend())
+
+
+# ===============================
+# AUTHORIZATION
+# ===============================
+# The logged-in user's profile and class ids (owned for a professor, enrolled
+# for a student) are resolved at most once per request and cached across
+# requests. Class-id sets are cached under a per-user version kept in the
+# class_access_version table, which join, unenroll, remove and class
+# create/delete bump in the same transaction as the membership change. Every
+# worker reads the version (one primary-key lookup per request), so a removal
+# takes effect everywhere on the next request, and a computation racing an
+# invalidation lands under a stale key and is never read. A class missing from
+# a cached set is still re-read before access is refused.
+
+USER_CACHE_SECONDS = 60
+CLASS_ACCESS_SECONDS = 30
+
+user_cache = TTLCache(USER_CACHE_SECONDS)
+class_access_cache = TTLCache(CLASS_ACCESS_SECONDS)
+
+def load_user_profile(user_type, user_id):
+    """Read-only snapshot of a Student or Professor row, without the password hash"""
+    model = Student if user_type == 'student' else Professor
+    row = db.session.execute(db.select(
+        *[column for column in model.__table__.columns if column.name != 'password']
+    ).where(model.id == user_id)).mappings().first()
+    return SimpleNamespace(**dict(row, user_type=user_type)) if row else None
+
+def current_user():
+    """The logged-in user's profile, looked up at most once per request and cached briefly across requests.
+
+    A snapshot rather than an ORM instance, so it is safe to share between
+    requests; views that change the user load the row themselves and call
+    ``user_cache.invalidate``.
+    """
+    key = (session.get('user_type'), session.get('user_id'))
+    cached = g.get('current_user')
+    if cached is None or cached[0] != key:
+        user = user_cache.get_or_compute(key, lambda: load_user_profile(*key)) if key[1] else None
+        cached = g.current_user = (key, user)
+    return cached[1]
+
+def load_class_ids(user_type, user_id):
+    if user_type == 'professor':
+        query = db.select(Class.id).where(Class.professor_id == user_id)
+    else:
+        query = db.select(enrollments.c.class_id).where(enrollments.c.student_id == user_id)
+    return frozenset(db.session.execute(query).scalars())
+
+def invalidate_class_access(user_type, user_ids):
+    """Bump the users' class-access version; call with the membership change, before the caller commits"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite_dialect
+    statement = dialect.insert(ClassAccessVersion).values(
+        [{'user_type': user_type, 'user_id': user_id, 'version': 1} for user_id in user_ids]
+    )
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=['user_type', 'user_id'],
+        set_={'version': ClassAccessVersion.version + 1}
+    ))
+    if has_request_context():
+        g.pop('class_access_version', None)
+
+def class_access_version(user_key):
+    """The shared version of a user's class-id set, read once per request"""
+    cached = g.get('class_access_version')
+    if cached is None or cached[0] != user_key:
+        version = db.session.execute(db.select(ClassAccessVersion.version).where(
+            ClassAccessVersion.user_type == user_key[0], ClassAccessVersion.user_id == user_key[1]
+        )).scalar()
+        cached = g.class_access_version = (user_key, version or 0)
+    return cached[1]
+
+def user_class_ids(refresh=False):
+    """Ids of the classes the logged-in user owns (professor) or is enrolled in (student)"""
+    user_key = (session.get('user_type'), session.get('user_id'))
+    if not user_key[1]:
+        return frozenset()
+    key = user_key + (class_access_version(user_key),)
+    cached = g.get('class_ids')
+    if cached is not None and cached[0] == key and not (refresh and not cached[2]):
+        return cached[1]
+    
+    if refresh:
+        class_access_cache.invalidate(key)
+    class_ids = class_access_cache.get_or_compute(key, lambda: load_class_ids(*user_key))
+    g.class_ids = (key, class_ids, refresh)
+    return class_ids
+
+def can_access_class(class_id):
+    """True if the logged-in user owns or is enrolled in the class; re-reads the database before refusing"""
+    try:
+        class_id = int(class_id)
+    except (TypeError, ValueError):
+        return False
+    return class_id in user_class_ids() or class_id in user_class_ids(refresh=True)
+
+def owns_class(class_id):
+    return session.get('user_type') == 'professor' and can_access_class(class_id)
+
+def requires_user(*user_types):
+    """401 unless someone is logged in, as one of ``user_types`` when any are given"""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if 'user_id' not in session or (user_types and session.get('user_type') not in user_types):
+                return jsonify({'error': 'Unauthorized'}), 401
+            return view(*args, **kwargs)
+        return wrapped
+    return decorator
+
+def requires_class_owner(view):
+    """Professor view over the ``class_id`` URL argument; classes they do not own are 404"""
+    @wraps(view)
+    @requires_user('professor')
+    def wrapped(class_id, *args, **kwargs):
+        if not owns_class(class_id):
+            return jsonify({'error': 'Class not found'}), 404
+        return view(int(class_id), *args, **kwargs)
+    return wrapped
+
+def requires_class_member(view):
+    """View over the ``class_id`` URL argument for the class's professor and enrolled students"""
+    @wraps(view)
+    @requires_user()
+    def wrapped(class_id, *args, **kwargs):
+        if not can_access_class(class_id):
+            return jsonify({'error': 'Class not found'}), 404
+        return view(int(class_id), *args, **kwargs)
+    return wrapped
+
 
 
 @app.route('/signup', methods=['GET', 'POST'])
@@ -660,38 +1807,30 @@ def login():
         
         # ✅ FIX: Different messages for "not registered" vs "wrong password"
         if not user:
+            # Unknown emails still count against the client IP (credential stuffing)
+            throttle_backend.hit(f'login:ip:{request.remote_addr}', LOGIN_WINDOW_SECONDS)
             flash("This account is not registered. Please sign up first.")
             return redirect(url_for('login'))
         
         if not check_password_hash(user.password, password):
             # Track failed attempts only if user exists
-            if email not in login_attempts:
-                login_attempts[email] = [0, None]
-            
-            attempts, _ = login_attempts[email]
-            attempts += 1
+            remaining = record_failed_login(email)
             
-            if attempts >= MAX_LOGIN_ATTEMPTS:
-                locked_until = datetime.utcnow() + timedelta(minutes=LOGIN_TIMEOUT_MINUTES)
-                login_attempts[email] = [attempts, locked_until]
-                flash(f"Too many failed attempts. Account locked for {LOGIN_TIMEOUT_MINUTES} minutes.")
+            if remaining <= 0:
+                _, message = check_login_attempts(email)
+                flash(f"Too many failed attempts. {message}")
             else:
-                login_attempts[email] = [attempts, None]
-                remaining = MAX_LOGIN_ATTEMPTS - attempts
                 flash(f"Incorrect password. {remaining} attempt{'s' if remaining > 1 else ''} remaining.")
             
             return redirect(url_for('login'))
         
         # Success - Reset login attempts
-        if email in login_attempts:
-            login_attempts[email] = [0, None]
+        reset_login_attempts(email)
         
+        session.regenerate()
         session['user_id'] = user.id
-        session['user_email'] = user.username
-        session['user_first_name'] = user.first_name
         session['user_type'] = user_type
         session.permanent = True
-        app.permanent_session_lifetime = timedelta(hours=2)
         
         flash("Logged in successfully!", "success")
         return redirect(url_for('dashboard'))
@@ -704,29 +1843,18 @@ def dashboard():
         flash("Please log in to access the dashboard")
         return redirect(url_for('login'))
     
-    user_type = session.get('user_type')
-    user_id = session.get('user_id')
+    user = current_user()
     
-    if user_type == 'student':
-        user = Student.query.get(user_id)
+    if session.get('user_type') == 'student':
         if not user:
             flash("Student not found")
             return redirect(url_for('logout'))
-        
-        # Store student data in session for JS access
-        session['student_data'] = {
-            'id': str(user.id),
-            'student_id': user.student_id,
-            'name': f"{user.first_name} {user.last_name}"
-        }
-        
-        return render_template('student_dashboard.html', user=user)
+        return render_template('student_dashboard.html', user=user, sync_cursor=new_sync_cursor())
     else:
-        user = Professor.query.get(user_id)
         if not user:
             flash("Professor not found")
             return redirect(url_for('logout'))
-        return render_template('professor_dashboard.html', user=user)
+        return render_template('professor_dashboard.html', user=user, sync_cursor=new_sync_cursor())
 
 @app.route('/logout', methods=['GET', 'POST'])
 def logout():
@@ -741,21 +1869,79 @@ def generate_class_code():
         if not Class.query.filter_by(code=code).first():
             return code
 
+def load_professor_classes_data(professor, archived):
+    """Build the class list payload for a professor in a fixed number of queries.
+
+    Classes and their rosters come back in two round trips (``selectinload``),
+    then materials and assignments for every class are fetched with one
+    ``IN (...)`` query each, no matter how many classes the professor has.
+    """
+    classes = Class.query.options(
+        db.selectinload(Class.students).lazyload(Student.classes)
+    ).filter_by(
+        professor_id=professor.id,
+        archived=archived
+    ).all()
+
+    class_ids = [cls.id for cls in classes]
+    materials_by_class = {class_id: [] for class_id in class_ids}
+    assignments_by_class = {class_id: [] for class_id in class_ids}
+
+    if class_ids:
+        for m in Material.query.options(db.selectinload(Material.attachments)).filter(
+            Material.class_id.in_(class_ids)
+        ).order_by(Material.id).all():
+            materials_by_class[m.class_id].append(m)
+        for a in Assignment.query.options(db.selectinload(Assignment.attachments)).filter(
+            Assignment.class_id.in_(class_ids)
+        ).order_by(Assignment.id).all():
+            assignments_by_class[a.class_id].append(a)
+
+    professor_name = f"{professor.first_name} {professor.last_name}"
+
+    classes_data = []
+    for cls in classes:
+        classes_data.append({
+            'id': str(cls.id),
+            'name': cls.name,
+            'description': cls.description,
+            'code': cls.code,
+            'archived': cls.archived,
+            'professor_name': professor_name,
+            'students': [{
+                'id': str(student.id),
+                'student_id': student.student_id,
+                'first_name': student.first_name,
+                'last_name': student.last_name,
+                'name': f"{student.first_name} {student.last_name}",
+                'email': student.username
+            } for student in cls.students],
+            'materials': [{
+                'id': str(m.id),
+                'title': m.title,
+                'description': m.description,
+                'date': m.date.isoformat(),
+                'deadline': m.deadline.isoformat() if m.deadline else None,
+                'resourceLink': m.resource_link,
+                'files': file_refs(m)
+            } for m in materials_by_class[cls.id]],
+            'assignments': [{
+                'id': str(a.id),
+                'title': a.title,
+                'description': a.description,
+                'dueDate': a.due_date.isoformat(),
+                'points': a.points,
+                'files': file_refs(a)
+            } for a in assignments_by_class[cls.id]]
+        })
+    return classes_data
+
 # Add archive endpoint
 @app.route('/api/professor/classes/<class_id>/archive', methods=['POST'])
+@requires_class_owner
 def archive_class(class_id):
-    if 'user_id' not in session or session.get('user_type') != 'professor':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    professor_id = session['user_id']
-    
     try:
-        class_id_int = int(class_id)
-        cls = Class.query.filter_by(id=class_id_int, professor_id=professor_id).first()
-        
-        if not cls:
-            return jsonify({'error': 'Class not found'}), 404
-        
+        cls = Class.query.get(class_id)
         cls.archived = not cls.archived  # Toggle archive status
         db.session.commit()
         
@@ -778,7 +1964,7 @@ def manage_classes():
         return jsonify({'error': 'Content-Type must be application/json'}), 400
 
     if user_type == 'professor':
-        professor = Professor.query.get(user_id)
+        professor = current_user()
         if not professor:
             return jsonify({'error': 'Professor not found'}), 404
 
@@ -787,62 +1973,7 @@ def manage_classes():
                 # ✅ FIX: Proper archived filtering
                 show_archived = request.args.get('archived', 'false').lower() == 'true'
                 
-                if show_archived:
-                    classes = Class.query.filter_by(
-                        professor_id=user_id,
-                        archived=True
-                    ).all()
-                else:
-                    classes = Class.query.filter_by(
-                        professor_id=user_id,
-                        archived=False
-                    ).all()
-                
-                classes_data = []
-                for cls in classes:
-                    # Load fresh data for each class
-                    materials = Material.query.filter_by(class_id=cls.id).all()
-                    assignments = Assignment.query.filter_by(class_id=cls.id).all()
-                    
-                    students_list = []
-                    for student in cls.students:
-                        students_list.append({
-                            'id': str(student.id),
-                            'student_id': student.student_id,
-                            'first_name': student.first_name,
-                            'last_name': student.last_name,
-                            'name': f"{student.first_name} {student.last_name}",
-                            'email': student.username
-                        })
-                    
-                    professor = Professor.query.get(cls.professor_id)
-                    
-                    classes_data.append({
-                        'id': str(cls.id),
-                        'name': cls.name,
-                        'description': cls.description,
-                        'code': cls.code,
-                        'archived': cls.archived,
-                        'professor_name': f"{professor.first_name} {professor.last_name}" if professor else "N/A",
-                        'students': students_list,
-                        'materials': [{
-                            'id': str(m.id),
-                            'title': m.title,
-                            'description': m.description,
-                            'date': m.date.isoformat(),
-                            'deadline': m.deadline.isoformat() if m.deadline else None,
-                            'resourceLink': m.resource_link,
-                            'files': json.loads(m.files) if m.files else []
-                        } for m in materials],
-                        'assignments': [{
-                            'id': str(a.id),
-                            'title': a.title,
-                            'description': a.description,
-                            'dueDate': a.due_date.isoformat(),
-                            'points': a.points,
-                            'files': json.loads(a.files) if a.files else []
-                        } for a in assignments]
-                    })
+                classes_data = load_professor_classes_data(professor, show_archived)
                 return jsonify(classes_data)
             except Exception as e:
                 print(f"Error fetching professor classes: {e}")
@@ -873,6 +2004,7 @@ def manage_classes():
                 )
                 
                 db.session.add(new_class)
+                invalidate_class_access('professor', [user_id])
                 db.session.commit()
                 
                 return jsonify({
@@ -911,11 +2043,19 @@ def manage_classes():
                     return jsonify({'error': 'Class not found or you do not have permission to delete it'}), 404
                 
                 # Remove all students from the class first
+                student_ids = [student.id for student in cls.students]
                 cls.students = []
+                invalidate_class_access('student', student_ids)
                 db.session.commit()
                 
-                # Then delete the class
+                # Then delete the class; only its professor and former students hear about it
+                record_tombstone('class', cls.id, class_id=cls.id, professor_id=user_id)
+                for student_id in student_ids:
+                    record_tombstone('class', cls.id, class_id=cls.id, student_id=student_id)
+                Attachment.query.filter_by(class_id=cls.id).delete(synchronize_session=False)
+                delete_gradebook(cls.id)
                 db.session.delete(cls)
+                invalidate_class_access('professor', [user_id])
                 db.session.commit()
                 
                 return jsonify({'message': 'Class deleted successfully'}), 200
@@ -931,7 +2071,7 @@ def manage_classes():
         if request.method == 'DELETE':
             return jsonify({'error': 'Students are not allowed to delete classes'}), 403
             
-        student = Student.query.get(user_id)
+        student = current_user()
         if not student:
             return jsonify({'error': 'Student not found'}), 404
         
@@ -940,10 +2080,15 @@ def manage_classes():
             # ✅ FIX: Get archived parameter correctly
             show_archived = request.args.get('archived', 'false').lower() == 'true'
             
-            for cls in student.classes:
+            # Professors for every class arrive in one IN query instead of one get() per class
+            student_classes = enrolled_classes(student.id)
+            professor_ids = {cls.professor_id for cls in student_classes}
+            professors = {p.id: p for p in Professor.query.filter(Professor.id.in_(professor_ids)).all()} if professor_ids else {}
+
+            for cls in student_classes:
                 # ✅ FIX: Match archived status
                 if cls.archived == show_archived:
-                    professor = Professor.query.get(cls.professor_id)
+                    professor = professors.get(cls.professor_id)
                     classes_data.append({
                         'id': str(cls.id),
                         'name': cls.name,
@@ -968,8 +2113,7 @@ def join_class():
     if 'user_id' not in session or session.get('user_type') != 'student':
         return jsonify({'error': 'Unauthorized'}), 401
     
-    student_id = session['user_id']
-    student = Student.query.get(student_id)
+    student = current_user()
     if not student:
         return jsonify({'error': 'Student not found'}), 404
 
@@ -985,11 +2129,18 @@ def join_class():
     if not cls_to_join:
         return jsonify({'error': 'Class not found with that code'}), 404
     
-    if student in cls_to_join.students:
+    if is_enrolled(student.id, cls_to_join.id):
         return jsonify({'error': 'You are already enrolled in this class'}), 400
 
     try:
-        cls_to_join.students.append(student)
+        if not enroll_students(cls_to_join.id, [student.id]):
+            # A concurrent request enrolled the student first
+            db.session.rollback()
+            return jsonify({'error': 'You are already enrolled in this class'}), 400
+        # A returning student may still have submissions in this class
+        refresh_gradebook_students(cls_to_join.id, [student.id])
+        refresh_gradebook_assignments(cls_to_join.id)
+        invalidate_class_access('student', [student.id])
         db.session.commit()
         
         professor = Professor.query.get(cls_to_join.professor_id)
@@ -1013,8 +2164,7 @@ def unenroll_class():
     if 'user_id' not in session or session.get('user_type') != 'student':
         return jsonify({'error': 'Unauthorized'}), 401
     
-    student_id = session['user_id']
-    student = Student.query.get(student_id)
+    student = current_user()
     if not student:
         return jsonify({'error': 'Student not found'}), 404
 
@@ -1035,11 +2185,15 @@ def unenroll_class():
     if not cls_to_leave:
         return jsonify({'error': 'Class not found'}), 404
     
-    if student not in cls_to_leave.students:
-        return jsonify({'error': 'You are not enrolled in this class'}), 400
-
     try:
-        cls_to_leave.students.remove(student)
+        if not unenroll_student(student.id, cls_to_leave.id):
+            db.session.rollback()
+            return jsonify({'error': 'You are not enrolled in this class'}), 400
+        record_tombstone('enrollment', student.id, class_id=cls_to_leave.id, student_id=student.id)
+        db.session.flush()
+        refresh_gradebook_students(cls_to_leave.id, [student.id])
+        refresh_gradebook_assignments(cls_to_leave.id)
+        invalidate_class_access('student', [student.id])
         db.session.commit()
         
         return jsonify({
@@ -1050,6 +2204,51 @@ def unenroll_class():
         db.session.rollback()
         return jsonify({'error': 'Could not unenroll from class, please try again.'}), 500
 
+def save_submission(student_id, assignment_id, content, files):
+    """Create or replace a student's submission after the enrollment, archive and deadline checks.
+
+    Shared by the JSON and form submit routes; returns the response.
+    """
+    # ✅ FIX: Verify assignment exists
+    assignment = Assignment.query.get(assignment_id)
+    if not assignment:
+        print(f"❌ Assignment {assignment_id} not found in database")
+        return jsonify({'error': 'Assignment not found or has been deleted'}), 404
+    
+    # ✅ FIX: Verify student is enrolled in the class
+    if not can_access_class(assignment.class_id):
+        return jsonify({'error': 'You are not enrolled in this class'}), 403
+    cls = Class.query.get(assignment.class_id)
+    
+    # ✅ FIX: Check if class is archived
+    if cls.archived:
+        return jsonify({'error': 'Cannot submit to archived class'}), 400
+    
+    # ✅ FIX: Check deadline
+    if not assignment_is_open(assignment):
+        return jsonify({'error': 'Cannot submit - assignment deadline has passed'}), 400
+    
+    # ✅ Insert or replace in one statement (unique on assignment_id, student_id)
+    submission_id = upsert_submission(
+        assignment.id,
+        student_id,
+        content=content,
+        date=datetime.utcnow()
+    )
+    replace_attachments('submission', submission_id, cls.id, files)
+    refresh_gradebook_students(cls.id, [student_id])
+    refresh_gradebook_assignments(cls.id, [assignment.id])
+    db.session.commit()
+    
+    publish_change([f'professor:{cls.professor_id}'], 'submission', classId=str(cls.id), assignmentId=str(assignment.id))
+    
+    print(f"✅ Saved submission {submission_id}")
+    
+    return jsonify({
+        'message': 'Submission saved successfully',
+        'submission_id': submission_id
+    }), 200
+
 @app.route('/api/student/submit_assignment', methods=['POST'])
 def submit_assignment():
     if 'user_id' not in session or session.get('user_type') != 'student':
@@ -1072,65 +2271,7 @@ def submit_assignment():
         if not assignment_id:
             return jsonify({'error': 'Assignment ID is required'}), 400
         
-        # ✅ FIX: Verify assignment exists
-        assignment = Assignment.query.get(assignment_id)
-        if not assignment:
-            print(f"❌ Assignment {assignment_id} not found in database")
-            return jsonify({'error': 'Assignment not found or has been deleted'}), 404
-        
-        # ✅ FIX: Verify student is enrolled in the class
-        cls = Class.query.get(assignment.class_id)
-        student = Student.query.get(student_id)
-        
-        if not cls or student not in cls.students:
-            return jsonify({'error': 'You are not enrolled in this class'}), 403
-        
-        # ✅ FIX: Check if class is archived
-        if cls.archived:
-            return jsonify({'error': 'Cannot submit to archived class'}), 400
-        
-        # ✅ FIX: Check deadline
-        if datetime.utcnow() > assignment.due_date:
-            return jsonify({'error': 'Cannot submit - assignment deadline has passed'}), 400
-        
-        # ✅ FIX: Find existing submission
-        existing_submission = Submission.query.filter_by(
-            assignment_id=assignment_id,
-            student_id=student_id
-        ).first()
-        
-        if existing_submission:
-            # ✅ FIX: Update existing submission
-            existing_submission.content = content
-            existing_submission.files = json.dumps(files)
-            existing_submission.date = datetime.utcnow()
-            db.session.commit()
-            
-            print(f"✅ Updated submission {existing_submission.id}")
-            
-            return jsonify({
-                'message': 'Submission updated successfully',
-                'submission_id': existing_submission.id
-            }), 200
-        else:
-            # ✅ FIX: Create new submission
-            new_submission = Submission(
-                assignment_id=assignment_id,
-                student_id=student_id,
-                content=content,
-                files=json.dumps(files),
-                date=datetime.utcnow()
-            )
-            
-            db.session.add(new_submission)
-            db.session.commit()
-            
-            print(f"✅ Created new submission {new_submission.id}")
-            
-            return jsonify({
-                'message': 'Submission saved successfully',
-                'submission_id': new_submission.id
-            }), 201
+        return save_submission(student_id, assignment_id, content, files)
         
     except Exception as e:
         db.session.rollback()
@@ -1168,13 +2309,22 @@ def unsubmit_assignment():
         
         # ✅ FIX: Check deadline
         assignment = Assignment.query.get(assignment_id)
-        if datetime.utcnow() > assignment.due_date:
+        if not assignment_is_open(assignment):
             return jsonify({'error': 'Cannot unsubmit - deadline has passed'}), 400
         
         # ✅ FIX: Delete submission
+        record_tombstone('submission', submission.id, class_id=assignment.class_id, student_id=submission.student_id)
+        delete_attachments('submission', [submission.id])
         db.session.delete(submission)
+        db.session.flush()
+        refresh_gradebook_students(assignment.class_id, [student_id])
+        refresh_gradebook_assignments(assignment.class_id, [assignment.id])
         db.session.commit()
         
+        cls = Class.query.get(assignment.class_id)
+        if cls:
+            publish_change([f'professor:{cls.professor_id}'], 'submission', classId=str(cls.id), assignmentId=str(assignment.id))
+        
         print(f"✅ Deleted submission {submission.id}")
         
         return jsonify({'message': 'Submission removed successfully'}), 200
@@ -1186,12 +2336,8 @@ def unsubmit_assignment():
 
 # ✅ ADD: New endpoint for removing students (add after unenroll_class route)
 @app.route('/api/professor/remove_student', methods=['POST'])
+@requires_user('professor')
 def remove_student():
-    if 'user_id' not in session or session.get('user_type') != 'professor':
-        return jsonify({'error': 'Unauthorized'}), 401
-    
-    professor_id = session['user_id']
-    
     data = request.get_json()
     if not data:
         return jsonify({'error': 'No JSON data provided'}), 400
@@ -1206,9 +2352,7 @@ def remove_student():
         class_id_int = int(class_id)
         student_id_int = int(student_id)
         
-        # Verify class belongs to professor
-        cls = Class.query.filter_by(id=class_id_int, professor_id=professor_id).first()
-        if not cls:
+        if not owns_class(class_id_int):
             return jsonify({'error': 'Class not found or unauthorized'}), 404
         
         # Find the student
@@ -1217,8 +2361,12 @@ def remove_student():
             return jsonify({'error': 'Student not found'}), 404
         
         # Remove student from class
-        if student in cls.students:
-            cls.students.remove(student)
+        if unenroll_student(student.id, class_id_int):
+            record_tombstone('enrollment', student.id, class_id=class_id_int, student_id=student.id)
+            db.session.flush()
+            refresh_gradebook_students(class_id_int, [student.id])
+            refresh_gradebook_assignments(class_id_int)
+            invalidate_class_access('student', [student.id])
             db.session.commit()
             
             return jsonify({
@@ -1236,6 +2384,174 @@ def remove_student():
         print(f"Error removing student: {e}")
         return jsonify({'error': 'Failed to remove student'}), 500
 
+MAX_ROSTER_IMPORT = 5000
+
+def roster_key(value):
+    """A roster entry is an email when it has an @, otherwise a school student ID"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    return ('email', value.lower()) if '@' in value else ('student_number', value)
+
+def json_roster_key(entry):
+    if isinstance(entry, dict):
+        return roster_key(entry.get('email')) or roster_key(entry.get('student_id'))
+    return roster_key(entry) if isinstance(entry, str) else None
+
+def csv_roster_rows(stream):
+    """Yield roster keys from an uploaded CSV with an ``email`` and/or ``student id`` column"""
+    reader = csv.DictReader(TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    reader.fieldnames = [(name or '').strip().lower().replace(' ', '_') for name in reader.fieldnames or []]
+    for row in reader:
+        yield roster_key(row.get('email')) or roster_key(row.get('student_id'))
+
+@app.route('/api/professor/classes/<int:class_id>/roster', methods=['POST'])
+@requires_class_owner
+def import_roster(class_id):
+    """Enroll many existing students at once and report what happened to each row.
+
+    JSON: ``{"students": ["S2024-001", "ana@school.edu", {"email": ...}]}`` (or the
+    bare list). CSV: a ``file`` upload or text/csv body with ``email`` or ``student id``.
+    """
+    cls = Class.query.get(class_id)
+    if cls.archived:
+        return jsonify({'error': 'Cannot enroll students in an archived class'}), 400
+    
+    if request.is_json:
+        data = request.get_json(silent=True)
+        entries = data.get('students') if isinstance(data, dict) else data
+        if not isinstance(entries, list):
+            return jsonify({'error': 'Expected a list of students'}), 400
+        keys = (json_roster_key(entry) for entry in entries)
+    elif 'file' in request.files or request.mimetype == 'text/csv':
+        keys = csv_roster_rows(request.files['file'].stream if 'file' in request.files else request.stream)
+    else:
+        return jsonify({'error': 'Send JSON or a CSV file'}), 400
+    
+    try:
+        rows = []
+        for number, key in enumerate(keys, start=1):
+            if number > MAX_ROSTER_IMPORT:
+                return jsonify({'error': f'At most {MAX_ROSTER_IMPORT} students per import'}), 413
+            rows.append((number, key))
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'error': f'Could not read CSV: {e}'}), 400
+    
+    # Resolve every row with one IN query
+    numbers = {key[1] for _, key in rows if key and key[0] == 'student_number'}
+    emails = {key[1] for _, key in rows if key and key[0] == 'email'}
+    found = {}
+    if numbers or emails:
+        for student in db.session.query(Student.id, Student.student_id, Student.username).filter(db.or_(
+            Student.student_id.in_(numbers), db.func.lower(Student.username).in_(emails)
+        )):
+            if student.student_id:
+                found[('student_number', student.student_id)] = student.id
+            found[('email', student.username.lower())] = student.id
+    
+    report = []
+    to_enroll = []
+    seen = set()
+    for number, key in rows:
+        entry = {'row': number, 'student': key[1] if key else None}
+        student_id = found.get(key) if key else None
+        if key is None:
+            entry['status'] = 'invalid'
+        elif student_id is None:
+            entry['status'] = 'not_found'
+        elif student_id in seen:
+            entry['status'] = 'duplicate'
+        else:
+            seen.add(student_id)
+            to_enroll.append(student_id)
+            entry['studentId'] = str(student_id)
+        report.append(entry)
+    
+    try:
+        enrolled = enroll_students(cls.id, to_enroll)
+        if enrolled:
+            db.session.flush()
+            # Returning students may still have submissions in this class
+            refresh_gradebook_students(cls.id, list(enrolled))
+            refresh_gradebook_assignments(cls.id)
+            invalidate_class_access('student', enrolled)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error importing roster: {e}")
+        return jsonify({'error': 'Failed to import roster'}), 500
+    
+    for entry in report:
+        if 'studentId' in entry:
+            entry['status'] = 'enrolled' if int(entry['studentId']) in enrolled else 'already_enrolled'
+    
+    summary = {}
+    for entry in report:
+        summary[entry['status']] = summary.get(entry['status'], 0) + 1
+    
+    return jsonify({'classId': str(cls.id), 'summary': summary, 'rows': report}), 200
+
+STATS_CACHE_SECONDS = 30
+UPCOMING_DEADLINE_DAYS = 7
+
+stats_cache = TTLCache(STATS_CACHE_SECONDS)
+
+def compute_student_stats(student_id):
+    """Dashboard counters for a student in one query over enrollments, assignments and their submissions"""
+    now = datetime.utcnow()
+    upcoming_until = now + timedelta(days=UPCOMING_DEADLINE_DAYS)
+    open_assignment = db.and_(Assignment.id.isnot(None), Submission.id.is_(None))
+    
+    row = db.session.query(
+        db.func.count(db.distinct(enrollments.c.class_id)),
+        db.func.count(db.case((db.and_(open_assignment, Assignment.due_date > now), 1))),
+        db.func.count(db.case((db.and_(open_assignment, Assignment.due_date > now,
+                                       Assignment.due_date <= upcoming_until), 1))),
+        db.func.count(db.case((db.and_(open_assignment, Assignment.due_date <= now), 1))),
+        db.func.count(Submission.id),
+        db.func.count(Submission.grade)
+    ).select_from(enrollments).outerjoin(
+        Assignment, Assignment.class_id == enrollments.c.class_id
+    ).outerjoin(
+        Submission, db.and_(Submission.assignment_id == Assignment.id, Submission.student_id == student_id)
+    ).filter(enrollments.c.student_id == student_id).one()
+    
+    enrolled, pending, upcoming, missed, completed, graded = row
+    return {
+        'enrolled_classes': enrolled,
+        'pending_assignments': pending,
+        'upcoming_deadlines': upcoming,
+        'completed_assignments': completed,
+        'missed_assignments': missed,
+        'graded_assignments': graded
+    }
+
+def compute_professor_stats(professor_id):
+    """Dashboard counters for a professor's active classes as scalar subqueries of one SELECT"""
+    now = datetime.utcnow()
+    active_class_ids = db.select(Class.id).where(Class.professor_id == professor_id, Class.archived == False)
+    
+    def assignments_due_after(start, end=None):
+        query = db.select(db.func.count(Assignment.id)).where(
+            Assignment.class_id.in_(active_class_ids), Assignment.due_date > start)
+        if end is not None:
+            query = query.where(Assignment.due_date <= end)
+        return query.scalar_subquery()
+    
+    total_classes, total_students, pending_tasks, upcoming_deadlines = db.session.execute(db.select(
+        db.select(db.func.count()).select_from(active_class_ids.subquery()).scalar_subquery(),
+        db.select(db.func.count(db.distinct(enrollments.c.student_id))).where(
+            enrollments.c.class_id.in_(active_class_ids)).scalar_subquery(),
+        assignments_due_after(now),
+        assignments_due_after(now, now + timedelta(days=UPCOMING_DEADLINE_DAYS))
+    )).one()
+    
+    return {
+        'total_classes': total_classes,
+        'total_students': total_students,
+        'pending_tasks': pending_tasks,
+        'upcoming_deadlines': upcoming_deadlines
+    }
 
 @app.route('/api/student/stats')
 def student_stats():
@@ -1246,17 +2562,9 @@ def student_stats():
         return jsonify({'error': 'Unauthorized - Professors cannot access student stats'}), 403
     
     student_id = session.get('user_id')
-    student = Student.query.get(student_id)
-    
-    if not student:
-        return jsonify({'error': 'Student not found'}), 404
-    
-    return jsonify({
-        'enrolled_classes': len(student.classes),
-        'pending_assignments': 0,
-        'upcoming_deadlines': 0,
-        'completed_assignments': 0
-    })
+    return jsonify(stats_cache.get_or_compute(
+        ('student', student_id), lambda: compute_student_stats(student_id)
+    ))
 
 @app.route('/api/professor/stats')
 def professor_stats():
@@ -1267,40 +2575,9 @@ def professor_stats():
         return jsonify({'error': 'Unauthorized - Students cannot access professor stats'}), 403
     
     professor_id = session.get('user_id')
-    professor = Professor.query.get(professor_id)
-    
-    if not professor:
-        return {'error': 'Professor not found'}, 404
-    
-    # ✅ FIX: Count only active (non-archived) classes
-    active_classes = Class.query.filter_by(
-        professor_id=professor_id,
-        archived=False
-    ).all()
-    
-    # ✅ FIX: Use set to track UNIQUE students across ALL classes
-    unique_students = set()
-    for cls in active_classes:
-        for student in cls.students:
-            unique_students.add(student.id)  # Uses student.id for uniqueness
-    
-    total_students = len(unique_students)
-    
-    # ✅ FIX: Count pending assignments
-    pending_tasks = 0
-    now = datetime.utcnow()
-    for cls in active_classes:
-        assignments = Assignment.query.filter_by(class_id=cls.id).all()
-        for assignment in assignments:
-            if assignment.due_date > now:
-                pending_tasks += 1
-    
-    return {
-        'total_classes': len(active_classes),
-        'total_students': total_students,
-        'pending_tasks': pending_tasks,
-        'upcoming_deadlines': 0
-    }
+    return stats_cache.get_or_compute(
+        ('professor', professor_id), lambda: compute_professor_stats(professor_id)
+    )
 
 @app.route('/api/profile/update-password', methods=['POST'])
 def update_password():
@@ -1331,9 +2608,14 @@ def update_password():
         db.session.rollback()
         return {'error': 'Failed to update password'}, 500
 
-@app.route('/static/<path:filename>')
 def serve_static(filename):
-    return send_from_directory(os.path.join(basedir, 'static'), filename)
+    entry = asset_manifest().get(filename)
+    if entry:
+        return serve_built_asset(filename, entry)
+    return serve_asset(STATIC_FOLDER, filename)
+
+# Flask registers /static itself; route it through the same caching layer
+app.view_functions['static'] = serve_static
 
 def open_browser():
     webbrowser.open_new("http://127.0.0.1:5000/")
@@ -1341,7 +2623,231 @@ def open_browser():
 # ✅ ADD THIS ROUTE TO SERVE UPLOADED FILES
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
-    return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+    # Upload names carry a UUID prefix, so their content never changes
+    response = serve_asset(app.config['UPLOAD_FOLDER'], filename, immutable=True)
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+@app.route('/uploads/blobs/<sha256>')
+def serve_blob(sha256):
+    if not SHA256_PATTERN.match(sha256):
+        abort(404)
+    
+    blob = Blob.query.get(sha256)
+    if not blob:
+        abort(404)
+    
+    # Rows written before types were derived server-side may hold a client's claim (text/html)
+    servable = set(BLOB_CONTENT_TYPES.values()) | AVATAR_CONTENT_TYPES
+    content_type = blob.content_type if blob.content_type in servable else 'application/octet-stream'
+    
+    path = blob_store.backend.local_path(sha256)
+    if path:
+        response = send_file(path, mimetype=content_type,
+                             conditional=True, etag=sha256, max_age=BLOB_CACHE_MAX_AGE)
+    else:
+        body = blob_store.backend.get_object(sha256)['Body']
+        response = Response(iter(lambda: body.read(BLOB_CHUNK_SIZE), b''), mimetype=content_type)
+        response.headers['Content-Length'] = str(blob.size)
+        response.set_etag(sha256)
+        response.cache_control.max_age = BLOB_CACHE_MAX_AGE
+    
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    response.headers['Content-Disposition'] = 'inline' if content_type in INLINE_BLOB_TYPES else 'attachment'
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+# ===============================
+# OUTBOUND MAIL
+# ===============================
+
+MAIL_BATCH_SIZE = 50
+MAIL_MAX_ATTEMPTS = 6
+MAIL_RETRY_BASE_SECONDS = 30  # Doubles per attempt: 30s, 1m, 2m, 4m, 8m
+MAIL_CLAIM_SECONDS = 300  # A claimed batch is retried if its sender dies mid-send
+MAIL_POLL_SECONDS = 30
+MAIL_SMTP_IDLE_SECONDS = 60  # Keep the SMTP connection open this long between batches
+MAIL_SENT_RETENTION_DAYS = 7
+
+def mail_settings():
+    return {
+        'server': os.environ.get("SMTP_SERVER", "smtp.gmail.com"),
+        'port': int(os.environ.get("SMTP_PORT", "587")),
+        'starttls': os.environ.get("SMTP_STARTTLS", "true").lower() == 'true',
+        'sender': os.environ.get("SENDER_EMAIL", "learnsynclms@gmail.com"),
+        'password': os.environ.get("SENDER_PASSWORD"),
+        'recipient': os.environ.get("RECIPIENT_EMAIL", "learnsynclms@gmail.com")
+    }
+
+def mail_configured():
+    """Gmail needs SENDER_PASSWORD; an explicit SMTP_SERVER may be an unauthenticated relay"""
+    return bool(os.environ.get("SENDER_PASSWORD") or os.environ.get("SMTP_SERVER"))
+
+def enqueue_email(recipient, subject, body, reply_to=None):
+    """Add a message to the outbox; it is sent once the caller commits"""
+    email = OutboundEmail(
+        sender=mail_settings()['sender'],
+        recipient=recipient,
+        reply_to=reply_to,
+        subject=subject,
+        body=body
+    )
+    db.session.add(email)
+    return email
+
+def build_mime_message(email):
+    msg = MIMEMultipart()
+    msg['From'] = email.sender
+    msg['To'] = email.recipient
+    msg['Subject'] = email.subject
+    if email.reply_to:
+        msg['Reply-To'] = email.reply_to
+    msg.attach(MIMEText(email.body, 'plain'))
+    return msg
+
+class SMTPConnection:
+    """One SMTP session reused across messages, reopened when the server drops it"""
+
+    def __init__(self):
+        self._server = None
+        self._last_used = 0
+
+    def _open(self):
+        settings = mail_settings()
+        server = smtplib.SMTP(settings['server'], settings['port'], timeout=30)
+        if settings['starttls']:
+            server.starttls()
+        if settings['password']:
+            server.login(settings['sender'], settings['password'])
+        return server
+
+    def send(self, email):
+        if self._server is None:
+            self._server = self._open()
+        try:
+            self._server.sendmail(email.sender, [email.recipient], build_mime_message(email).as_string())
+        except smtplib.SMTPServerDisconnected:
+            # The server timed out our idle session; reconnect once and retry
+            self._server = self._open()
+            self._server.sendmail(email.sender, [email.recipient], build_mime_message(email).as_string())
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    def close_if_idle(self):
+        if self._server is not None and time.monotonic() - self._last_used > MAIL_SMTP_IDLE_SECONDS:
+            self.close()
+
+def claim_pending_emails(limit=MAIL_BATCH_SIZE):
+    """Atomically take a batch of due messages, so several senders never send one twice"""
+    now = datetime.utcnow()
+    ids = [row.id for row in db.session.query(OutboundEmail.id).filter(
+        OutboundEmail.status == 'pending',
+        OutboundEmail.next_attempt_at <= now
+    ).order_by(OutboundEmail.next_attempt_at).limit(limit).all()]
+    if not ids:
+        return []
+    
+    token = str(uuid.uuid4())
+    OutboundEmail.query.filter(
+        OutboundEmail.id.in_(ids),
+        OutboundEmail.status == 'pending',
+        OutboundEmail.next_attempt_at <= now
+    ).update({
+        'claim_token': token,
+        'attempts': OutboundEmail.attempts + 1,
+        'next_attempt_at': now + timedelta(seconds=MAIL_CLAIM_SECONDS)
+    }, synchronize_session=False)
+    db.session.commit()
+    return OutboundEmail.query.filter_by(claim_token=token).order_by(OutboundEmail.id).all()
+
+def is_permanent_mail_error(error):
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    code = getattr(error, 'smtp_code', None)
+    return isinstance(code, int) and 500 <= code < 600 and not isinstance(error, smtplib.SMTPAuthenticationError)
+
+def send_email_batch(connection, emails):
+    """Send claimed messages over one connection; returns how many were sent"""
+    sent = 0
+    for email in emails:
+        try:
+            connection.send(email)
+            email.status = 'sent'
+            email.sent_at = datetime.utcnow()
+            email.last_error = None
+            sent += 1
+        except Exception as e:
+            connection.close()
+            email.last_error = str(e)[:1000]
+            if is_permanent_mail_error(e) or email.attempts >= MAIL_MAX_ATTEMPTS:
+                email.status = 'failed'
+            else:
+                delay = MAIL_RETRY_BASE_SECONDS * 2 ** (email.attempts - 1)
+                email.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+            print(f"Error sending email {email.id} (attempt {email.attempts}): {e}")
+        email.claim_token = None
+        db.session.commit()
+    return sent
+
+def drain_outbox(connection):
+    """Send every due message; returns how many were sent"""
+    sent = 0
+    while True:
+        batch = claim_pending_emails()
+        if not batch:
+            return sent
+        sent += send_email_batch(connection, batch)
+
+class MailSender:
+    """Background thread draining the outbox; wake() after committing new mail"""
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run, name='mail-sender', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        self.start()
+        self._wakeup.set()
+
+    def run(self):
+        connection = SMTPConnection()
+        while True:
+            self._wakeup.clear()
+            try:
+                with app.app_context():
+                    drain_outbox(connection)
+            except Exception as e:
+                print(f"Mail sender error: {e}")
+            connection.close_if_idle()
+            self._wakeup.wait(MAIL_POLL_SECONDS)
+
+# MAIL_WORKER=external when a separate `flask send-mail` process drains the outbox
+mail_sender = MailSender() if os.environ.get('MAIL_WORKER', 'thread') == 'thread' else None
+
+def notify_mail_sender():
+    if mail_sender:
+        mail_sender.wake()
+
+@app.before_request
+def start_mail_sender():
+    # Picks up mail left pending by a previous process without waiting for new mail
+    if mail_sender:
+        mail_sender.start()
 
 # Contact Us Email Functionality
 @app.route('/contact', methods=['POST'])
@@ -1354,23 +2860,9 @@ def contact_us():
         if not all([name, email, message]):
             return jsonify({'error': 'All fields are required'}), 400
         
-        # Email configuration
-        # Email configuration - USE ENVIRONMENT VARIABLES
-        smtp_server = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
-        smtp_port = int(os.environ.get("SMTP_PORT", "587"))
-        sender_email = os.environ.get("SENDER_EMAIL", "learnsynclms@gmail.com")
-        sender_password = os.environ.get("SENDER_PASSWORD")  # MUST be set in environment
-        recipient_email = os.environ.get("RECIPIENT_EMAIL", "learnsynclms@gmail.com")
-
-        if not sender_password:
+        if not mail_configured():
             return jsonify({'error': 'Email service not configured'}), 503
         
-        # Create message
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = f"Contact Form Message from {name}"
-        
         body = f"""
         New message from LearnSync Contact Form:
         
@@ -1384,20 +2876,21 @@ def contact_us():
         This message was sent from the LearnSync LMS contact form.
         """
         
-        msg.attach(MIMEText(body, 'plain'))
-        
-        # Send email
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        text = msg.as_string()
-        server.sendmail(sender_email, recipient_email, text)
-        server.quit()
+        # Queue it; the mail sender delivers it outside the request
+        enqueue_email(
+            mail_settings()['recipient'],
+            f"Contact Form Message from {name}",
+            body,
+            reply_to=email if validate_email(email) else None
+        )
+        db.session.commit()
+        notify_mail_sender()
         
         return jsonify({'success': True, 'message': 'Message sent successfully!'}), 200
         
     except Exception as e:
-        print(f"Error sending contact email: {e}")
+        db.session.rollback()
+        print(f"Error queueing contact email: {e}")
         return jsonify({'error': 'Failed to send message. Please try again.'}), 500
 
 # ✅ ADD THIS NEW ENDPOINT
@@ -1428,34 +2921,246 @@ def upload_file():
                 }), 400
             
             filename = secure_filename(file.filename)
-            unique_filename = f"{uuid.uuid4()}_{filename}"
             
-            # ✅ PRODUCTION FIX: Store in database as base64 for files < 5MB
-            if file_size < 5 * 1024 * 1024:  # 5MB limit
-                file_data = base64.b64encode(file.read()).decode('utf-8')
-                file_url = f"data:{file.content_type};base64,{file_data}"
-            else:
-                # For larger files, save to disk (will be lost on restart)
-                # TODO: Implement cloud storage (AWS S3, Cloudinary, etc.)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
-                file.save(filepath)
-                file_url = f"/uploads/{unique_filename}"
+            # ✅ Content-addressed blob store: identical files are kept once and
+            # records only carry a short /uploads/blobs/<sha256> reference
+            blob = blob_store.save(file.stream, blob_content_type(filename))
+            db.session.commit()
             
             return jsonify({
                 'success': True,
                 'filename': filename,
-                'url': file_url,
-                'file_id': unique_filename,
-                'size': file_size
+                'url': blob_store.url_for(blob),
+                'file_id': blob.sha256,
+                'size': blob.size
             }), 200
             
         except Exception as e:
+            db.session.rollback()
             print(f"Error uploading file: {e}")
             return jsonify({'error': f'Failed to upload file: {str(e)}'}), 500
     else:
         allowed = ', '.join(ALLOWED_EXTENSIONS)
         return jsonify({'error': f'Invalid file type. Allowed: {allowed}'}), 400
 
+# ===============================
+# CHUNKED, RESUMABLE UPLOADS
+# ===============================
+
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # Suggested to clients; the server accepts any size
+UPLOAD_SESSION_TTL_HOURS = 24
+PARTIAL_UPLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, 'partial')
+
+# Running SHA-256 per upload, so finalize does not re-read the file. Each entry
+# is (bytes hashed, hasher); if a chunk lands on another worker the entry goes
+# stale and finalize falls back to hashing the file from disk.
+upload_hashers = {}
+upload_hashers_lock = threading.Lock()
+
+def partial_upload_path(upload_id):
+    return os.path.join(PARTIAL_UPLOAD_FOLDER, upload_id)
+
+def get_upload_session(upload_id):
+    upload = UploadSession.query.get(upload_id)
+    if not upload or upload.owner_id != session['user_id'] or upload.owner_type != session.get('user_type'):
+        return None
+    return upload
+
+def upload_status(upload):
+    return {
+        'upload_id': upload.id,
+        'offset': upload.received,
+        'size': upload.total_size,
+        'chunk_size': UPLOAD_CHUNK_SIZE
+    }
+
+def hash_file(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(BLOB_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher
+
+def cleanup_stale_uploads():
+    """Drop upload sessions (and their partial files) abandoned for longer than the TTL"""
+    cutoff = datetime.utcnow() - timedelta(hours=UPLOAD_SESSION_TTL_HOURS)
+    stale = UploadSession.query.filter(UploadSession.updated_at < cutoff).all()
+    for upload in stale:
+        path = partial_upload_path(upload.id)
+        if os.path.exists(path):
+            os.remove(path)
+        # Chunks left staged by a request that died mid-write
+        for name in os.listdir(PARTIAL_UPLOAD_FOLDER) if os.path.isdir(PARTIAL_UPLOAD_FOLDER) else []:
+            if name.startswith(f'{upload.id}.'):
+                os.remove(os.path.join(PARTIAL_UPLOAD_FOLDER, name))
+        with upload_hashers_lock:
+            upload_hashers.pop(upload.id, None)
+        db.session.delete(upload)
+    db.session.commit()
+    return len(stale)
+
+@app.route('/api/uploads', methods=['POST'])
+def init_upload():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({'error': 'No JSON data provided'}), 400
+    
+    filename = secure_filename(data.get('filename') or '')
+    size = data.get('size')
+    
+    if not filename or not isinstance(size, int) or size < 0:
+        return jsonify({'error': 'Filename and size are required'}), 400
+    
+    if not allowed_file(filename):
+        allowed = ', '.join(ALLOWED_EXTENSIONS)
+        return jsonify({'error': f'Invalid file type. Allowed: {allowed}'}), 400
+    
+    if size > MAX_FILE_SIZE:
+        size_mb = size / 1024 / 1024
+        max_mb = MAX_FILE_SIZE / 1024 / 1024
+        return jsonify({
+            'error': f'File too large ({size_mb:.1f}MB). Maximum allowed: {max_mb}MB'
+        }), 400
+    
+    try:
+        upload = UploadSession(
+            owner_id=session['user_id'],
+            owner_type=session.get('user_type'),
+            filename=filename,
+            content_type=blob_content_type(filename),
+            total_size=size
+        )
+        db.session.add(upload)
+        db.session.commit()
+        
+        os.makedirs(PARTIAL_UPLOAD_FOLDER, exist_ok=True)
+        open(partial_upload_path(upload.id), 'wb').close()
+        with upload_hashers_lock:
+            upload_hashers[upload.id] = (0, hashlib.sha256())
+        
+        return jsonify(upload_status(upload)), 201
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error starting upload: {e}")
+        return jsonify({'error': 'Failed to start upload'}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    upload = get_upload_session(upload_id)
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    return jsonify(upload_status(upload)), 200
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    upload = get_upload_session(upload_id)
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    offset = request.args.get('offset', type=int)
+    if offset != upload.received:
+        # Client is out of step (e.g. a retried chunk); tell it where to resume
+        return jsonify(dict(upload_status(upload), error='Offset mismatch')), 409
+    
+    path = partial_upload_path(upload.id)
+    with upload_hashers_lock:
+        hashed, hasher = upload_hashers.pop(upload.id, (None, None))
+    if hashed != offset:
+        hasher = None
+    
+    # Stage the chunk first: two requests can both pass the offset check, and
+    # only the one whose claim below succeeds may write into the partial file
+    staging_path = f'{path}.{uuid.uuid4().hex}'
+    received = offset
+    try:
+        with open(staging_path, 'wb') as out:
+            while True:
+                chunk = request.stream.read(BLOB_CHUNK_SIZE)
+                if not chunk:
+                    break
+                received += len(chunk)
+                if received > upload.total_size:
+                    return jsonify(dict(upload_status(upload), error='Chunk exceeds declared file size')), 400
+                out.write(chunk)
+                if hasher:
+                    hasher.update(chunk)
+        
+        # Claim [offset, received); the row stays locked until the commit, so
+        # a concurrent claim on the same offset waits and then matches nothing
+        claimed = db.session.execute(
+            db.update(UploadSession)
+            .where(UploadSession.id == upload.id, UploadSession.received == offset)
+            .values(received=received)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            return jsonify(dict(upload_status(upload), error='Offset mismatch')), 409
+        
+        with open(staging_path, 'rb') as chunk_file, open(path, 'r+b') as out:
+            out.seek(offset)
+            out.truncate()
+            shutil.copyfileobj(chunk_file, out, BLOB_CHUNK_SIZE)
+        db.session.commit()
+        
+        if hasher:
+            with upload_hashers_lock:
+                upload_hashers[upload.id] = (received, hasher)
+        
+        return jsonify(upload_status(upload)), 200
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error receiving upload chunk: {e}")
+        return jsonify({'error': 'Failed to store chunk'}), 500
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+
+@app.route('/api/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    upload = get_upload_session(upload_id)
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    if upload.received != upload.total_size:
+        return jsonify(dict(upload_status(upload), error='Upload is incomplete')), 409
+    
+    path = partial_upload_path(upload.id)
+    with upload_hashers_lock:
+        hashed, hasher = upload_hashers.pop(upload.id, (None, None))
+    if hashed != upload.received:
+        hasher = hash_file(path)
+    
+    try:
+        blob = blob_store.save_file(path, hasher.hexdigest(), upload.total_size, upload.content_type)
+        filename = upload.filename
+        db.session.delete(upload)
+        db.session.commit()
+        
+        return jsonify({
+            'success': True,
+            'filename': filename,
+            'url': blob_store.url_for(blob),
+            'file_id': blob.sha256,
+            'size': blob.size
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error finalizing upload: {e}")
+        return jsonify({'error': f'Failed to upload file: {str(e)}'}), 500
+
 
 # Save material to database
 @app.route('/api/professor/materials', methods=['POST'])
@@ -1475,9 +3180,9 @@ def save_material():
     
     try:
         # Verify class belongs to professor
-        cls = Class.query.filter_by(id=class_id, professor_id=session['user_id']).first()
-        if not cls:
+        if not owns_class(class_id):
             return jsonify({'error': 'Class not found'}), 404
+        cls = Class.query.get(class_id)
         
         # Create new material
         new_material = Material(
@@ -1486,13 +3191,22 @@ def save_material():
             description=material_data.get('description'),
             date=datetime.fromisoformat(material_data.get('date').replace('Z', '+00:00')),
             deadline=datetime.fromisoformat(material_data['deadline'].replace('Z', '+00:00')) if material_data.get('deadline') else None,
-            resource_link=material_data.get('resourceLink'),
-            files=json.dumps(material_data.get('files', []))
+            resource_link=material_data.get('resourceLink')
         )
+        if new_material.deadline:
+            # Reminders whose time has already passed are not sent late
+            new_material.reminders_sent = reminders_due(utc_naive(new_material.deadline), datetime.utcnow())
         
         db.session.add(new_material)
+        db.session.flush()
+        replace_attachments('material', new_material.id, cls.id, material_data.get('files', []))
+        notify_class(cls.id, 'material', 'New Material Uploaded', f'"{new_material.title}" in {cls.name}')
         db.session.commit()
         
+        publish_change([f'class:{cls.id}'], 'material', classId=str(cls.id), materialId=str(new_material.id))
+        if new_material.deadline:
+            notify_deadline_scheduler()
+        
         return jsonify({
             'message': 'Material saved successfully',
             'material_id': new_material.id
@@ -1522,9 +3236,9 @@ def save_assignment():
     
     try:
         # Verify class belongs to professor
-        cls = Class.query.filter_by(id=class_id, professor_id=session['user_id']).first()
-        if not cls:
+        if not owns_class(class_id):
             return jsonify({'error': 'Class not found'}), 404
+        cls = Class.query.get(class_id)
         
         # Create new assignment
         new_assignment = Assignment(
@@ -1534,13 +3248,21 @@ def save_assignment():
             instructions=assignment_data.get('instructions'),
             due_date=datetime.fromisoformat(assignment_data.get('dueDate').replace('Z', '+00:00')),
             points=assignment_data.get('points', 100),
-            date_created=datetime.utcnow(),
-            files=json.dumps(assignment_data.get('files', []))
+            date_created=datetime.utcnow()
         )
+        # The New Assignment notification covers any reminder that is already due
+        new_assignment.reminders_sent = reminders_due(utc_naive(new_assignment.due_date), datetime.utcnow())
         
         db.session.add(new_assignment)
+        db.session.flush()
+        replace_attachments('assignment', new_assignment.id, cls.id, assignment_data.get('files', []))
+        notify_class(cls.id, 'assignment', 'New Assignment Posted', f'"{new_assignment.title}" in {cls.name}',
+                     assignment_id=new_assignment.id)
         db.session.commit()
         
+        publish_change([f'class:{cls.id}'], 'assignment', classId=str(cls.id), assignmentId=str(new_assignment.id))
+        notify_deadline_scheduler()
+        
         return jsonify({
             'message': 'Assignment saved successfully',
             'assignment_id': new_assignment.id
@@ -1572,13 +3294,22 @@ def update_assignment_deadline(assignment_id):
             return jsonify({'error': 'Assignment not found'}), 404
         
         # Verify the assignment belongs to professor's class
-        cls = Class.query.filter_by(id=assignment.class_id, professor_id=session['user_id']).first()
-        if not cls:
+        if not owns_class(assignment.class_id):
             return jsonify({'error': 'Unauthorized'}), 403
+        cls = Class.query.get(assignment.class_id)
         
         assignment.due_date = datetime.fromisoformat(new_due_date.replace('Z', '+00:00'))
+        # Re-arm the scheduler for the new date; the Deadline Changed notice covers reminders already due
+        assignment.reminders_sent = reminders_due(utc_naive(assignment.due_date), datetime.utcnow())
+        assignment.closed_at = None
+        notify_class(cls.id, 'deadline', 'Deadline Changed',
+                     f'"{assignment.title}" is now due {assignment.due_date:%b %d, %Y %H:%M} UTC ({cls.name})',
+                     assignment_id=assignment.id)
         db.session.commit()
         
+        publish_change([f'class:{cls.id}'], 'deadline', classId=str(cls.id), assignmentId=str(assignment.id))
+        notify_deadline_scheduler()
+        
         return jsonify({'message': 'Deadline updated successfully'}), 200
         
     except Exception as e:
@@ -1598,13 +3329,17 @@ def delete_material(material_id):
             return jsonify({'error': 'Material not found'}), 404
         
         # Verify the material belongs to professor's class
-        cls = Class.query.filter_by(id=material.class_id, professor_id=session['user_id']).first()
-        if not cls:
+        if not owns_class(material.class_id):
             return jsonify({'error': 'Unauthorized to delete this material'}), 403
         
+        class_id = material.class_id
+        record_tombstone('material', material.id, class_id=class_id)
+        delete_attachments('material', [material.id])
         db.session.delete(material)
         db.session.commit()
         
+        publish_change([f'class:{class_id}'], 'material', classId=str(class_id), materialId=str(material_id))
+        
         return jsonify({'message': 'Material deleted successfully'}), 200
         
     except Exception as e:
@@ -1625,14 +3360,24 @@ def delete_assignment(assignment_id):
             return jsonify({'error': 'Assignment not found'}), 404
         
         # Verify the assignment belongs to professor's class
-        cls = Class.query.filter_by(id=assignment.class_id, professor_id=session['user_id']).first()
-        if not cls:
+        if not owns_class(assignment.class_id):
             return jsonify({'error': 'Unauthorized to delete this assignment'}), 403
         
         # Note: Submissions will be automatically deleted due to cascade='all, delete-orphan'
+        class_id = assignment.class_id
+        record_tombstone('assignment', assignment.id, class_id=class_id)
+        delete_attachments('assignment', [assignment.id])
+        delete_attachments('submission', [row.id for row in db.session.query(Submission.id).filter_by(
+            assignment_id=assignment.id
+        ).all()])
         db.session.delete(assignment)
+        db.session.flush()
+        refresh_gradebook_students(class_id)
+        refresh_gradebook_assignments(class_id, [assignment.id])
         db.session.commit()
         
+        publish_change([f'class:{class_id}'], 'assignment', classId=str(class_id), assignmentId=str(assignment_id))
+        
         return jsonify({'message': 'Assignment deleted successfully'}), 200
         
     except Exception as e:
@@ -1645,30 +3390,34 @@ def delete_assignment(assignment_id):
 # ===============================
 
 @app.route('/api/student/classes/<int:class_id>/materials')
+@requires_class_member
 def get_student_class_materials(class_id):
-    if 'user_id' not in session or session.get('user_type') != 'student':
-        return {"error": "Unauthorized"}, 401
-
-    materials = Material.query.filter_by(class_id=class_id).order_by(Material.date.desc()).all()
+    try:
+        materials, next_cursor, total = paginate(Material.query.filter_by(class_id=class_id), Material.date, Material.id)
+    except InvalidCursor:
+        return {"error": "Invalid page cursor"}, 400
     
-    return jsonify([
+    return page_response([
         {
             "id": m.id,
             "title": m.title,
             "description": m.description,
             "date": m.date.isoformat()
         } for m in materials
-    ])
+    ], next_cursor, total)
 
 
 @app.route('/api/student/classes/<int:class_id>/assignments')
+@requires_class_member
 def get_student_class_assignments(class_id):
-    if 'user_id' not in session or session.get('user_type') != 'student':
-        return {"error": "Unauthorized"}, 401
-
-    assignments = Assignment.query.filter_by(class_id=class_id).order_by(Assignment.due_date.desc()).all()
+    try:
+        assignments, next_cursor, total = paginate(
+            Assignment.query.filter_by(class_id=class_id), Assignment.due_date, Assignment.id
+        )
+    except InvalidCursor:
+        return {"error": "Invalid page cursor"}, 400
     
-    return jsonify([
+    return page_response([
         {
             "id": a.id,
             "title": a.title,
@@ -1676,35 +3425,35 @@ def get_student_class_assignments(class_id):
             "due_date": a.due_date.isoformat(),
             "points": a.points
         } for a in assignments
-    ])
+    ], next_cursor, total)
 
 
 @app.route('/api/student/assignments/<int:assignment_id>/submit', methods=['POST'])
 def submit_student_assignment(assignment_id):
+    """Form-encoded submit (text plus an optional file); same rules as /api/student/submit_assignment"""
     if 'user_id' not in session or session.get('user_type') != 'student':
         return {"error": "Unauthorized"}, 401
 
-    assignment = Assignment.query.get(assignment_id)
-    if not assignment:
-        return {"error": "Assignment not found or has been deleted by professor"}, 404
-
-    if assignment.archived:
-        return {"error": "This assignment belongs to an archived class"}, 403
-
     text = request.form.get('text', '')
     file = request.files.get('file')
+    files = []
+    try:
+        if file and file.filename:
+            if not allowed_file(file.filename):
+                return {"error": f"Invalid file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"}, 400
+            file.seek(0, os.SEEK_END)
+            if file.tell() > MAX_FILE_SIZE:
+                return {"error": f"File too large. Maximum allowed: {MAX_FILE_SIZE / 1024 / 1024}MB"}, 400
+            file.seek(0)
+            filename = secure_filename(file.filename)
+            blob = blob_store.save(file.stream, blob_content_type(filename))
+            files.append({'name': filename, 'url': blob_store.url_for(blob)})
 
-    submission = Submission(
-        assignment_id=assignment_id,
-        student_id=session['user_id'],
-        text=text,
-        date=datetime.utcnow()
-    )
-
-    db.session.add(submission)
-    db.session.commit()
-
-    return jsonify({"success": True})
+        return save_submission(session['user_id'], assignment_id, text, files)
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Error saving submission: {e}")
+        return {"error": "Failed to save submission"}, 500
 
 
 @app.route('/api/student/assignments/<int:assignment_id>/submission')
@@ -1733,7 +3482,6 @@ def get_student_classes():
     if 'user_id' not in session or session.get('user_type') != 'student':
         return {"error": "Unauthorized"}, 401
 
-    student = Student.query.get(session['user_id'])
     return jsonify([
         {
             "id": c.id,
@@ -1741,7 +3489,7 @@ def get_student_classes():
             "description": c.description,
             "code": c.code,
             "archived": c.archived
-        } for c in student.classes
+        } for c in enrolled_classes(session['user_id'])
     ])
 
 @app.route('/api/professor/assignments/<assignment_id>/submissions', methods=['GET'])
@@ -1755,28 +3503,25 @@ def get_assignment_submissions(assignment_id):
             return jsonify({'error': 'Assignment not found'}), 404
         
         # Verify the assignment belongs to professor's class
-        cls = Class.query.filter_by(id=assignment.class_id, professor_id=session['user_id']).first()
-        if not cls:
+        if not owns_class(assignment.class_id):
             return jsonify({'error': 'Unauthorized'}), 403
         
-        submissions = Submission.query.filter_by(assignment_id=assignment_id).all()
+        submissions, next_cursor, total = paginate(
+            Submission.query.options(db.selectinload(Submission.attachments)).filter_by(assignment_id=assignment.id),
+            None, Submission.id
+        )
         
-        submissions_data = []
-        for submission in submissions:
-            student = Student.query.get(submission.student_id)
-            submissions_data.append({
-                'id': str(submission.id),
-                'studentId': str(submission.student_id),
-                'studentName': f"{student.first_name} {student.last_name}" if student else "Unknown",
-                'content': submission.content,
-                'date': submission.date.isoformat(),
-                'grade': submission.grade,
-                'feedback': submission.feedback,
-                'files': json.loads(submission.files) if submission.files else []
-            })
+        students = {}
+        if submissions:
+            students = {st.id: st for st in Student.query.options(db.lazyload(Student.classes)).filter(
+                Student.id.in_({sub.student_id for sub in submissions})
+            ).all()}
+        submissions_data = [serialize_submission(sub, students.get(sub.student_id)) for sub in submissions]
         
-        return jsonify(submissions_data), 200
+        return page_response(submissions_data, next_cursor, total), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid page cursor'}), 400
     except Exception as e:
         print(f"Error fetching submissions: {e}")
         return jsonify({'error': 'Failed to fetch submissions'}), 500
@@ -1807,42 +3552,46 @@ def grade_submission(assignment_id):
         if not assignment:
             return jsonify({'error': 'Assignment not found'}), 404
         
-        cls = Class.query.filter_by(id=assignment.class_id, professor_id=session['user_id']).first()
-        if not cls:
+        if not owns_class(assignment.class_id):
             return jsonify({'error': 'Unauthorized to grade this assignment'}), 403
+        cls = Class.query.get(assignment.class_id)
         
         # ✅ FIX: Verify student is enrolled
-        student = Student.query.get(student_id_int)
-        if not student or student not in cls.students:
+        if not is_enrolled(student_id_int, cls.id):
             return jsonify({'error': 'Student not enrolled in this class'}), 400
         
-        # ✅ FIX: Find submission with proper type casting
-        submission = Submission.query.filter(
-            Submission.assignment_id == assignment_id_int,
-            Submission.student_id == student_id_int
-        ).first()
+        # Validate grade range
+        grade, error = parse_grade(grade, assignment.points)
+        if error:
+            return jsonify({'error': error}), 400
         
-        if not submission:
+        # ✅ Update the grade in place; no row means the student has not submitted
+        submission_id = db.session.execute(
+            db.update(Submission)
+            .where(Submission.assignment_id == assignment_id_int, Submission.student_id == student_id_int)
+            .values(grade=float(grade), feedback=feedback, updated_at=datetime.utcnow())
+            .returning(Submission.id)
+        ).scalar()
+        
+        if submission_id is None:
+            db.session.rollback()
             print(f"❌ Submission not found: assignment={assignment_id_int}, student={student_id_int}")
-            print(f"Available submissions: {Submission.query.filter_by(assignment_id=assignment_id_int).count()}")
             return jsonify({'error': 'Submission not found. Student may not have submitted yet.'}), 404
         
-        # Validate grade range
-        if grade < 0 or grade > assignment.points:
-            return jsonify({'error': f'Grade must be between 0 and {assignment.points}'}), 400
-        
-        # Update grade
-        submission.grade = float(grade)
-        submission.feedback = feedback
+        refresh_gradebook_students(cls.id, [student_id_int])
+        refresh_gradebook_assignments(cls.id, [assignment_id_int])
+        notify_users('student', grade_notifications(student_id_int, assignment, cls.name, grade, feedback))
         db.session.commit()
         
+        publish_change([f'student:{student_id_int}'], 'grade', classId=str(cls.id), assignmentId=str(assignment.id))
+        
         print(f"✅ Grade saved: {grade}/{assignment.points} for student {student_id_int}")
         
         return jsonify({
             'message': 'Grade saved successfully',
-            'submission_id': submission.id,
-            'grade': submission.grade,
-            'feedback': submission.feedback
+            'submission_id': submission_id,
+            'grade': float(grade),
+            'feedback': feedback
         }), 200
         
     except ValueError as ve:
@@ -1854,89 +3603,1069 @@ def grade_submission(assignment_id):
         import traceback
         traceback.print_exc()
         return jsonify({'error': f'Failed to save grade: {str(e)}'}), 500
-    
-# Get materials for a class
-@app.route('/api/professor/classes/<class_id>/materials', methods=['GET'])
-def get_class_materials(class_id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Unauthorized'}), 401
-    
+
+MAX_BULK_GRADES = 5000
+
+def parse_grade(value, points):
+    """A grade from JSON or a CSV cell; returns (grade, error)"""
+    if isinstance(value, bool):
+        return None, 'Grade must be a number'
     try:
-        cls = Class.query.get(class_id)
-        if not cls:
-            return jsonify({'error': 'Class not found'}), 404
-        
-        materials = Material.query.filter_by(class_id=class_id).order_by(Material.date.desc()).all()
-        
-        materials_data = []
-        for material in materials:
-            materials_data.append({
-                'id': str(material.id),
-                'title': material.title,
-                'description': material.description,
-                'date': material.date.isoformat(),
-                'deadline': material.deadline.isoformat() if material.deadline else None,
-                'resourceLink': material.resource_link,
-                'files': json.loads(material.files) if material.files else []
-            })
-        
-        return jsonify(materials_data), 200
-        
-    except Exception as e:
-        print(f"Error fetching materials: {e}")
-        return jsonify({'error': 'Failed to fetch materials'}), 500
+        grade = float(value)
+    except (TypeError, ValueError):
+        return None, 'Grade must be a number'
+    if math.isnan(grade) or grade < 0 or grade > points:
+        return None, f'Grade must be between 0 and {points}'
+    return grade, None
+
+def csv_grade_rows(stream):
+    """Yield {student key, grade, feedback} dicts from an uploaded CSV, one row at a time.
+
+    Headers are matched case-insensitively: ``email``, ``student id`` (the school
+    ID, as in the gradebook export) or ``id`` (the internal id) pick the student;
+    ``grade`` and ``feedback`` carry the values. Rows with an empty grade are skipped.
+    """
+    reader = csv.DictReader(TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    reader.fieldnames = [(name or '').strip().lower().replace(' ', '_') for name in reader.fieldnames or []]
+    for row in reader:
+        if not (row.get('grade') or '').strip():
+            yield None
+            continue
+        yield {
+            'id': (row.get('id') or '').strip() or None,
+            'student_number': (row.get('student_id') or '').strip() or None,
+            'email': (row.get('email') or '').strip().lower() or None,
+            'grade': row['grade'].strip(),
+            'feedback': (row.get('feedback') or '').strip() or None  # An empty cell keeps the current feedback
+        }
 
+@app.route('/api/professor/assignments/<int:assignment_id>/grades', methods=['POST'])
+def bulk_grade_submissions(assignment_id):
+    """Grade many students at once from a JSON array or a CSV upload.
 
-# Get assignments for a class
-@app.route('/api/professor/classes/<class_id>/assignments', methods=['GET'])
-def get_class_assignments(class_id):
-    if 'user_id' not in session:
+    JSON: ``{"grades": [{"student_id", "grade", "feedback"}], "atomic": false}``
+    (or the bare array). CSV: a ``file`` upload or a text/csv body; see csv_grade_rows.
+    Valid rows are written in one transaction and invalid ones are reported by
+    row number; with ``atomic`` any error writes nothing.
+    """
+    if 'user_id' not in session or session.get('user_type') != 'professor':
         return jsonify({'error': 'Unauthorized'}), 401
     
-    try:
-        cls = Class.query.get(class_id)
-        if not cls:
-            return jsonify({'error': 'Class not found'}), 404
-        
-        assignments = Assignment.query.filter_by(class_id=class_id).order_by(Assignment.date_created.desc()).all()
-        
-        assignments_data = []
-        for assignment in assignments:
-            # ✅ FIX: Always include ALL submissions
-            submissions_data = []
-            submissions = Submission.query.filter_by(assignment_id=assignment.id).all()
+    assignment = db.session.query(
+        Assignment.id, Assignment.class_id, Assignment.title, Assignment.points, Class.name.label('class_name')
+    ).join(Class).filter(
+        Assignment.id == assignment_id, Class.professor_id == session['user_id']
+    ).first()
+    if not assignment:
+        return jsonify({'error': 'Assignment not found'}), 404
+    
+    if request.is_json:
+        data = request.get_json(silent=True)
+        entries = data.get('grades') if isinstance(data, dict) else data
+        atomic = bool(data.get('atomic')) if isinstance(data, dict) else False
+        if not isinstance(entries, list):
+            return jsonify({'error': 'Expected a list of grades'}), 400
+        rows = ({'id': entry.get('student_id'), 'grade': entry.get('grade'), 'feedback': entry.get('feedback')}
+                if isinstance(entry, dict) else {} for entry in entries)
+    elif 'file' in request.files or request.mimetype == 'text/csv':
+        stream = request.files['file'].stream if 'file' in request.files else request.stream
+        atomic = request.args.get('atomic', '').lower() in ('1', 'true', 'yes')
+        rows = csv_grade_rows(stream)
+    else:
+        return jsonify({'error': 'Send JSON or a CSV file'}), 400
+    
+    # One query each for the roster and the submissions, however many rows arrive
+    roster = db.session.query(Student.id, Student.student_id, Student.username).join(
+        enrollments, enrollments.c.student_id == Student.id
+    ).filter(enrollments.c.class_id == assignment.class_id).all()
+    by_id = {student.id: student.id for student in roster}
+    by_number = {student.student_id: student.id for student in roster if student.student_id}
+    by_email = {student.username.lower(): student.id for student in roster}
+    submission_ids = dict(db.session.query(Submission.student_id, Submission.id).filter(
+        Submission.assignment_id == assignment.id
+    ).all())
+    
+    now = datetime.utcnow()
+    updates = {}
+    errors = []
+    skipped = 0
+    try:
+        for number, row in enumerate(rows, start=1):
+            if number > MAX_BULK_GRADES:
+                return jsonify({'error': f'At most {MAX_BULK_GRADES} grades per request'}), 413
+            if row is None:
+                skipped += 1
+                continue
             
-            for submission in submissions:
-                student = Student.query.get(submission.student_id)
-                submissions_data.append({
-                    'id': str(submission.id),
-                    'studentId': str(submission.student_id),
-                    'studentName': f"{student.first_name} {student.last_name}" if student else "Unknown",
-                    'content': submission.content,
-                    'date': submission.date.isoformat(),
-                    'grade': submission.grade,  # ✅ Will be None if not graded
-                    'feedback': submission.feedback,
-                    'files': json.loads(submission.files) if submission.files else []
-                })
+            if row.get('id') is not None:
+                try:
+                    student_id = by_id.get(int(row['id']))
+                except (TypeError, ValueError):
+                    student_id = None
+                key = row['id']
+            else:
+                student_id = by_number.get(row.get('student_number')) or by_email.get(row.get('email'))
+                key = row.get('student_number') or row.get('email')
             
-            assignments_data.append({
-                'id': str(assignment.id),
-                'title': assignment.title,
-                'description': assignment.description,
-                'instructions': assignment.instructions,
-                'dueDate': assignment.due_date.isoformat(),
-                'points': assignment.points,
-                'dateCreated': assignment.date_created.isoformat(),
-                'files': json.loads(assignment.files) if assignment.files else [],
-                'submissions': submissions_data  # ✅ Always include this
+            def reject(message):
+                errors.append({'row': number, 'student': str(key) if key is not None else None, 'error': message})
+            
+            if key is None:
+                reject('Student is required')
+            elif student_id is None:
+                reject('Student not enrolled in this class')
+            elif student_id not in submission_ids:
+                reject('Student has not submitted yet')
+            elif student_id in updates:
+                reject('Student appears more than once')
+            else:
+                grade, error = parse_grade(row.get('grade'), assignment.points)
+                if error:
+                    reject(error)
+                    continue
+                update = {'id': submission_ids[student_id], 'grade': grade, 'updated_at': now}
+                if row.get('feedback') is not None:
+                    update['feedback'] = str(row['feedback'])
+                updates[student_id] = update
+    except (UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'error': f'Could not read CSV: {e}'}), 400
+    
+    if errors and atomic:
+        return jsonify({'updated': 0, 'skipped': skipped, 'errors': errors}), 400
+    
+    try:
+        if updates:
+            # Bulk UPDATE by primary key: one executemany for every row
+            db.session.execute(db.update(Submission), list(updates.values()))
+            refresh_gradebook_students(assignment.class_id, list(updates))
+            refresh_gradebook_assignments(assignment.class_id, [assignment.id])
+            notify_users('student', [
+                notification for student_id, update in updates.items()
+                for notification in grade_notifications(student_id, assignment, assignment.class_name,
+                                                        update['grade'], update.get('feedback'))
+            ])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"❌ Error saving bulk grades: {e}")
+        return jsonify({'error': 'Failed to save grades'}), 500
+    
+    if updates:
+        publish_change([f'student:{student_id}' for student_id in updates], 'grade',
+                       classId=str(assignment.class_id), assignmentId=str(assignment.id))
+    
+    return jsonify({
+        'updated': len(updates),
+        'skipped': skipped,
+        'errors': errors
+    }), 200
+
+# ===============================
+# REQUEST PROFILING
+# ===============================
+
+# Opt-in with PROFILE_REQUESTS=1. Each request records wall time, SQL statement
+# count/time/rows (from engine events), ORM objects loaded and response bytes;
+# aggregates per route are served on /metrics (Prometheus text) and
+# /api/debug/profile (JSON). Both endpoints need METRICS_TOKEN as a bearer
+# token, or a loopback client when no token is set. Numbers are per process.
+PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS', '').lower() in ('1', 'true', 'yes')
+PROFILE_N_PLUS_ONE_THRESHOLD = int(os.environ.get('PROFILE_N_PLUS_ONE_THRESHOLD', '10'))  # Same statement shape more than K times
+PROFILE_SLOW_MS = int(os.environ.get('PROFILE_SLOW_MS', '500'))
+PROFILE_RECENT_REQUESTS = 50
+PROFILE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+SQL_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)')
+SQL_PYFORMAT_PARAM = re.compile(r'%\((\w+?)(?:_\d+)?\)s')
+
+def statement_shape(statement):
+    """Collapse whitespace and IN-list lengths so repeats of one query compare equal"""
+    shape = ' '.join(statement.split())
+    shape = SQL_PYFORMAT_PARAM.sub('?', shape)
+    return SQL_PLACEHOLDER_LIST.sub('(?)', shape)
+
+def prometheus_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.sql_rows = 0
+        self.objects_loaded = 0
+        self.shapes = {}  # shape -> [count, seconds]
+
+    def record_statement(self, statement, seconds, rowcount):
+        self.sql_count += 1
+        self.sql_seconds += seconds
+        if rowcount and rowcount > 0:
+            # Drivers report rows for DML everywhere and for SELECTs on PostgreSQL only
+            self.sql_rows += rowcount
+        entry = self.shapes.setdefault(statement_shape(statement), [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    def repeated_statements(self):
+        return sorted(
+            ({'statement': shape, 'count': count, 'ms': round(seconds * 1000, 2)}
+             for shape, (count, seconds) in self.shapes.items() if count > PROFILE_N_PLUS_ONE_THRESHOLD),
+            key=lambda item: -item['count']
+        )
+
+class RouteMetrics:
+    """Thread-safe per-route aggregates plus a ring of recent slow or N+1 requests"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._recent = deque(maxlen=PROFILE_RECENT_REQUESTS)
+
+    def record(self, route, method, status, profile, response_bytes):
+        wall = time.perf_counter() - profile.started
+        repeated = profile.repeated_statements()
+        with self._lock:
+            stats = self._routes.get((route, method))
+            if stats is None:
+                stats = self._routes[(route, method)] = {
+                    'requests': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                    'buckets': [0] * len(PROFILE_BUCKETS),
+                    'sql_statements': 0, 'sql_seconds': 0.0, 'sql_rows': 0, 'objects_loaded': 0,
+                    'response_bytes': 0, 'n_plus_one': 0
+                }
+            stats['requests'] += 1
+            stats['errors'] += status >= 500
+            stats['seconds'] += wall
+            stats['max_seconds'] = max(stats['max_seconds'], wall)
+            for index, bound in enumerate(PROFILE_BUCKETS):
+                if wall <= bound:
+                    stats['buckets'][index] += 1
+            stats['sql_statements'] += profile.sql_count
+            stats['sql_seconds'] += profile.sql_seconds
+            stats['sql_rows'] += profile.sql_rows
+            stats['objects_loaded'] += profile.objects_loaded
+            stats['response_bytes'] += response_bytes or 0
+            stats['n_plus_one'] += bool(repeated)
+            
+            if repeated or wall * 1000 >= PROFILE_SLOW_MS:
+                self._recent.append({
+                    'route': route,
+                    'method': method,
+                    'path': request.full_path.rstrip('?'),
+                    'status': status,
+                    'at': datetime.utcnow().isoformat(),
+                    'ms': round(wall * 1000, 2),
+                    'sqlStatements': profile.sql_count,
+                    'sqlMs': round(profile.sql_seconds * 1000, 2),
+                    'repeatedStatements': repeated[:5]
+                })
+        return wall, repeated
+
+    def snapshot(self):
+        with self._lock:
+            routes = [{
+                'route': route,
+                'method': method,
+                'requests': stats['requests'],
+                'errors': stats['errors'],
+                'avgMs': round(stats['seconds'] / stats['requests'] * 1000, 2),
+                'maxMs': round(stats['max_seconds'] * 1000, 2),
+                'avgSqlStatements': round(stats['sql_statements'] / stats['requests'], 1),
+                'avgSqlMs': round(stats['sql_seconds'] / stats['requests'] * 1000, 2),
+                'avgSqlRows': round(stats['sql_rows'] / stats['requests'], 1),
+                'avgObjectsLoaded': round(stats['objects_loaded'] / stats['requests'], 1),
+                'avgResponseBytes': round(stats['response_bytes'] / stats['requests']),
+                'nPlusOneRequests': stats['n_plus_one']
+            } for (route, method), stats in self._routes.items()]
+            recent = list(self._recent)
+        routes.sort(key=lambda item: -item['avgMs'] * item['requests'])
+        return {'routes': routes, 'recent': recent[::-1]}
+
+    def prometheus_text(self):
+        def labels(route, method, **extra):
+            pairs = dict(route=route, method=method, **extra)
+            return ','.join(f'{key}="{prometheus_label(value)}"' for key, value in pairs.items())
+        
+        counters = [
+            ('learnsync_requests_total', 'requests', 'Requests handled'),
+            ('learnsync_request_errors_total', 'errors', 'Requests answered with a 5xx status'),
+            ('learnsync_sql_statements_total', 'sql_statements', 'SQL statements executed'),
+            ('learnsync_sql_seconds_total', 'sql_seconds', 'Time spent executing SQL'),
+            ('learnsync_sql_rows_total', 'sql_rows', 'Rows reported by the database driver'),
+            ('learnsync_orm_objects_loaded_total', 'objects_loaded', 'ORM objects loaded from query results'),
+            ('learnsync_response_bytes_total', 'response_bytes', 'Response body bytes sent'),
+            ('learnsync_n_plus_one_requests_total', 'n_plus_one', 'Requests repeating one statement shape too often'),
+        ]
+        with self._lock:
+            routes = {key: dict(stats, buckets=list(stats['buckets'])) for key, stats in self._routes.items()}
+        
+        lines = [
+            '# HELP learnsync_request_duration_seconds Request wall time',
+            '# TYPE learnsync_request_duration_seconds histogram'
+        ]
+        for (route, method), stats in sorted(routes.items()):
+            for bound, hits in zip(PROFILE_BUCKETS, stats['buckets']):
+                lines.append(f'learnsync_request_duration_seconds_bucket{{{labels(route, method, le=bound)}}} {hits}')
+            lines.append(f'learnsync_request_duration_seconds_bucket{{{labels(route, method, le="+Inf")}}} {stats["requests"]}')
+            lines.append(f'learnsync_request_duration_seconds_sum{{{labels(route, method)}}} {stats["seconds"]:.6f}')
+            lines.append(f'learnsync_request_duration_seconds_count{{{labels(route, method)}}} {stats["requests"]}')
+        for name, key, help_text in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for (route, method), stats in sorted(routes.items()):
+                lines.append(f'{name}{{{labels(route, method)}}} {stats[key]}')
+        return '\n'.join(lines) + '\n'
+
+route_metrics = RouteMetrics()
+
+def current_profile():
+    return g.get('request_profile') if has_request_context() else None
+
+if PROFILE_REQUESTS:
+    with app.app_context():
+        profiled_engine = db.engine
+    
+    @sa_event.listens_for(profiled_engine, 'before_cursor_execute')
+    def profile_statement_start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('profile_started', []).append(time.perf_counter())
+    
+    @sa_event.listens_for(profiled_engine, 'after_cursor_execute')
+    def profile_statement_end(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['profile_started'].pop()
+        profile = current_profile()
+        if profile is not None:
+            profile.record_statement(statement, time.perf_counter() - started, cursor.rowcount)
+    
+    @sa_event.listens_for(profiled_engine, 'handle_error')
+    def profile_statement_failed(exception_context):
+        # after_cursor_execute never fires for a failed statement; keep the start stack balanced
+        started = exception_context.connection.info.get('profile_started') if exception_context.connection else None
+        if started:
+            started.pop()
+    
+    @sa_event.listens_for(db.session, 'loaded_as_persistent')
+    def profile_object_loaded(session, instance):
+        profile = current_profile()
+        if profile is not None:
+            profile.objects_loaded += 1
+    
+    @app.before_request
+    def start_request_profile():
+        g.request_profile = RequestProfile()
+    
+    # Registered before the compression hook, so it runs after it and counts bytes on the wire
+    @app.after_request
+    def finish_request_profile(response):
+        profile = current_profile()
+        if profile is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        response_bytes = None if response.is_streamed else response.calculate_content_length()
+        wall, repeated = route_metrics.record(route, request.method, response.status_code, profile, response_bytes)
+        
+        response.headers['Server-Timing'] = (
+            f'app;dur={wall * 1000:.1f}, db;dur={profile.sql_seconds * 1000:.1f};desc="{profile.sql_count} queries"'
+        )
+        if repeated or wall * 1000 >= PROFILE_SLOW_MS:
+            app.logger.warning(
+                '%s %s took %.0f ms with %d SQL statements (%.0f ms)%s',
+                request.method, request.path, wall * 1000, profile.sql_count, profile.sql_seconds * 1000,
+                ''.join(f"\n  {item['count']}x {item['statement'][:200]}" for item in repeated[:3])
+            )
+        return response
+
+def metrics_access_allowed():
+    token = os.environ.get('METRICS_TOKEN')
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    return request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/metrics')
+def metrics():
+    if not PROFILE_REQUESTS:
+        abort(404)
+    if not metrics_access_allowed():
+        return Response('forbidden\n', status=403, mimetype='text/plain')
+    return Response(route_metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/debug/profile')
+def debug_profile():
+    if not PROFILE_REQUESTS:
+        return jsonify({'error': 'Profiling is off; set PROFILE_REQUESTS=1'}), 404
+    if not metrics_access_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify(dict(route_metrics.snapshot(), nPlusOneThreshold=PROFILE_N_PLUS_ONE_THRESHOLD, slowMs=PROFILE_SLOW_MS))
+
+# ===============================
+# RESPONSE SLIMMING
+# ===============================
+
+JSON_COMPRESSION_MIN_BYTES = 1024  # Below this the headers cost more than they save
+
+@app.after_request
+def compress_json_response(response):
+    """gzip/brotli-encode JSON bodies above the size threshold when the client accepts it"""
+    if (response.mimetype != 'application/json'
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200 or response.status_code >= 300
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < JSON_COMPRESSION_MIN_BYTES:
+        return response
+    
+    if brotli is not None and request.accept_encodings['br']:
+        response.set_data(brotli.compress(data, quality=4))
+        response.content_encoding = 'br'
+    elif request.accept_encodings['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.content_encoding = 'gzip'
+    return response
+
+def project_fields(items, summary_fields):
+    """Apply ?view=summary or ?fields=a,b,c to a list of serialized records"""
+    fields = request.args.get('fields')
+    if fields:
+        keep = {field.strip() for field in fields.split(',') if field.strip()}
+        keep.add('id')
+    elif request.args.get('view') == 'summary':
+        keep = summary_fields
+    else:
+        return items
+    return [{key: value for key, value in item.items() if key in keep} for item in items]
+
+# Keyset pagination: list endpoints return one page as a plain array and put the
+# opaque cursor for the next page in X-Next-Cursor (absent on the last page).
+# The first page also carries X-Total-Count.
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_page_cursor(sort_value, record_id):
+    raw = json.dumps([sort_value.isoformat() if sort_value else None, record_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_page_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, record_id = json.loads(raw)
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None), int(record_id)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursor(str(e))
+
+def page_limit():
+    try:
+        limit = int(request.args.get('limit', PAGE_SIZE))
+    except ValueError:
+        return PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def paginate(query, sort_column, id_column):
+    """One newest-first page of ``query`` ordered by (sort_column, id_column), or by id alone when
+    ``sort_column`` is None.
+
+    ``sort_column`` must be non-null and should not change while a client
+    pages, or rows are skipped or repeated. Returns (records, next_cursor,
+    total); total is only counted for the first page. Raises InvalidCursor for
+    a malformed ?cursor=.
+    """
+    cursor = request.args.get('cursor')
+    limit = page_limit()
+    total = None
+    if cursor:
+        sort_value, record_id = decode_page_cursor(cursor)
+        if sort_column is None:
+            query = query.filter(id_column < record_id)
+        elif sort_value is None:
+            raise InvalidCursor('Cursor is missing its sort value')
+        else:
+            query = query.filter(db.or_(
+                sort_column < sort_value,
+                db.and_(sort_column == sort_value, id_column < record_id)
+            ))
+    else:
+        total = query.order_by(None).count()
+    
+    order = [id_column.desc()] if sort_column is None else [sort_column.desc(), id_column.desc()]
+    records = query.order_by(*order).limit(limit + 1).all()
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_page_cursor(getattr(last, sort_column.key) if sort_column is not None else None, last.id)
+    return records, next_cursor, total
+
+def page_response(items, next_cursor, total):
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    if total is not None:
+        response.headers['X-Total-Count'] = str(total)
+    return response
+
+MATERIAL_SUMMARY_FIELDS = {'id', 'title', 'date', 'deadline', 'fileCount'}
+ASSIGNMENT_SUMMARY_FIELDS = {'id', 'title', 'dueDate', 'points', 'dateCreated', 'submissionCount', 'gradedCount', 'submissions'}
+
+def serialize_material(material):
+    files = file_refs(material)
+    return {
+        'id': str(material.id),
+        'title': material.title,
+        'description': material.description,
+        'date': material.date.isoformat(),
+        'deadline': material.deadline.isoformat() if material.deadline else None,
+        'resourceLink': material.resource_link,
+        'files': files,
+        'fileCount': len(files)
+    }
+
+def serialize_submission(submission, student):
+    return {
+        'id': str(submission.id),
+        'studentId': str(submission.student_id),
+        'studentName': f"{student.first_name} {student.last_name}" if student else "Unknown",
+        'content': submission.content,
+        'date': submission.date.isoformat(),
+        'grade': submission.grade,  # ✅ Will be None if not graded
+        'feedback': submission.feedback,
+        'files': file_refs(submission)
+    }
+
+def serialize_assignment(assignment, submissions_data):
+    return {
+        'id': str(assignment.id),
+        'title': assignment.title,
+        'description': assignment.description,
+        'instructions': assignment.instructions,
+        'dueDate': assignment.due_date.isoformat(),
+        'points': assignment.points,
+        'dateCreated': assignment.date_created.isoformat(),
+        'files': file_refs(assignment),
+        'submissionCount': len(submissions_data),
+        'gradedCount': sum(1 for sub in submissions_data if sub['grade'] is not None),
+        'submissions': submissions_data  # ✅ Always include this
+    }
+
+def viewing_student_id():
+    """The logged-in student's id, or None for a professor, who sees every submission"""
+    return session['user_id'] if session.get('user_type') == 'student' else None
+
+def load_submissions_by_assignment(assignment_ids, summary=False, student_id=None):
+    """Submissions (and their students' names) for many assignments in two queries; one student's when given"""
+    query = Submission.query.filter(Submission.assignment_id.in_(assignment_ids))
+    if student_id is not None:
+        query = query.filter(Submission.student_id == student_id)
+    if not summary:
+        query = query.options(db.selectinload(Submission.attachments))
+    submissions = query.all() if assignment_ids else []
+    
+    students = {}
+    if submissions and not summary:
+        student_ids = {sub.student_id for sub in submissions}
+        students = {st.id: st for st in Student.query.options(db.lazyload(Student.classes)).filter(
+            Student.id.in_(student_ids)
+        ).all()}
+    
+    by_assignment = {assignment_id: [] for assignment_id in assignment_ids}
+    for sub in submissions:
+        if summary:
+            # Grade status only; content, feedback and files come from the detail endpoint
+            by_assignment[sub.assignment_id].append({
+                'id': str(sub.id),
+                'studentId': str(sub.student_id),
+                'date': sub.date.isoformat(),
+                'grade': sub.grade
             })
+        else:
+            by_assignment[sub.assignment_id].append(serialize_submission(sub, students.get(sub.student_id)))
+    return by_assignment
+
+# Get materials for a class
+@app.route('/api/professor/classes/<class_id>/materials', methods=['GET'])
+@requires_class_member
+def get_class_materials(class_id):
+    try:
+        materials, next_cursor, total = paginate(
+            Material.query.options(db.selectinload(Material.attachments)).filter_by(class_id=class_id),
+            Material.date, Material.id
+        )
+        materials_data = [serialize_material(material) for material in materials]
         
-        return jsonify(assignments_data), 200
+        return page_response(project_fields(materials_data, MATERIAL_SUMMARY_FIELDS), next_cursor, total), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid page cursor'}), 400
+    except Exception as e:
+        print(f"Error fetching materials: {e}")
+        return jsonify({'error': 'Failed to fetch materials'}), 500
+
+
+# Get assignments for a class
+@app.route('/api/professor/classes/<class_id>/assignments', methods=['GET'])
+@requires_class_member
+def get_class_assignments(class_id):
+    try:
+        assignments, next_cursor, total = paginate(
+            Assignment.query.options(db.selectinload(Assignment.attachments)).filter_by(class_id=class_id),
+            Assignment.due_date, Assignment.id
+        )
+        
+        # ✅ FIX: Always include ALL submissions
+        summary = request.args.get('view') == 'summary'
+        submissions_by_assignment = load_submissions_by_assignment([a.id for a in assignments], summary=summary,
+                                                                   student_id=viewing_student_id())
+        
+        assignments_data = [
+            serialize_assignment(assignment, submissions_by_assignment[assignment.id])
+            for assignment in assignments
+        ]
+        
+        return page_response(project_fields(assignments_data, ASSIGNMENT_SUMMARY_FIELDS), next_cursor, total), 200
+        
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid page cursor'}), 400
     except Exception as e:
         print(f"Error fetching assignments: {e}")
         return jsonify({'error': 'Failed to fetch assignments'}), 500
 
+# Detail endpoints: the heavy bodies that summary list views leave out
+@app.route('/api/professor/materials/<material_id>', methods=['GET'])
+def get_material_detail(material_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    material = Material.query.get(material_id)
+    if not material or not can_access_class(material.class_id):
+        return jsonify({'error': 'Material not found'}), 404
+    
+    return jsonify(serialize_material(material)), 200
+
+@app.route('/api/professor/assignments/<assignment_id>', methods=['GET'])
+def get_assignment_detail(assignment_id):
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    assignment = Assignment.query.get(assignment_id)
+    if not assignment or not can_access_class(assignment.class_id):
+        return jsonify({'error': 'Assignment not found'}), 404
+    
+    submissions_data = load_submissions_by_assignment([assignment.id], student_id=viewing_student_id())[assignment.id]
+    return jsonify(serialize_assignment(assignment, submissions_data)), 200
+
+@app.route('/api/professor/submissions/<submission_id>', methods=['GET'])
+def get_submission_detail(submission_id):
+    if 'user_id' not in session or session.get('user_type') != 'professor':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    submission = Submission.query.get(submission_id)
+    if not submission:
+        return jsonify({'error': 'Submission not found'}), 404
+    
+    if not owns_class(submission.assignment.class_id):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return jsonify(serialize_submission(submission, Student.query.get(submission.student_id))), 200
+
+@app.route('/api/professor/storage', methods=['GET'])
+def get_storage_usage():
+    """Attachment count and bytes per class, as one aggregate over the attachment table.
+
+    Bytes are the stored blobs' sizes; links and legacy files only report a
+    client-supplied size, so they count as files but not as storage.
+    """
+    if 'user_id' not in session or session.get('user_type') != 'professor':
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    rows = db.session.query(
+        Class.id,
+        Class.name,
+        db.func.count(Attachment.id),
+        db.func.coalesce(db.func.sum(Blob.size), 0)
+    ).outerjoin(Attachment, Attachment.class_id == Class.id).outerjoin(
+        Blob, Blob.sha256 == Attachment.blob_sha256
+    ).filter(
+        Class.professor_id == session['user_id']
+    ).group_by(Class.id, Class.name).all()
+    
+    classes = [{
+        'id': str(class_id),
+        'name': name,
+        'fileCount': file_count,
+        'totalBytes': int(total_bytes)
+    } for class_id, name, file_count, total_bytes in rows]
+    
+    return jsonify({
+        'classes': classes,
+        'totalBytes': sum(c['totalBytes'] for c in classes)
+    }), 200
+
+# ===============================
+# GRADEBOOK
+# ===============================
+
+def refresh_gradebook_students(class_id, student_ids=None):
+    """Recompute per-student totals for a class (all enrolled students when ``student_ids`` is None).
+
+    One GROUP BY bounded by the class, so keeping totals current on every
+    grade change costs O(class), not O(submissions). Rows are upserted and
+    only vanished keys deleted, so concurrent refreshes of the same student
+    (a grade and a resubmit) never collide on the primary key. The caller commits.
+    """
+    stale = GradebookStudent.query.filter_by(class_id=class_id)
+    totals = db.session.query(
+        enrollments.c.student_id,
+        db.func.count(Submission.id),
+        db.func.count(Submission.grade),
+        db.func.coalesce(db.func.sum(Submission.grade), 0),
+        db.func.coalesce(db.func.sum(db.case((Submission.grade.isnot(None), Assignment.points))), 0)
+    ).select_from(enrollments).join(
+        Assignment, Assignment.class_id == enrollments.c.class_id
+    ).join(
+        Submission, db.and_(Submission.assignment_id == Assignment.id,
+                            Submission.student_id == enrollments.c.student_id)
+    ).filter(enrollments.c.class_id == class_id)
+    if student_ids is not None:
+        stale = stale.filter(GradebookStudent.student_id.in_(student_ids))
+        totals = totals.filter(enrollments.c.student_id.in_(student_ids))
+    
+    rows = [{
+        'class_id': class_id,
+        'student_id': student_id,
+        'submitted_count': submitted,
+        'graded_count': graded,
+        'points_earned': earned,
+        'points_possible': possible
+    } for student_id, submitted, graded, earned, possible in totals.group_by(enrollments.c.student_id)]
+    stale.filter(GradebookStudent.student_id.notin_([row['student_id'] for row in rows])).delete(
+        synchronize_session=False)
+    if rows:
+        db.session.execute(upsert_statement(
+            GradebookStudent, rows, ['class_id', 'student_id'],
+            ['submitted_count', 'graded_count', 'points_earned', 'points_possible']
+        ))
+
+def refresh_gradebook_assignments(class_id, assignment_ids=None):
+    """Recompute per-assignment totals over enrolled students' submissions; the caller commits"""
+    stale = GradebookAssignment.query.filter_by(class_id=class_id)
+    totals = db.session.query(
+        Assignment.id,
+        db.func.count(Submission.id),
+        db.func.count(Submission.grade),
+        db.func.coalesce(db.func.sum(Submission.grade), 0)
+    ).join(
+        Submission, Submission.assignment_id == Assignment.id
+    ).join(
+        enrollments, db.and_(enrollments.c.class_id == Assignment.class_id,
+                             enrollments.c.student_id == Submission.student_id)
+    ).filter(Assignment.class_id == class_id)
+    if assignment_ids is not None:
+        stale = stale.filter(GradebookAssignment.assignment_id.in_(assignment_ids))
+        totals = totals.filter(Assignment.id.in_(assignment_ids))
+    
+    rows = [{
+        'assignment_id': assignment_id,
+        'class_id': class_id,
+        'submitted_count': submitted,
+        'graded_count': graded,
+        'grade_sum': grade_sum
+    } for assignment_id, submitted, graded, grade_sum in totals.group_by(Assignment.id)]
+    stale.filter(GradebookAssignment.assignment_id.notin_([row['assignment_id'] for row in rows])).delete(
+        synchronize_session=False)
+    if rows:
+        db.session.execute(upsert_statement(
+            GradebookAssignment, rows, ['assignment_id'], ['class_id', 'submitted_count', 'graded_count', 'grade_sum']
+        ))
+
+def delete_gradebook(class_id):
+    GradebookStudent.query.filter_by(class_id=class_id).delete(synchronize_session=False)
+    GradebookAssignment.query.filter_by(class_id=class_id).delete(synchronize_session=False)
+
+def percentage(part, whole):
+    return round(part / whole * 100, 2) if whole else None
+
+def build_gradebook(class_id):
+    """Columnar gradebook: parallel arrays per axis plus a students x assignments grade matrix"""
+    assignments = db.session.query(
+        Assignment.id, Assignment.title, Assignment.points, Assignment.due_date,
+        GradebookAssignment.submitted_count, GradebookAssignment.graded_count, GradebookAssignment.grade_sum
+    ).outerjoin(
+        GradebookAssignment, GradebookAssignment.assignment_id == Assignment.id
+    ).filter(Assignment.class_id == class_id).order_by(Assignment.due_date, Assignment.id).all()
+    
+    students = db.session.query(
+        Student.id, Student.first_name, Student.last_name, Student.student_id, Student.username,
+        GradebookStudent.submitted_count, GradebookStudent.graded_count,
+        GradebookStudent.points_earned, GradebookStudent.points_possible
+    ).join(
+        enrollments, enrollments.c.student_id == Student.id
+    ).outerjoin(
+        GradebookStudent, db.and_(GradebookStudent.class_id == class_id, GradebookStudent.student_id == Student.id)
+    ).filter(enrollments.c.class_id == class_id).order_by(Student.last_name, Student.first_name, Student.id).all()
+    
+    column = {a.id: index for index, a in enumerate(assignments)}
+    row = {st.id: index for index, st in enumerate(students)}
+    grades = [[None] * len(assignments) for _ in students]
+    submitted = [[0] * len(assignments) for _ in students]
+    for assignment_id, student_id, grade in db.session.query(
+        Submission.assignment_id, Submission.student_id, Submission.grade
+    ).join(Assignment).filter(Assignment.class_id == class_id):
+        if student_id in row and assignment_id in column:
+            submitted[row[student_id]][column[assignment_id]] = 1
+            grades[row[student_id]][column[assignment_id]] = grade
+    
+    return {
+        'classId': str(class_id),
+        'assignments': {
+            'id': [str(a.id) for a in assignments],
+            'title': [a.title for a in assignments],
+            'points': [a.points for a in assignments],
+            'dueDate': [a.due_date.isoformat() for a in assignments],
+            'submittedCount': [a.submitted_count or 0 for a in assignments],
+            'gradedCount': [a.graded_count or 0 for a in assignments],
+            'average': [round(a.grade_sum / a.graded_count, 2) if a.graded_count else None for a in assignments]
+        },
+        'students': {
+            'id': [str(st.id) for st in students],
+            'name': [f"{st.first_name} {st.last_name}" for st in students],
+            'studentId': [st.student_id for st in students],
+            'email': [st.username for st in students],
+            'submittedCount': [st.submitted_count or 0 for st in students],
+            'gradedCount': [st.graded_count or 0 for st in students],
+            'pointsEarned': [st.points_earned or 0 for st in students],
+            'pointsPossible': [st.points_possible or 0 for st in students],
+            'average': [percentage(st.points_earned, st.points_possible) for st in students]
+        },
+        'grades': grades,  # Rows follow students, columns follow assignments; null = not graded
+        'submitted': submitted
+    }
+
+def gradebook_csv_rows(gradebook):
+    assignments = gradebook['assignments']
+    students = gradebook['students']
+    yield ['Student', 'Student ID', 'Email'] + [
+        f"{title} ({points})" for title, points in zip(assignments['title'], assignments['points'])
+    ] + ['Points Earned', 'Points Possible', 'Average (%)']
+    
+    for index, grades in enumerate(gradebook['grades']):
+        cells = [
+            grade if grade is not None else ('submitted' if flag else '-')
+            for grade, flag in zip(grades, gradebook['submitted'][index])
+        ]
+        average = students['average'][index]
+        yield [students['name'][index], students['studentId'][index] or '', students['email'][index]] + cells + [
+            students['pointsEarned'][index], students['pointsPossible'][index], average if average is not None else '-'
+        ]
+
+def stream_csv(rows):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+@app.route('/api/professor/classes/<int:class_id>/gradebook', methods=['GET'])
+@requires_class_owner
+def get_gradebook(class_id):
+    gradebook = build_gradebook(class_id)
+    if request.args.get('format') == 'csv':
+        filename = secure_filename(f"{Class.query.get(class_id).name}_grades.csv") or 'grades.csv'
+        return Response(stream_csv(gradebook_csv_rows(gradebook)), mimetype='text/csv', headers={
+            'Content-Disposition': f'attachment; filename="{filename}"'
+        })
+    return jsonify(gradebook), 200
+
+# ===============================
+# SEARCH
+# ===============================
+
+# Ranked full-text search over materials, assignments and submissions in the
+# caller's classes. PostgreSQL matches the GIN-indexed tsvector expressions
+# below; SQLite matches the search_* FTS5 tables. The database keeps both
+# current on write (see migration 0c5e93a7d41b). Pages are by offset, since a
+# rank is not a stable keyset.
+SEARCH_KINDS = ('material', 'assignment', 'submission')
+SEARCH_MAX_TERMS = 8
+
+# Must match VECTORS in the migration, or PostgreSQL will not use the indexes
+SEARCH_VECTORS = {
+    'material': "setweight(to_tsvector('english', coalesce(material.title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(material.description, '')), 'B')",
+    'assignment': "setweight(to_tsvector('english', coalesce(assignment.title, '')), 'A') || "
+                  "setweight(to_tsvector('english', coalesce(assignment.description, '')), 'B') || "
+                  "setweight(to_tsvector('english', coalesce(assignment.instructions, '')), 'C')",
+    'submission': "to_tsvector('english', coalesce(submission.content, ''))",
+}
+SEARCH_HEADLINE_TEXT = {
+    'material': "coalesce(material.description, '')",
+    'assignment': "concat_ws(' ', assignment.description, assignment.instructions)",
+    'submission': "submission.content",
+}
+SEARCH_BM25_WEIGHTS = {'material': '10.0, 1.0', 'assignment': '10.0, 2.0, 1.0', 'submission': '1.0'}
+SEARCH_JOINS = {
+    'material': 'JOIN class ON class.id = material.class_id',
+    'assignment': 'JOIN class ON class.id = assignment.class_id',
+    'submission': 'JOIN assignment ON assignment.id = submission.assignment_id '
+                  'JOIN class ON class.id = assignment.class_id',
+}
+SEARCH_DETAIL_COLUMNS = {
+    'material': 'material.id, material.class_id, class.name AS class_name, material.title, '
+                'material.date AS date, NULL AS assignment_id, NULL AS student_id',
+    'assignment': 'assignment.id, assignment.class_id, class.name AS class_name, assignment.title, '
+                  'assignment.due_date AS date, NULL AS assignment_id, NULL AS student_id',
+    'submission': 'submission.id, assignment.class_id, class.name AS class_name, assignment.title, '
+                  'submission.date AS date, submission.assignment_id, submission.student_id',
+}
+
+def search_terms(text):
+    return re.findall(r'[^\W_]+', text.lower())[:SEARCH_MAX_TERMS]
+
+def search_match(terms):
+    """Every term must match; the last is a prefix so results follow the user's typing"""
+    if db.engine.dialect.name == 'postgresql':
+        return ' & '.join(terms) + ':*'
+    return ' '.join(f'"{term}"' for term in terms) + '*'
+
+def search_source(kind):
+    """FROM/WHERE matching :match against one kind"""
+    if db.engine.dialect.name == 'postgresql':
+        return (f"FROM {kind} {SEARCH_JOINS[kind]}, to_tsquery('english', :match) query "
+                f"WHERE {SEARCH_VECTORS[kind]} @@ query")
+    return (f"FROM search_{kind} JOIN {kind} ON {kind}.id = search_{kind}.rowid {SEARCH_JOINS[kind]} "
+            f"WHERE search_{kind} MATCH :match")
+
+def search_rank(kind):
+    """Higher is better on both backends"""
+    if db.engine.dialect.name == 'postgresql':
+        return f"ts_rank_cd({SEARCH_VECTORS[kind]}, query)"
+    return f"-bm25(search_{kind}, {SEARCH_BM25_WEIGHTS[kind]})"
+
+def search_snippet(kind):
+    if db.engine.dialect.name == 'postgresql':
+        return (f"ts_headline('english', {SEARCH_HEADLINE_TEXT[kind]}, query, "
+                f"'StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8')")
+    return f"snippet(search_{kind}, -1, '<mark>', '</mark>', '…', 16)"
+
+def search_scope(kind, user_type):
+    """Professors search every class they own, archived ones included; students their enrolled classes and own work"""
+    if user_type == 'professor':
+        scope = 'class.professor_id = :user_id'
+    else:
+        scope = 'class.id IN (SELECT class_id FROM enrollments WHERE student_id = :user_id)'
+        if kind == 'submission':
+            scope += ' AND submission.student_id = :user_id'
+    return scope
+
+def encode_offset_cursor(offset):
+    return base64.urlsafe_b64encode(json.dumps([offset]).encode()).decode().rstrip('=')
+
+def decode_offset_cursor(cursor):
+    try:
+        (offset,) = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        offset = int(offset)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursor(str(e))
+    if offset < 0:
+        raise InvalidCursor('Negative offset')
+    return offset
+
+def run_search(terms, user_type, user_id, kinds, class_id, offset, limit):
+    """One page of ranked hits; returns (items, has_more).
+
+    The ranking query only carries (kind, id, rank), so snippets and names are
+    built for the page rows alone, one query per kind.
+    """
+    params = {'match': search_match(terms), 'user_id': user_id, 'class_id': class_id}
+    class_filter = ' AND class.id = :class_id' if class_id is not None else ''
+    ranked = ' UNION ALL '.join(
+        f"SELECT '{kind}' AS kind, {kind}.id AS id, {search_rank(kind)} AS rank "
+        f"{search_source(kind)} AND {search_scope(kind, user_type)}{class_filter}"
+        for kind in kinds
+    ) + ' ORDER BY rank DESC, kind, id LIMIT :limit OFFSET :offset'
+    hits = db.session.execute(db.text(ranked), dict(params, limit=limit + 1, offset=offset)).all()
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+
+    details = {}
+    for kind in kinds:
+        ids = [hit.id for hit in hits if hit.kind == kind]
+        if not ids:
+            continue
+        statement = db.text(
+            f"SELECT {SEARCH_DETAIL_COLUMNS[kind]}, {search_snippet(kind)} AS snippet "
+            f"{search_source(kind)} AND {kind}.id IN :ids"
+        ).bindparams(db.bindparam('ids', expanding=True)).columns(date=db.DateTime)
+        for row in db.session.execute(statement, {'match': params['match'], 'ids': ids}):
+            details[kind, row.id] = row
+
+    student_ids = {row.student_id for row in details.values() if row.student_id}
+    students = {s.id: f"{s.first_name or ''} {s.last_name or ''}".strip() for s in db.session.query(
+        Student.id, Student.first_name, Student.last_name
+    ).filter(Student.id.in_(student_ids))} if student_ids and user_type == 'professor' else {}
+
+    items = []
+    for hit in hits:
+        row = details.get((hit.kind, hit.id))
+        if row is None:
+            continue  # Deleted between the two queries
+        item = {
+            'type': hit.kind,
+            'id': str(row.id),
+            'classId': str(row.class_id),
+            'className': row.class_name,
+            'title': row.title,
+            'snippet': row.snippet,
+            'date': row.date.isoformat() if row.date else None
+        }
+        if hit.kind == 'submission':
+            item['assignmentId'] = str(row.assignment_id)
+            item['studentId'] = str(row.student_id)
+            if students:
+                item['studentName'] = students.get(row.student_id)
+        items.append(item)
+    return items, has_more
+
+@app.route('/api/search')
+def search():
+    """Ranked search: ?q= text, optional ?class_id= and ?type=material,assignment,submission.
+
+    Returns one page as an array; snippets mark matches with <mark>. The next
+    page's cursor is in X-Next-Cursor.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    terms = search_terms(request.args.get('q', ''))
+    if not terms:
+        return page_response([], None, 0)
+
+    kinds = [kind for kind in request.args.get('type', ','.join(SEARCH_KINDS)).split(',') if kind in SEARCH_KINDS]
+    if not kinds:
+        return jsonify({'error': f"type must be one of {', '.join(SEARCH_KINDS)}"}), 400
+    class_id = request.args.get('class_id', type=int)
+
+    try:
+        offset = decode_offset_cursor(request.args['cursor']) if request.args.get('cursor') else 0
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid page cursor'}), 400
+    limit = page_limit()
+
+    try:
+        items, has_more = run_search(terms, session.get('user_type'), session['user_id'],
+                                     kinds, class_id, offset, limit)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error searching: {e}")
+        return jsonify({'error': 'Search failed'}), 500
+
+    return page_response(items, encode_offset_cursor(offset + limit) if has_more else None, None)
+
 # Add this route to handle calendar event updates
 @app.route('/api/calendar/events', methods=['GET', 'POST'])
 def manage_calendar_events():
@@ -1966,41 +4695,801 @@ def update_avatar():
     if not avatar_data:
         return jsonify({'error': 'No avatar data provided'}), 400
     
+    if not avatar_data.startswith('data:image/') or ';base64,' not in avatar_data:
+        return jsonify({'error': 'Avatar must be an image data URL'}), 400
+    
+    header, encoded = avatar_data.split(',', 1)
+    content_type = header[len('data:'):].split(';', 1)[0]
+    if content_type not in AVATAR_CONTENT_TYPES:
+        return jsonify({'error': 'Avatar must be a PNG, JPEG, GIF or WebP image'}), 400
+    
     try:
-        # ✅ Save avatar to database as base64
-        if user_type == 'student':
-            user = Student.query.get(user_id)
-            if not user:
-                return jsonify({'error': 'Student not found'}), 404
-            
-            # Add avatar column if it doesn't exist
-            if not hasattr(user, 'avatar'):
-                # Create migration later, for now store in a new table
-                pass
-            
-            # ✅ For now, return success - avatar is stored in localStorage
-            return jsonify({'message': 'Avatar updated successfully'}), 200
-        else:
-            user = Professor.query.get(user_id)
-            if not user:
-                return jsonify({'error': 'Professor not found'}), 404
-            
-            return jsonify({'message': 'Avatar updated successfully'}), 200
+        user = Student.query.get(user_id) if user_type == 'student' else Professor.query.get(user_id)
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        # ✅ Store the image in the blob store; the row only keeps its URL
+        blob = blob_store.save(BytesIO(base64.b64decode(encoded)), content_type)
+        user.avatar_url = blob_store.url_for(blob)
+        db.session.commit()
+        user_cache.invalidate((user_type, user_id))
+        
+        return jsonify({'message': 'Avatar updated successfully', 'avatar': user.avatar_url}), 200
             
+    except (binascii.Error, ValueError):
+        return jsonify({'error': 'Invalid avatar data'}), 400
     except Exception as e:
+        db.session.rollback()
         print(f"Error updating avatar: {e}")
         return jsonify({'error': 'Failed to update avatar'}), 500
 
 @app.route('/api/profile/avatar/<user_type>/<user_id>')
 def get_avatar(user_type, user_id):
-    """Get user avatar from database or localStorage cache"""
+    """Get user avatar URL from database; clients fall back to their localStorage copy"""
     try:
-        # For now, return empty - client will use localStorage
-        # In production, you'd fetch from database
-        return jsonify({'avatar': None}), 200
+        model = Student if user_type == 'student' else Professor
+        avatar_url = db.session.query(model.avatar_url).filter(model.id == int(user_id)).scalar()
+        return jsonify({'avatar': avatar_url}), 200
+    except ValueError:
+        return jsonify({'error': 'Invalid user ID'}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# ===============================
+# CHANGE EVENTS (SERVER-SENT EVENTS)
+# ===============================
+
+SSE_KEEPALIVE_SECONDS = 15
+SSE_MAX_STREAM_SECONDS = 300  # Clients reconnect, which also picks up newly joined classes
+SSE_QUEUE_SIZE = 100
+# Each open stream holds a gunicorn thread (--threads 16 in the Procfile); past this
+# many per process, clients get a 503 and fall back to polling, so streams can never
+# starve ordinary requests
+SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', '4'))
+SSE_RETRY_SECONDS = 60
+
+sse_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+class InProcessSubscription:
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = channels
+        self.queue = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class InProcessBroker:
+    """Fan-out inside one process; enough for a single gunicorn worker"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, channels):
+        subscription = InProcessSubscription(self, channels)
+        with self._lock:
+            for channel in channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                pass  # Slow client; it will catch up through the delta sync
+
+class RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def get(self, timeout):
+        message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if not message:
+            return None
+        return json.loads(message['data'])
+
+    def close(self):
+        self.pubsub.close()
+
+class RedisBroker:
+    """Fan-out across gunicorn workers through any Redis-protocol server (redis, valkey, a local stand-in)"""
+
+    def __init__(self, url):
+        import redis  # Optional dependency, only needed when EVENT_BROKER_URL is set
+        self._client = redis.Redis.from_url(url)
+
+    def subscribe(self, channels):
+        pubsub = self._client.pubsub()
+        pubsub.subscribe(*channels)
+        return RedisSubscription(pubsub)
+
+    def publish(self, channel, event):
+        self._client.publish(channel, json.dumps(event))
+
+def create_event_broker():
+    broker_url = os.environ.get('EVENT_BROKER_URL')
+    if broker_url:
+        return RedisBroker(broker_url)
+    return InProcessBroker()
+
+event_broker = create_event_broker()
+
+def publish_change(channels, event_type, **payload):
+    """Tell connected dashboards that something changed; never fails the request"""
+    event = dict(payload, type=event_type, timestamp=datetime.utcnow().isoformat())
+    for channel in channels:
+        try:
+            event_broker.publish(channel, event)
+        except Exception as e:
+            print(f"Error publishing {event_type} event: {e}")
+
+def sse_stream(subscription):
+    try:
+        yield 'retry: 5000\n\n'
+        deadline = time.monotonic() + SSE_MAX_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            event = subscription.get(timeout=SSE_KEEPALIVE_SECONDS)
+            if event is None:
+                yield ': keep-alive\n\n'
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    finally:
+        subscription.close()
+
+@app.route('/api/events')
+def change_events():
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    if not sse_slots.acquire(blocking=False):
+        response = jsonify({'error': 'Too many open event streams, poll instead'})
+        response.headers['Retry-After'] = str(SSE_RETRY_SECONDS)
+        return response, 503
+    
+    try:
+        channels = [f"{session.get('user_type')}:{session['user_id']}"]
+        channels += [f'class:{class_id}' for class_id in sorted(user_class_ids())]
+        subscription = event_broker.subscribe(channels)
+    except Exception:
+        sse_slots.release()
+        raise
+    
+    response = Response(sse_stream(subscription), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # The WSGI server closes the body when the stream ends or the client goes away
+    response.call_on_close(sse_slots.release)
+    return response
+
+# ===============================
+# NOTIFICATIONS
+# ===============================
+
+# Notifications are fanned out when the event is written (one row per
+# recipient) so a client check is one range read on ix_notification_recipient
+# past its ?after= cursor. Read state is a single per-user watermark.
+NOTIFICATION_COLUMNS = ['recipient_type', 'recipient_id', 'type', 'title', 'message',
+                        'class_id', 'assignment_id', 'created_at']
+NOTIFICATION_RETENTION_DAYS = 90  # `flask cleanup` deletes notifications older than this
+
+def notify_class(class_id, notification_type, title, message, assignment_id=None, unsubmitted_only=False):
+    """Notify every student enrolled in a class with one INSERT ... SELECT (committed by the caller).
+
+    With ``unsubmitted_only`` students who already submitted ``assignment_id`` are skipped.
+    """
+    recipients = db.select(
+        db.literal('student'), enrollments.c.student_id, db.literal(notification_type),
+        db.literal(title), db.literal(message), db.literal(class_id),
+        db.literal(assignment_id, db.Integer), db.literal(datetime.utcnow())
+    ).where(enrollments.c.class_id == class_id)
+    if unsubmitted_only:
+        recipients = recipients.where(~db.exists().where(
+            Submission.assignment_id == assignment_id,
+            Submission.student_id == enrollments.c.student_id
+        ))
+    db.session.execute(db.insert(Notification).from_select(NOTIFICATION_COLUMNS, recipients))
+
+def notify_users(recipient_type, notifications):
+    """Insert per-recipient notifications in one executemany (committed by the caller).
+
+    ``notifications`` is a list of dicts with ``recipient_id``, ``type``,
+    ``title``, ``message`` and optionally ``class_id``/``assignment_id``.
+    """
+    if not notifications:
+        return
+    now = datetime.utcnow()
+    db.session.execute(db.insert(Notification), [
+        dict({'class_id': None, 'assignment_id': None}, **n, recipient_type=recipient_type, created_at=now)
+        for n in notifications
+    ])
+
+def grade_notifications(student_id, assignment, class_name, grade, feedback=None):
+    """The Grade Released notification, plus Feedback Received when there is feedback"""
+    base = {'recipient_id': student_id, 'class_id': assignment.class_id, 'assignment_id': assignment.id}
+    notifications = [dict(base, type='grade', title='Grade Released',
+                          message=f'"{assignment.title}" - {grade:g}/{assignment.points} ({class_name})')]
+    if feedback:
+        notifications.append(dict(base, type='feedback', title='Feedback Received',
+                                  message=f'Your professor left feedback on "{assignment.title}"'))
+    return notifications
+
+def serialize_notification(n, last_read_id):
+    return {
+        'id': n.id,
+        'type': n.type,
+        'title': n.title,
+        'message': n.message,
+        'classId': str(n.class_id) if n.class_id else None,
+        'assignmentId': str(n.assignment_id) if n.assignment_id else None,
+        'createdAt': n.created_at.isoformat(),
+        'read': n.id <= last_read_id
+    }
+
+def notification_last_read_id(recipient_type, recipient_id):
+    return db.session.query(NotificationCursor.last_read_id).filter_by(
+        recipient_type=recipient_type, recipient_id=recipient_id
+    ).scalar() or 0
+
+@app.route('/api/notifications', methods=['GET'])
+def get_notifications():
+    """The oldest ``limit`` notifications after ?after=, oldest first, plus the unread count.
+
+    Clients pass back ``cursor`` as the next ?after= and ask again while
+    ``hasMore`` is set, so a burst larger than one page is never skipped and
+    an idle check reads nothing but the index.
+    """
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    recipient_type, recipient_id = session.get('user_type'), session['user_id']
+    try:
+        after = max(int(request.args.get('after', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    limit = page_limit()
+
+    mine = Notification.query.filter_by(recipient_type=recipient_type, recipient_id=recipient_id)
+    notifications = mine.filter(Notification.id > after).order_by(Notification.id).limit(limit + 1).all()
+    has_more = len(notifications) > limit
+    notifications = notifications[:limit]
+    last_read_id = notification_last_read_id(recipient_type, recipient_id)
+    unread = mine.filter(Notification.id > last_read_id).count()
+
+    return jsonify({
+        'items': [serialize_notification(n, last_read_id) for n in notifications],
+        'cursor': notifications[-1].id if notifications else after,
+        'hasMore': has_more,
+        'unread': unread
+    })
+
+@app.route('/api/notifications/read', methods=['POST'])
+def mark_notifications_read():
+    """Move the read watermark up to ``upTo`` (default: everything so far)"""
+    if 'user_id' not in session:
+        return jsonify({'error': 'Unauthorized'}), 401
+
+    recipient_type, recipient_id = session.get('user_type'), session['user_id']
+    data = request.get_json(silent=True) or {}
+    latest = db.session.query(db.func.max(Notification.id)).filter_by(
+        recipient_type=recipient_type, recipient_id=recipient_id
+    ).scalar() or 0
+    try:
+        up_to = min(int(data.get('upTo', latest)), latest)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid notification id'}), 400
+
+    last_read_id = notification_last_read_id(recipient_type, recipient_id)
+    try:
+        if up_to > last_read_id:
+            db.session.execute(upsert_statement(
+                NotificationCursor,
+                {'recipient_type': recipient_type, 'recipient_id': recipient_id,
+                 'last_read_id': up_to, 'updated_at': datetime.utcnow()},
+                ['recipient_type', 'recipient_id'],
+                ['last_read_id', 'updated_at']
+            ))
+            db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error marking notifications read: {e}")
+        return jsonify({'error': 'Failed to update notifications'}), 500
+
+    return jsonify({'lastReadId': max(up_to, last_read_id)}), 200
+
+# ===============================
+# DEADLINE SCHEDULER
+# ===============================
+
+# A worker keeps a min-heap of the deadline events due in the next
+# DEADLINE_LOAD_SECONDS, read from the deadline indexes: reminder stages
+# (DEADLINE_REMINDERS before each Assignment.due_date / Material.deadline) and
+# assignment closes. Each event is claimed with a conditional UPDATE on
+# reminders_sent / closed_at, so several workers never fire one twice.
+
+def parse_reminder_offsets(spec):
+    """'3d,1d,1h' -> the offsets before a deadline, longest first"""
+    units = {'m': 'minutes', 'h': 'hours', 'd': 'days'}
+    offsets = []
+    for part in spec.split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        try:
+            offsets.append(timedelta(**{units[part[-1]]: float(part[:-1])}))
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid DEADLINE_REMINDERS offset: {part!r}")
+    return sorted(offsets, reverse=True)
+
+DEADLINE_REMINDERS = parse_reminder_offsets(os.environ.get('DEADLINE_REMINDERS', '3d,1d,1h'))
+DEADLINE_LOAD_SECONDS = 300  # How far ahead each heap load reads; also bounds how late another process's edits are seen
+DEADLINE_RETRY_SECONDS = 30
+
+def utc_naive(value):
+    """Deadlines parsed from client ISO strings carry +00:00; the columns hold naive UTC"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def reminders_due(deadline, now):
+    """How many reminder stages of ``deadline`` have come due by ``now``"""
+    return sum(1 for offset in DEADLINE_REMINDERS if deadline - offset <= now)
+
+def format_time_left(delta):
+    minutes = max(round(delta.total_seconds() / 60), 1)
+    for unit, size in (('day', 1440), ('hour', 60), ('minute', 1)):
+        if minutes >= size:
+            count = round(minutes / size)
+            return f"{count} {unit}{'s' if count != 1 else ''}"
+
+def reminder_events(kind, record_id, deadline, sent, now, until):
+    """Outstanding reminder stages before ``until``; stages missed while no worker ran collapse into one"""
+    if deadline <= now:
+        return []
+    due = reminders_due(deadline, now)
+    events = [(now, kind, record_id, due - 1, deadline)] if due > sent else []
+    for stage in range(max(sent, due), len(DEADLINE_REMINDERS)):
+        fire_at = deadline - DEADLINE_REMINDERS[stage]
+        if fire_at <= until:
+            events.append((fire_at, kind, record_id, stage, deadline))
+    return events
+
+def load_deadline_events(now, until):
+    """Every (fire_at, kind, id, stage, deadline) event up to ``until``, from two indexed range reads"""
+    reach = until + (DEADLINE_REMINDERS[0] if DEADLINE_REMINDERS else timedelta(0))
+    events = []
+    for a in db.session.query(Assignment.id, Assignment.due_date, Assignment.reminders_sent).filter(
+        Assignment.closed_at.is_(None), Assignment.due_date <= reach
+    ).all():
+        events += reminder_events('assignment', a.id, a.due_date, a.reminders_sent, now, until)
+        if a.due_date <= until:
+            events.append((max(a.due_date, now), 'close', a.id, 0, a.due_date))
+    for m in db.session.query(Material.id, Material.deadline, Material.reminders_sent).filter(
+        Material.deadline > now, Material.deadline <= reach
+    ).all():
+        events += reminder_events('material', m.id, m.deadline, m.reminders_sent, now, until)
+    return events
+
+def send_deadline_reminder(model, record_id, stage, deadline, now):
+    """Claim one reminder stage and notify the class; returns the class id, or None if already sent"""
+    deadline_column = model.due_date if model is Assignment else model.deadline
+    claimed = db.session.execute(
+        db.update(model)
+        .where(model.id == record_id, model.reminders_sent <= stage, deadline_column == deadline)
+        .values(reminders_sent=stage + 1, updated_at=model.updated_at)  # Not a client-visible change
+    ).rowcount
+    if not claimed:
+        return None
+
+    record = db.session.query(model.title, model.class_id, Class.name, Class.archived).join(
+        Class, Class.id == model.class_id
+    ).filter(model.id == record_id).one()
+    if not record.archived:
+        is_assignment = model is Assignment
+        notify_class(record.class_id, 'deadline', 'Upcoming Deadline',
+                     f'"{record.title}" due in {format_time_left(deadline - now)} ({record.name})',
+                     assignment_id=record_id if is_assignment else None, unsubmitted_only=is_assignment)
+    return record.class_id
+
+def close_assignment(assignment_id, deadline, now):
+    """Mark an assignment closed and tell the professor who missed it; returns the professor id, or None"""
+    claimed = db.session.execute(
+        db.update(Assignment)
+        .where(Assignment.id == assignment_id, Assignment.closed_at.is_(None),
+               Assignment.due_date == deadline, Assignment.due_date <= now)
+        .values(closed_at=now, updated_at=Assignment.updated_at)
+    ).rowcount
+    if not claimed:
+        return None
+
+    assignment = db.session.query(Assignment.title, Assignment.class_id, Class.name, Class.professor_id).join(
+        Class, Class.id == Assignment.class_id
+    ).filter(Assignment.id == assignment_id).one()
+    missed = db.session.query(db.func.count()).select_from(enrollments).filter(
+        enrollments.c.class_id == assignment.class_id,
+        ~db.exists().where(Submission.assignment_id == assignment_id,
+                           Submission.student_id == enrollments.c.student_id)
+    ).scalar()
+    if missed:
+        notify_users('professor', [{
+            'recipient_id': assignment.professor_id,
+            'type': 'deadline',
+            'title': 'Missed Submissions',
+            'message': f"{missed} student{'s' if missed != 1 else ''} missed \"{assignment.title}\" ({assignment.name})",
+            'class_id': assignment.class_id,
+            'assignment_id': assignment_id
+        }])
+    return assignment.professor_id
+
+def fire_deadline_event(event, now):
+    """Run one heap event in its own transaction; returns True if this worker fired it"""
+    fire_at, kind, record_id, stage, deadline = event
+    try:
+        if kind == 'close':
+            professor_id = close_assignment(record_id, deadline, now)
+            db.session.commit()
+            if professor_id is None:
+                return False
+            publish_change([f'professor:{professor_id}'], 'deadline', assignmentId=str(record_id))
+        else:
+            model = Assignment if kind == 'assignment' else Material
+            class_id = send_deadline_reminder(model, record_id, stage, deadline, now)
+            db.session.commit()
+            if class_id is None:
+                return False
+            publish_change([f'class:{class_id}'], 'deadline', classId=str(class_id))
+        return True
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error firing deadline event {kind} {record_id}: {e}")
+        return False
+
+class DeadlineQueue:
+    """Heap of the deadline events before ``loaded_until``; reloaded from the indexes when it runs out"""
+
+    def __init__(self):
+        self.events = []
+        self.loaded_until = None
+
+    def invalidate(self):
+        self.loaded_until = None
+
+    def run_due(self):
+        """Fire every due event; returns (fired, seconds until the next event or reload)"""
+        now = datetime.utcnow()
+        if self.loaded_until is None or now >= self.loaded_until:
+            self.loaded_until = now + timedelta(seconds=DEADLINE_LOAD_SECONDS)
+            self.events = load_deadline_events(now, self.loaded_until)
+            heapq.heapify(self.events)
+
+        fired = 0
+        while self.events and self.events[0][0] <= now:
+            fired += fire_deadline_event(heapq.heappop(self.events), now)
+
+        next_at = self.events[0][0] if self.events else self.loaded_until
+        return fired, max((min(next_at, self.loaded_until) - now).total_seconds(), 0)
+
+class DeadlineScheduler:
+    """Background thread draining a DeadlineQueue; wake() after a deadline is added or moved"""
+
+    def __init__(self):
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self.run, name='deadline-scheduler', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        self.start()
+        self._wakeup.set()
+
+    def run(self):
+        deadlines = DeadlineQueue()
+        while True:
+            try:
+                with app.app_context():
+                    _, timeout = deadlines.run_due()
+            except Exception as e:
+                print(f"Deadline scheduler error: {e}")
+                deadlines.invalidate()
+                timeout = DEADLINE_RETRY_SECONDS
+            if self._wakeup.wait(timeout):
+                self._wakeup.clear()
+                deadlines.invalidate()
+
+# DEADLINE_WORKER=external when a separate `flask run-scheduler` process fires deadlines
+deadline_scheduler = DeadlineScheduler() if os.environ.get('DEADLINE_WORKER', 'thread') == 'thread' else None
+
+def notify_deadline_scheduler():
+    if deadline_scheduler:
+        deadline_scheduler.wake()
+
+@app.before_request
+def start_deadline_scheduler():
+    if deadline_scheduler:
+        deadline_scheduler.start()
+
+# ===============================
+# DELTA SYNC
+# ===============================
+
+def record_tombstone(entity_type, entity_id, class_id=None, student_id=None, professor_id=None):
+    """Remember a delete so the next delta sync can report it (committed with the caller's session)"""
+    db.session.add(Tombstone(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        class_id=class_id,
+        student_id=student_id,
+        professor_id=professor_id
+    ))
+
+# updated_at is stamped from each worker's clock when the row is flushed, not when
+# it commits, so a cursor can run ahead of rows that become visible later. Deltas
+# re-read this window behind the cursor and clients drop what they already saw.
+SYNC_CURSOR_OVERLAP = timedelta(seconds=int(os.environ.get('SYNC_CURSOR_OVERLAP_SECONDS', '30')))
+
+def new_sync_cursor():
+    """Cursor handed to clients; taken before any reads so concurrent writes are picked up next time"""
+    return datetime.utcnow().isoformat()
+
+def change_key(kind, entity_id, stamp):
+    """Identifies one version of a row so clients can skip changes repeated by the overlap window"""
+    return f"{kind}:{entity_id}:{stamp.isoformat() if stamp else ''}"
+
+def parse_sync_cursor(cursor):
+    """Turn a ?since= cursor back into a datetime, or None if it is malformed"""
+    try:
+        return datetime.fromisoformat(cursor)
+    except (TypeError, ValueError):
+        return None
+
+def serialize_delta_material(m):
+    return {
+        'id': str(m.id),
+        'title': m.title,
+        'description': m.description,
+        'date': m.date.isoformat(),
+        'deadline': m.deadline.isoformat() if m.deadline else None,
+        'resourceLink': m.resource_link,
+        'files': file_refs(m)
+    }
+
+def serialize_delta_tombstones(tombstones):
+    return [{
+        'type': t.entity_type,
+        'id': str(t.entity_id),
+        'classId': str(t.class_id) if t.class_id else None
+    } for t in tombstones]
+
+def build_professor_delta(professor_id, since):
+    """Everything that changed in a professor's classes after ``since``.
+
+    Each collection is one indexed range query on ``updated_at`` (or
+    ``deleted_at`` for tombstones), so an idle poll returns an empty payload.
+    """
+    classes = Class.query.filter_by(professor_id=professor_id).all()
+    class_ids = [cls.id for cls in classes]
+    
+    materials = Material.query.options(db.selectinload(Material.attachments)).filter(
+        Material.class_id.in_(class_ids),
+        Material.updated_at > since
+    ).all()
+    assignments = {a.id: a for a in Assignment.query.filter(
+        Assignment.class_id.in_(class_ids),
+        Assignment.updated_at > since
+    ).all()}
+    submissions = Submission.query.options(db.selectinload(Submission.attachments)).join(Assignment).filter(
+        Assignment.class_id.in_(class_ids),
+        Submission.updated_at > since
+    ).all()
+    new_students = db.session.query(enrollments.c.class_id, enrollments.c.updated_at, Student).join(
+        Student, Student.id == enrollments.c.student_id
+    ).options(db.lazyload(Student.classes)).filter(
+        enrollments.c.class_id.in_(class_ids),
+        enrollments.c.updated_at > since
+    ).all()
+    tombstones = Tombstone.query.filter(
+        Tombstone.deleted_at > since,
+        db.or_(
+            db.and_(Tombstone.class_id.in_(class_ids), Tombstone.entity_type != 'class'),
+            db.and_(Tombstone.professor_id == professor_id, Tombstone.entity_type == 'class')
+        )
+    ).all()
+    
+    # Submissions can change on assignments that did not; pull those in one IN query
+    missing_ids = {sub.assignment_id for sub in submissions} - set(assignments)
+    if missing_ids:
+        for a in Assignment.query.filter(Assignment.id.in_(missing_ids)).all():
+            assignments[a.id] = a
+    
+    student_ids = {sub.student_id for sub in submissions}
+    students = {st.id: st for st in Student.query.options(db.lazyload(Student.classes)).filter(
+        Student.id.in_(student_ids)
+    ).all()} if student_ids else {}
+    
+    submissions_by_assignment = {}
+    for sub in submissions:
+        student = students.get(sub.student_id)
+        submissions_by_assignment.setdefault(sub.assignment_id, []).append({
+            'id': str(sub.id),
+            'studentId': str(sub.student_id),
+            'studentName': f"{student.first_name} {student.last_name}" if student else "Unknown",
+            'content': sub.content,
+            'grade': sub.grade,
+            'feedback': sub.feedback,
+            'date': sub.date.isoformat(),
+            'files': file_refs(sub)
+        })
+    
+    touched = {}
+    def class_entry(cls):
+        if cls.id not in touched:
+            touched[cls.id] = {
+                'id': str(cls.id),
+                'name': cls.name,
+                'code': cls.code,
+                'description': cls.description,
+                'archived': cls.archived,
+                'materials': [],
+                'assignments': [],
+                'students': []
+            }
+        return touched[cls.id]
+    
+    classes_by_id = {cls.id: cls for cls in classes}
+    for cls in classes:
+        if cls.updated_at and cls.updated_at > since:
+            class_entry(cls)
+    for m in materials:
+        class_entry(classes_by_id[m.class_id])['materials'].append(serialize_delta_material(m))
+    for a in assignments.values():
+        class_entry(classes_by_id[a.class_id])['assignments'].append({
+            'id': str(a.id),
+            'title': a.title,
+            'description': a.description,
+            'dueDate': a.due_date.isoformat(),
+            'points': a.points,
+            'submissions': submissions_by_assignment.get(a.id, [])
+        })
+    for class_id, _, student in new_students:
+        class_entry(classes_by_id[class_id])['students'].append({
+            'id': str(student.id),
+            'name': f"{student.first_name} {student.last_name}",
+            'email': student.username,
+            'student_id': student.student_id
+        })
+    
+    changes = [change_key('class', cls.id, cls.updated_at) for cls in classes if cls.id in touched]
+    changes += [change_key('material', m.id, m.updated_at) for m in materials]
+    changes += [change_key('assignment', a.id, a.updated_at) for a in assignments.values()]
+    changes += [change_key('submission', sub.id, sub.updated_at) for sub in submissions]
+    changes += [change_key('enrollment', f"{class_id}.{student.id}", enrolled_at) for class_id, enrolled_at, student in new_students]
+    changes += [change_key('deleted', t.id, None) for t in tombstones]
+    
+    return {
+        'classes': list(touched.values()),
+        'deleted': serialize_delta_tombstones(tombstones),
+        'changes': changes
+    }
+
+def build_student_delta(student_id, since):
+    """Everything that changed in a student's enrolled classes after ``since``.
+
+    Classes the student joined after ``since`` are sent in full; for the
+    others only rows whose ``updated_at`` moved are returned.
+    """
+    class_rows = db.session.query(Class, enrollments.c.updated_at).join(
+        enrollments, enrollments.c.class_id == Class.id
+    ).filter(enrollments.c.student_id == student_id).all()
+    classes_by_id = {cls.id: cls for cls, _ in class_rows}
+    class_ids = list(classes_by_id)
+    joined_ids = [cls.id for cls, enrolled_at in class_rows if enrolled_at and enrolled_at > since]
+    
+    materials = Material.query.options(db.selectinload(Material.attachments)).filter(
+        Material.class_id.in_(class_ids),
+        db.or_(Material.updated_at > since, Material.class_id.in_(joined_ids))
+    ).all()
+    assignments = {a.id: a for a in Assignment.query.filter(
+        Assignment.class_id.in_(class_ids),
+        db.or_(Assignment.updated_at > since, Assignment.class_id.in_(joined_ids))
+    ).all()}
+    submissions = Submission.query.options(db.selectinload(Submission.attachments)).filter(
+        Submission.student_id == student_id,
+        db.or_(Submission.updated_at > since, Submission.assignment_id.in_(list(assignments)))
+    ).all()
+    tombstones = Tombstone.query.filter(
+        Tombstone.deleted_at > since,
+        db.or_(
+            db.and_(Tombstone.class_id.in_(class_ids), Tombstone.entity_type.in_(['material', 'assignment'])),
+            db.and_(Tombstone.student_id == student_id, Tombstone.entity_type.in_(['submission', 'enrollment', 'class']))
+        )
+    ).all()
+    
+    missing_ids = {sub.assignment_id for sub in submissions} - set(assignments)
+    if missing_ids:
+        for a in Assignment.query.filter(Assignment.id.in_(missing_ids)).all():
+            assignments[a.id] = a
+    submission_by_assignment = {sub.assignment_id: sub for sub in submissions}
+    
+    touched_ids = set(joined_ids)
+    touched_ids.update(cls.id for cls in classes_by_id.values() if cls.updated_at and cls.updated_at > since)
+    touched_ids.update(m.class_id for m in materials)
+    touched_ids.update(a.class_id for a in assignments.values() if a.class_id in classes_by_id)
+    
+    professor_ids = {classes_by_id[class_id].professor_id for class_id in touched_ids}
+    professors = {p.id: p for p in Professor.query.filter(Professor.id.in_(professor_ids)).all()} if professor_ids else {}
+    
+    touched = {}
+    for class_id in touched_ids:
+        cls = classes_by_id[class_id]
+        professor = professors.get(cls.professor_id)
+        touched[class_id] = {
+            'id': str(cls.id),
+            'name': cls.name,
+            'code': cls.code,
+            'description': cls.description,
+            'archived': cls.archived,
+            'professor_name': f"{professor.first_name} {professor.last_name}" if professor else "N/A",
+            'materials': [],
+            'assignments': []
+        }
+    for m in materials:
+        touched[m.class_id]['materials'].append(serialize_delta_material(m))
+    for a in assignments.values():
+        if a.class_id not in touched:
+            continue
+        submission = submission_by_assignment.get(a.id)
+        touched[a.class_id]['assignments'].append({
+            'id': str(a.id),
+            'title': a.title,
+            'description': a.description,
+            'dueDate': a.due_date.isoformat(),
+            'points': a.points,
+            'submissions': [{
+                'studentId': str(submission.student_id),
+                'content': submission.content,
+                'grade': submission.grade,
+                'feedback': submission.feedback,
+                'date': submission.date.isoformat(),
+                'files': file_refs(submission)
+            }] if submission else []
+        })
+    
+    enrolled_at = {cls.id: enrolled for cls, enrolled in class_rows}
+    changes = [change_key('class', cls.id, cls.updated_at) for cls in classes_by_id.values() if cls.id in touched]
+    changes += [change_key('enrollment', class_id, enrolled_at[class_id]) for class_id in joined_ids]
+    changes += [change_key('material', m.id, m.updated_at) for m in materials]
+    changes += [change_key('assignment', a.id, a.updated_at) for a in assignments.values()]
+    changes += [change_key('submission', sub.id, sub.updated_at) for sub in submissions]
+    changes += [change_key('deleted', t.id, None) for t in tombstones]
+    
+    return {
+        'classes': list(touched.values()),
+        'deleted': serialize_delta_tombstones(tombstones),
+        'changes': changes
+    }
+
 # Add after existing routes
 @app.route('/api/student/refresh-data')
 def refresh_student_data():
@@ -2008,13 +5497,34 @@ def refresh_student_data():
         return jsonify({'error': 'Unauthorized'}), 401
     
     student_id = session['user_id']
+    cursor = new_sync_cursor()
+    
+    # ✅ Delta mode: ?since=<cursor> returns only what changed since the last poll
+    if 'since' in request.args:
+        since = parse_sync_cursor(request.args.get('since'))
+        if since is None:
+            return jsonify({'error': 'Invalid sync cursor'}), 400
+        try:
+            delta = build_student_delta(student_id, since - SYNC_CURSOR_OVERLAP)
+            delta['cursor'] = cursor
+            return jsonify(delta)
+        except Exception as e:
+            print(f"Error building student delta: {e}")
+            return jsonify({'error': 'Failed to refresh data'}), 500
     
     try:
         # Get updated classes with fresh data
-        student = Student.query.get(student_id)
         classes_data = []
         
-        for cls in student.classes:
+        # One indexed lookup for all of this student's submissions
+        submissions_by_assignment = {
+            submission.assignment_id: submission
+            for submission in Submission.query.options(db.selectinload(Submission.attachments)).filter_by(
+                student_id=student_id
+            ).all()
+        }
+        
+        for cls in enrolled_classes(student_id):
             professor = Professor.query.get(cls.professor_id)
             
             # Load fresh assignments
@@ -2022,10 +5532,7 @@ def refresh_student_data():
             assignments_data = []
             
             for assignment in assignments:
-                submission = Submission.query.filter_by(
-                    assignment_id=assignment.id,
-                    student_id=student_id
-                ).first()
+                submission = submissions_by_assignment.get(assignment.id)
                 
                 assignments_data.append({
                     'id': str(assignment.id),
@@ -2039,7 +5546,7 @@ def refresh_student_data():
                         'grade': submission.grade,
                         'feedback': submission.feedback,
                         'date': submission.date.isoformat(),
-                        'files': json.loads(submission.files) if submission.files else []
+                        'files': file_refs(submission)
                     }] if submission else []
                 })
             
@@ -2052,7 +5559,9 @@ def refresh_student_data():
                 'professor_name': f"{professor.first_name} {professor.last_name}"
             })
         
-        return jsonify(classes_data)
+        response = jsonify(classes_data)
+        response.headers['X-Sync-Cursor'] = cursor
+        return response
         
     except Exception as e:
         print(f"Error refreshing data: {e}")
@@ -2064,6 +5573,20 @@ def refresh_professor_data():
         return jsonify({'error': 'Unauthorized'}), 401
     
     professor_id = session['user_id']
+    cursor = new_sync_cursor()
+    
+    # ✅ Delta mode: ?since=<cursor> returns only what changed since the last poll
+    if 'since' in request.args:
+        since = parse_sync_cursor(request.args.get('since'))
+        if since is None:
+            return jsonify({'error': 'Invalid sync cursor'}), 400
+        try:
+            delta = build_professor_delta(professor_id, since - SYNC_CURSOR_OVERLAP)
+            delta['cursor'] = cursor
+            return jsonify(delta)
+        except Exception as e:
+            print(f"Error building professor delta: {e}")
+            return jsonify({'error': 'Failed to refresh data'}), 500
     
     try:
         classes = Class.query.filter_by(professor_id=professor_id, archived=False).all()
@@ -2075,7 +5598,9 @@ def refresh_professor_data():
             assignments_data = []
             
             for assignment in assignments:
-                submissions = Submission.query.filter_by(assignment_id=assignment.id).all()
+                submissions = Submission.query.options(db.selectinload(Submission.attachments)).filter_by(
+                    assignment_id=assignment.id
+                ).all()
                 submissions_data = []
                 
                 for submission in submissions:
@@ -2088,7 +5613,7 @@ def refresh_professor_data():
                         'grade': submission.grade,
                         'feedback': submission.feedback,
                         'date': submission.date.isoformat(),
-                        'files': json.loads(submission.files) if submission.files else []
+                        'files': file_refs(submission)
                     })
                 
                 assignments_data.append({
@@ -2114,7 +5639,9 @@ def refresh_professor_data():
                 } for student in cls.students]
             })
         
-        return jsonify(classes_data)
+        response = jsonify(classes_data)
+        response.headers['X-Sync-Cursor'] = cursor
+        return response
         
     except Exception as e:
         print(f"Error refreshing professor data: {e}")
@@ -2162,6 +5689,33 @@ def database_info():
     """Database information endpoint"""
     return database_health()
 
+def run_cleanup():
+    """Delete expired tokens, abandoned uploads, old sent mail and old notifications; returns the counts"""
+    tokens_deleted = PasswordResetToken.query.filter(
+        PasswordResetToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    
+    uploads_deleted = cleanup_stale_uploads()
+    
+    emails_deleted = OutboundEmail.query.filter(
+        OutboundEmail.status == 'sent',
+        OutboundEmail.sent_at < datetime.utcnow() - timedelta(days=MAIL_SENT_RETENTION_DAYS)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    
+    notifications_deleted = Notification.query.filter(
+        Notification.created_at < datetime.utcnow() - timedelta(days=NOTIFICATION_RETENTION_DAYS)
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    
+    return {
+        'tokens_deleted': tokens_deleted,
+        'uploads_deleted': uploads_deleted,
+        'emails_deleted': emails_deleted,
+        'notifications_deleted': notifications_deleted
+    }
+
 @app.route('/api/database/cleanup', methods=['POST'])
 def database_cleanup():
     """Clean up expired data (admin only)"""
@@ -2169,26 +5723,794 @@ def database_cleanup():
         return jsonify({'error': 'Unauthorized'}), 401
     
     try:
-        # Clean expired password reset tokens
-        expired_tokens = PasswordResetToken.query.filter(
-            PasswordResetToken.expires_at < datetime.utcnow()
-        ).all()
+        return jsonify(dict(
+            run_cleanup(),
+            message='Cleanup completed',
+            timestamp=datetime.utcnow().isoformat()
+        )), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Cleanup failed: {str(e)}'}), 500
+
+# ===============================
+# ASSET BUILD
+# ===============================
+
+CSS_URL_PATTERN = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+def minify_js(source):
+    try:
+        import rjsmin  # Build-time dependency
+    except ImportError:
+        print("⚠️ rjsmin not installed, JavaScript is precompressed but not minified")
+        return source
+    return rjsmin.jsmin(source)
+
+def minify_css(source):
+    try:
+        import rcssmin  # Build-time dependency
+    except ImportError:
+        print("⚠️ rcssmin not installed, CSS is precompressed but not minified")
+        return source
+    return rcssmin.cssmin(source)
+
+def rewrite_css_urls(source, css_filename, canonical_of, versions):
+    """Point url(...) references at canonical, content-hashed static URLs"""
+    def replace(match):
+        url = match.group(2)
+        if url.startswith(('data:', 'http:', 'https:', '//')):
+            return match.group(0)
+        if url.startswith('/static/'):
+            target = url[len('/static/'):]
+        elif url.startswith('/'):
+            return match.group(0)
+        else:
+            target = os.path.normpath(os.path.join(os.path.dirname(css_filename), url)).replace(os.sep, '/')
+        target = canonical_of.get(target, target)
+        if target not in versions:
+            return match.group(0)
+        return f"url('/static/{target}?v={versions[target]}')"
+    return CSS_URL_PATTERN.sub(replace, source)
+
+def write_precompressed(path, data):
+    """Write ``data`` plus .gz (and .br when Brotli is available) siblings; returns the encodings written"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    
+    encodings = []
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    encodings.append('gzip')
+    
+    if brotli is None:
+        return encodings
+    with open(path + '.br', 'wb') as f:
+        f.write(brotli.compress(data, quality=11))
+    encodings.append('br')
+    return encodings
+
+def encode_image_variants(source_path, output_base, display_size):
+    """Write WebP/AVIF copies scaled to the displayed size; returns {mimetype: path}"""
+    try:
+        from PIL import Image, features  # Build-time dependency
+    except ImportError:
+        return {}
+    
+    variants = {}
+    with Image.open(source_path) as image:
+        if display_size:
+            target = display_size * 2
+            if max(image.size) > target:
+                image.thumbnail((target, target), Image.LANCZOS)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
         
-        tokens_deleted = 0
-        for token in expired_tokens:
-            db.session.delete(token)
-            tokens_deleted += 1
+        for fmt, mimetype, ext in (('WEBP', 'image/webp', '.webp'), ('AVIF', 'image/avif', '.avif')):
+            if not features.check(fmt.lower()):
+                continue
+            path = output_base + ext
+            image.save(path, fmt, quality=80)
+            variants[mimetype] = path
+    return variants
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Minify, fingerprint and precompress static files into static/dist"""
+    if os.path.exists(DIST_FOLDER):
+        shutil.rmtree(DIST_FOLDER)
+    os.makedirs(DIST_FOLDER)
+    
+    sources = []
+    for root, _, files in os.walk(STATIC_FOLDER):
+        if root.startswith(DIST_FOLDER):
+            continue
+        for name in files:
+            path = os.path.join(root, name)
+            sources.append(os.path.relpath(path, STATIC_FOLDER).replace(os.sep, '/'))
+    sources.sort()
+    
+    # Identical files collapse onto one canonical name (the shortest, space-free one)
+    canonical_of = {}
+    first_by_hash = {}
+    source_hashes = {}
+    for filename in sorted(sources, key=lambda name: (' ' in name, len(name), name)):
+        digest = asset_hash(os.path.join(STATIC_FOLDER, filename))
+        source_hashes[filename] = digest
+        canonical = first_by_hash.setdefault(digest, filename)
+        if canonical != filename:
+            canonical_of[filename] = canonical
+    
+    manifest = {}
+    versions = {}
+    
+    # Images and other binaries first, so CSS can reference their versions
+    for filename in sources:
+        if filename.endswith(('.css', '.js')) or filename in canonical_of:
+            continue
+        source_path = os.path.join(STATIC_FOLDER, filename)
+        output_path = os.path.join(DIST_FOLDER, filename)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        shutil.copyfile(source_path, output_path)
         
+        entry = {'file': filename, 'hash': source_hashes[filename], 'version': source_hashes[filename][:ASSET_VERSION_LENGTH]}
+        if filename.startswith('images/'):
+            variants = encode_image_variants(source_path, output_path, IMAGE_DISPLAY_SIZES.get(filename))
+            # Smallest first, and only variants that actually beat the original
+            entry['variants'] = [
+                [mimetype, os.path.relpath(path, DIST_FOLDER).replace(os.sep, '/')]
+                for mimetype, path in sorted(variants.items(), key=lambda item: os.path.getsize(item[1]))
+                if os.path.getsize(path) < os.path.getsize(source_path)
+            ]
+        manifest[filename] = entry
+        versions[filename] = entry['version']
+    
+    for filename in sources:
+        if not filename.endswith(('.css', '.js')) or filename in canonical_of:
+            continue
+        with open(os.path.join(STATIC_FOLDER, filename), encoding='utf-8') as f:
+            source = f.read()
+        
+        if filename.endswith('.css'):
+            output = minify_css(rewrite_css_urls(source, filename, canonical_of, versions))
+        else:
+            output = minify_js(source)
+        
+        data = output.encode('utf-8')
+        output_path = os.path.join(DIST_FOLDER, filename)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        digest = hashlib.sha256(data).hexdigest()
+        manifest[filename] = {
+            'file': filename,
+            'hash': digest,
+            'version': digest[:ASSET_VERSION_LENGTH],
+            'encodings': write_precompressed(output_path, data)
+        }
+    
+    for filename, canonical in canonical_of.items():
+        manifest[filename] = dict(manifest[canonical], canonical=canonical)
+    
+    with open(ASSET_MANIFEST_PATH, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    
+    source_bytes = sum(os.path.getsize(os.path.join(STATIC_FOLDER, name)) for name in sources)
+    print(f"✓ Built {len(manifest)} assets ({len(canonical_of)} duplicates collapsed) from {source_bytes / 1024:.0f}KB of sources")
+
+@app.cli.command('migrate-blobs')
+def migrate_blobs_command():
+    """Move base64 data URLs stored in attachments into the blob store"""
+    migrated = 0
+    for attachment in Attachment.query.filter(Attachment.url.like('data:%')).yield_per(100):
+        file_ref = normalize_file_refs([attachment.to_file_ref()])[0]
+        if file_ref.get('file_id'):
+            attachment.url = file_ref['url']
+            attachment.blob_sha256 = file_ref['file_id']
+            attachment.size = file_ref['size']
+            migrated += 1
+    db.session.commit()
+    print(f"✓ Moved {migrated} inline attachments into the blob store")
+
+@app.cli.command('cleanup')
+def cleanup_command():
+    """Delete expired reset tokens, abandoned uploads, old sent mail and old notifications"""
+    counts = run_cleanup()
+    print(f"✓ Deleted {counts['tokens_deleted']} expired tokens, {counts['uploads_deleted']} stale uploads, "
+          f"{counts['emails_deleted']} sent emails and {counts['notifications_deleted']} old notifications")
+
+@app.cli.command('rebuild-gradebook')
+def rebuild_gradebook_command():
+    """Recompute every class's gradebook totals from submissions"""
+    class_ids = [row.id for row in db.session.query(Class.id).all()]
+    for class_id in class_ids:
+        refresh_gradebook_students(class_id)
+        refresh_gradebook_assignments(class_id)
+    db.session.commit()
+    print(f"✓ Rebuilt gradebooks for {len(class_ids)} classes")
+
+def same_database(url, other):
+    """True if two SQLAlchemy URLs name the same database, whatever driver or path spelling they use"""
+    url, other = make_url(url.replace('postgres://', 'postgresql://', 1)), make_url(other)
+    if url.get_backend_name() != other.get_backend_name():
+        return False
+    if url.get_backend_name() == 'sqlite':
+        return bool(url.database) and bool(other.database) and \
+            os.path.realpath(url.database) == os.path.realpath(other.database)
+    return url.set(drivername=url.get_backend_name()) == other.set(drivername=other.get_backend_name())
+
+def require_scratch_database(database_url, yes_drop):
+    """Refuse to let a benchmark drop_all() the app's database or one that has real users"""
+    if yes_drop or make_url(database_url).database in (None, '', ':memory:'):
+        return
+    if same_database(database_url, app.config['SQLALCHEMY_DATABASE_URI']):
+        raise click.ClickException('--database-url is the app database; benchmarks drop every table they use')
+    engine = db.create_engine(database_url)
+    try:
+        with engine.connect() as conn:
+            tables = db.inspect(conn).get_table_names()
+            has_users = any(
+                conn.execute(db.select(model.id).limit(1)).first()
+                for model in (Professor, Student) if model.__tablename__ in tables
+            )
+    finally:
+        engine.dispose()
+    if has_users:
+        raise click.ClickException('The database at --database-url has users; '
+                                   'benchmarks drop every table, so pass --yes-drop if that is intended')
+
+@app.cli.command('bench-gradebook')
+@click.option('--students', default=500, help='Students enrolled in the class')
+@click.option('--assignments', default=100, help='Assignments in the class')
+@click.option('--database-url', default='sqlite://', help='Scratch database; never the app database')
+@click.option('--yes-drop', is_flag=True, help='Drop and refill --database-url even if it has users')
+def bench_gradebook_command(students, assignments, database_url, yes_drop):
+    """Time gradebook maintenance and serving for one fully submitted class"""
+    require_scratch_database(database_url, yes_drop)
+    bench_app = Flask(__name__)
+    bench_app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    db.init_app(bench_app)
+    
+    def timed(fn, repeat=1):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = fn()
+        return result, (time.perf_counter() - started) / repeat * 1000
+    
+    with bench_app.app_context():
+        db.drop_all()
+        db.create_all()
+        now = datetime.utcnow()
+        db.session.execute(db.insert(Professor).values(id=1, username='bench@prof', password='-'))
+        db.session.execute(db.insert(Class).values(id=1, name='Bench', code='BENCH', professor_id=1))
+        db.session.execute(db.insert(Student), [
+            {'id': i, 'username': f'bench{i}@student', 'password': '-', 'first_name': 'S', 'last_name': str(i)}
+            for i in range(1, students + 1)
+        ])
+        db.session.execute(enrollments.insert(), [{'student_id': i, 'class_id': 1} for i in range(1, students + 1)])
+        db.session.execute(db.insert(Assignment), [
+            {'id': i, 'class_id': 1, 'title': f'A{i}', 'description': '', 'due_date': now, 'points': 100}
+            for i in range(1, assignments + 1)
+        ])
+        db.session.execute(db.insert(Submission), [
+            {'assignment_id': a, 'student_id': st, 'content': '', 'date': now, 'updated_at': now,
+             'grade': random.randint(50, 100) if random.random() < 0.8 else None}
+            for a in range(1, assignments + 1) for st in range(1, students + 1)
+        ])
         db.session.commit()
+        print(f"{students} students x {assignments} assignments ({students * assignments:,} submissions)")
         
-        return jsonify({
-            'message': 'Cleanup completed',
-            'tokens_deleted': tokens_deleted,
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'error': f'Cleanup failed: {str(e)}'}), 500
+        def full_rebuild():
+            refresh_gradebook_students(1)
+            refresh_gradebook_assignments(1)
+            db.session.commit()
+        _, ms = timed(full_rebuild, 3)
+        print(f"  full rebuild:          {ms:8.1f} ms")
+        
+        def grade_one():
+            student_id, assignment_id = random.randint(1, students), random.randint(1, assignments)
+            db.session.execute(db.update(Submission).where(
+                Submission.assignment_id == assignment_id, Submission.student_id == student_id
+            ).values(grade=random.randint(0, 100)))
+            refresh_gradebook_students(1, [student_id])
+            refresh_gradebook_assignments(1, [assignment_id])
+            db.session.commit()
+        _, ms = timed(grade_one, 50)
+        print(f"  grade + incremental:   {ms:8.1f} ms")
+        
+        gradebook, ms = timed(lambda: build_gradebook(1), 3)
+        print(f"  build matrix:          {ms:8.1f} ms")
+        body, ms = timed(lambda: json.dumps(gradebook, separators=(',', ':')), 3)
+        print(f"  columnar JSON:         {ms:8.1f} ms, {len(body) / 1024:.0f} KB "
+              f"({len(gzip.compress(body.encode())) / 1024:.0f} KB gzipped)")
+        csv_body, ms = timed(lambda: ''.join(stream_csv(gradebook_csv_rows(gradebook))), 3)
+        print(f"  CSV:                   {ms:8.1f} ms, {len(csv_body) / 1024:.0f} KB")
+        
+        # The same grades through the per-assignment serializers the dashboard used before
+        assignment_ids = list(range(1, assignments + 1))
+        legacy, ms = timed(lambda: json.dumps(load_submissions_by_assignment(assignment_ids)), 1)
+        print(f"  previous nested JSON:  {ms:8.1f} ms, {len(legacy) / 1024:.0f} KB")
+        
+        db.session.remove()
+        db.drop_all()
+
+@app.cli.command('bench-submissions')
+@click.option('--sizes', default='10000,100000,1000000', help='Comma-separated submission table sizes')
+@click.option('--lookups', default=2000, help='Random (assignment_id, student_id) lookups per size')
+@click.option('--database-url', default='sqlite://', help='Scratch database; never the app database')
+@click.option('--yes-drop', is_flag=True, help='Drop and refill --database-url even if it has users')
+def bench_submissions_command(sizes, lookups, database_url, yes_drop):
+    """Time submission lookups as the table grows, to show the indexes keep them flat"""
+    require_scratch_database(database_url, yes_drop)
+    engine = db.create_engine(database_url)
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    assignments_per_class = 200
+    batch_size = 10000
+    now = datetime.utcnow()
+    
+    with engine.begin() as conn:
+        conn.execute(db.insert(Professor).values(id=1, username='bench@prof', password='-'))
+        conn.execute(db.insert(Class).values(id=1, name='Bench', code='BENCH', professor_id=1))
+        conn.execute(db.insert(Assignment), [
+            {'id': i, 'class_id': 1, 'title': f'A{i}', 'description': '', 'due_date': now}
+            for i in range(1, assignments_per_class + 1)
+        ])
+    
+    lookup = db.select(Submission.id, Submission.grade).where(
+        Submission.assignment_id == db.bindparam('a'), Submission.student_id == db.bindparam('s'))
+    
+    students = 0
+    rows = 0
+    for size in sorted(int(value) for value in sizes.split(',')):
+        # Grow the table: each new student submits every assignment
+        target_students = -(-size // assignments_per_class)
+        with engine.begin() as conn:
+            pending = []
+            for student_id in range(students + 1, target_students + 1):
+                pending.append(student_id)
+                if len(pending) * assignments_per_class >= batch_size or student_id == target_students:
+                    conn.execute(db.insert(Student), [
+                        {'id': sid, 'username': f'bench{sid}@student', 'password': '-'} for sid in pending
+                    ])
+                    conn.execute(db.insert(Submission), [
+                        {'assignment_id': aid, 'student_id': sid, 'content': '', 'date': now, 'updated_at': now}
+                        for sid in pending for aid in range(1, assignments_per_class + 1)
+                    ])
+                    pending = []
+        students = target_students
+        rows = students * assignments_per_class
+        
+        keys = [{'a': random.randint(1, assignments_per_class), 's': random.randint(1, students)}
+                for _ in range(lookups)]
+        with engine.connect() as conn:
+            started = time.perf_counter()
+            for key in keys:
+                conn.execute(lookup, key).first()
+            point_us = (time.perf_counter() - started) / lookups * 1e6
+        
+        print(f"{rows:>10,} rows: {point_us:8.1f} µs per (assignment, student) lookup")
+    
+    if engine.dialect.name == 'sqlite':
+        with engine.connect() as conn:
+            plan = conn.execute(db.text(
+                'EXPLAIN QUERY PLAN SELECT id FROM submission WHERE assignment_id = 1 AND student_id = 1'
+            )).all()
+            print("Plan:", '; '.join(row[-1] for row in plan))
+    db.metadata.drop_all(engine)
+
+# ===============================
+# LOAD TESTING
+# ===============================
+
+CAMPUS_PASSWORD = 'Campus123!'  # Every generated account uses it, so the load runner can log in
+CAMPUS_EMAIL_DOMAIN = 'campus.test'
+CAMPUS_SUBJECTS = ['Calculus', 'Physics', 'Chemistry', 'Biology', 'History', 'Literature', 'Statistics',
+                   'Programming', 'Databases', 'Economics', 'Psychology', 'Philosophy', 'Networks', 'Design']
+CAMPUS_FIRST_NAMES = ['Ana', 'Ben', 'Carla', 'Dan', 'Eva', 'Felix', 'Gina', 'Hugo', 'Iris', 'Jon', 'Kai', 'Lea',
+                      'Marco', 'Nina', 'Omar', 'Pia', 'Quinn', 'Rosa', 'Sam', 'Tara', 'Uma', 'Victor', 'Wen', 'Yara']
+CAMPUS_LAST_NAMES = ['Reyes', 'Santos', 'Cruz', 'Garcia', 'Lim', 'Tan', 'Bautista', 'Mendoza', 'Torres', 'Flores',
+                     'Ramos', 'Aquino', 'Navarro', 'Castro', 'Villanueva', 'Domingo', 'Morales', 'Salazar']
+CAMPUS_FILES = [('lecture-notes.pdf', 'application/pdf', 48 * 1024),
+                ('dataset.csv', 'text/csv', 12 * 1024),
+                ('diagram.png', 'image/png', 96 * 1024)]
+
+def insert_rows(model, rows, batch_size=5000):
+    """Core bulk insert in batches; returns the new ids in insertion order"""
+    ids = []
+    for start in range(0, len(rows), batch_size):
+        result = db.session.execute(db.insert(model).returning(model.id, sort_by_parameter_order=True),
+                                    rows[start:start + batch_size])
+        ids.extend(row.id for row in result)
+    return ids
+
+def generate_campus(students=2000, professors=100, classes_per_professor=3, students_per_class=40,
+                    materials_per_class=20, assignments_per_class=15, submission_rate=0.8, graded_rate=0.6,
+                    attachment_rate=0.3, seed=1):
+    """Fill the database with a synthetic campus; returns row counts per table"""
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password = generate_password_hash(CAMPUS_PASSWORD)  # Hashing is deliberately slow; do it once
+    
+    # A few shared blobs, so attachments dedupe the way real uploads do
+    blobs = [(name, mime_type, blob_store.save(BytesIO(bytes(rng.getrandbits(8) for _ in range(size))), mime_type))
+             for name, mime_type, size in CAMPUS_FILES]
+    
+    def person(index):
+        return rng.choice(CAMPUS_FIRST_NAMES), f"{rng.choice(CAMPUS_LAST_NAMES)}{index}"
+    
+    def attachments_for(owner_type, owner_ids, class_of):
+        rows = []
+        for owner_id in owner_ids:
+            if rng.random() < attachment_rate:
+                name, mime_type, blob = rng.choice(blobs)
+                rows.append({'owner_type': owner_type, 'owner_id': owner_id, 'class_id': class_of[owner_id],
+                             'position': 0, 'name': name, 'mime_type': mime_type, 'size': blob.size,
+                             'blob_sha256': blob.sha256, 'url': blob_store.url_for(blob), 'created_at': now})
+        return rows
+    
+    professor_rows = []
+    for index in range(professors):
+        first_name, last_name = person(index)
+        professor_rows.append({'username': f'prof{index}@{CAMPUS_EMAIL_DOMAIN}', 'password': password,
+                               'first_name': first_name, 'last_name': last_name,
+                               'professor_id': f'LT-P{index:05d}', 'department': rng.choice(CAMPUS_SUBJECTS)})
+    professor_ids = insert_rows(Professor, professor_rows)
+    
+    student_rows = []
+    for index in range(students):
+        first_name, last_name = person(index)
+        student_rows.append({'username': f'student{index}@{CAMPUS_EMAIL_DOMAIN}', 'password': password,
+                             'first_name': first_name, 'last_name': last_name, 'student_id': f'LT-S{index:06d}',
+                             'course': rng.choice(CAMPUS_SUBJECTS), 'year_level': str(rng.randint(1, 4))})
+    student_ids = insert_rows(Student, student_rows)
+    
+    class_rows = [{'name': f"{rng.choice(CAMPUS_SUBJECTS)} {100 + index}", 'description': 'Generated class',
+                   'code': f'L{index:05d}', 'professor_id': professor_id, 'created_at': now - timedelta(days=120)}
+                  for index, professor_id in enumerate(
+                      professor_id for professor_id in professor_ids for _ in range(classes_per_professor))]
+    class_ids = insert_rows(Class, class_rows)
+    
+    roster = {class_id: rng.sample(student_ids, min(students_per_class, len(student_ids))) for class_id in class_ids}
+    enrollment_rows = [{'student_id': student_id, 'class_id': class_id, 'updated_at': now}
+                       for class_id, members in roster.items() for student_id in members]
+    for start in range(0, len(enrollment_rows), 5000):
+        db.session.execute(enrollments.insert(), enrollment_rows[start:start + 5000])
+    
+    material_rows = [{'class_id': class_id, 'title': f'Lecture {number + 1}', 'description': 'Reading and slides',
+                      'date': now - timedelta(days=rng.uniform(0, 120))}
+                     for class_id in class_ids for number in range(materials_per_class)]
+    material_ids = insert_rows(Material, material_rows)
+    
+    assignment_rows = [{'class_id': class_id, 'title': f'Problem set {number + 1}', 'description': 'Solve and submit',
+                        'due_date': now + timedelta(days=rng.uniform(-90, 30)), 'points': rng.choice([10, 20, 50, 100]),
+                        'date_created': now - timedelta(days=rng.uniform(30, 120))}
+                       for class_id in class_ids for number in range(assignments_per_class)]
+    for row in assignment_rows:
+        # History is already closed and reminded, so the scheduler does not replay it
+        row['reminders_sent'] = reminders_due(row['due_date'], now)
+        row['closed_at'] = row['due_date'] if row['due_date'] <= now else None
+    assignment_ids = insert_rows(Assignment, assignment_rows)
+    
+    submission_rows = []
+    for assignment_id, assignment in zip(assignment_ids, assignment_rows):
+        for student_id in roster[assignment['class_id']]:
+            if rng.random() < submission_rate:
+                graded = rng.random() < graded_rate
+                submission_rows.append({
+                    'assignment_id': assignment_id, 'student_id': student_id, 'content': 'Generated answer',
+                    'date': assignment['due_date'] - timedelta(hours=rng.uniform(0, 72)),
+                    'grade': round(rng.uniform(0.4, 1) * assignment['points']) if graded else None,
+                    'feedback': 'Good work' if graded else None
+                })
+    submission_ids = insert_rows(Submission, submission_rows)
+    
+    class_of_material = {material_id: row['class_id'] for material_id, row in zip(material_ids, material_rows)}
+    class_of_assignment = {assignment_id: row['class_id'] for assignment_id, row in zip(assignment_ids, assignment_rows)}
+    class_of_submission = {submission_id: class_of_assignment[row['assignment_id']]
+                           for submission_id, row in zip(submission_ids, submission_rows)}
+    attachment_rows = (attachments_for('material', material_ids, class_of_material)
+                       + attachments_for('assignment', assignment_ids, class_of_assignment)
+                       + attachments_for('submission', submission_ids, class_of_submission))
+    insert_rows(Attachment, attachment_rows)
+    
+    for class_id in class_ids:
+        refresh_gradebook_students(class_id)
+        refresh_gradebook_assignments(class_id)
+    db.session.commit()
+    
+    return {'professors': len(professor_ids), 'students': len(student_ids), 'classes': len(class_ids),
+            'enrollments': len(enrollment_rows), 'materials': len(material_ids), 'assignments': len(assignment_ids),
+            'submissions': len(submission_ids), 'attachments': len(attachment_rows)}
+
+@app.cli.command('seed-campus')
+@click.option('--students', default=2000)
+@click.option('--professors', default=100)
+@click.option('--classes-per-professor', default=3)
+@click.option('--students-per-class', default=40)
+@click.option('--materials-per-class', default=20)
+@click.option('--assignments-per-class', default=15)
+@click.option('--seed', default=1, help='Random seed; the same seed builds the same campus')
+@click.option('--append', is_flag=True, help='Allow seeding a database that already has users')
+def seed_campus_command(students, professors, classes_per_professor, students_per_class,
+                        materials_per_class, assignments_per_class, seed, append):
+    """Fill DATABASE_URL with a synthetic campus for load testing"""
+    upgrade_database()
+    if not append and (Student.query.first() or Professor.query.first()):
+        raise click.ClickException('The database already has users; point DATABASE_URL at a scratch database or pass --append')
+    
+    started = time.perf_counter()
+    counts = generate_campus(students=students, professors=professors, classes_per_professor=classes_per_professor,
+                             students_per_class=students_per_class, materials_per_class=materials_per_class,
+                             assignments_per_class=assignments_per_class, seed=seed)
+    print(', '.join(f"{count:,} {table}" for table, count in counts.items()))
+    print(f"✓ Campus generated in {time.perf_counter() - started:.1f}s; "
+          f"log in as student0@{CAMPUS_EMAIL_DOMAIN} or prof0@{CAMPUS_EMAIL_DOMAIN} with {CAMPUS_PASSWORD}")
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+class HttpResponse:
+    """The parts of a test-client response the load runner reads"""
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+
+    def get_json(self):
+        return json.loads(self.body)
+
+class HttpClient:
+    """Test-client-shaped ``open()`` against a live server, keeping cookies and not following redirects"""
+
+    class NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), self.NoRedirect)
+
+    def open(self, url, method='GET', query_string=None, data=None, **kwargs):
+        if query_string:
+            url = f"{url}?{urllib.parse.urlencode(query_string)}"
+        headers, body = {}, None
+        if kwargs.get('json') is not None:
+            headers['Content-Type'], body = 'application/json', json.dumps(kwargs['json']).encode()
+        elif data is not None:
+            headers['Content-Type'], body = 'application/x-www-form-urlencoded', urllib.parse.urlencode(data).encode()
+        request = urllib.request.Request(self.base_url + url, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=60) as response:
+                return HttpResponse(response.status, response.headers, response.read())
+        except urllib.error.HTTPError as e:
+            return HttpResponse(e.code, e.headers, e.read())
+
+class LoadUser:
+    """One simulated user: logs in through /login, then loops over weighted tasks"""
+
+    def __init__(self, runner, kind, user_id, email):
+        self.runner = runner
+        self.kind = kind
+        self.user_id = user_id
+        self.email = email
+        self.client = HttpClient(runner.base_url) if runner.base_url else app.test_client()
+        self.sync_cursor = None
+
+    def request(self, name, method, url, **kwargs):
+        stats = self.runner.statement_counter
+        stats.count = 0
+        started = time.perf_counter()
+        try:
+            response = self.client.open(url, method=method, **kwargs)
+            status = response.status_code
+        except Exception as e:
+            response, status = None, 599
+            print(f"{name} failed: {e}")
+        # Statements are only visible when the app runs in this process
+        statements = None if self.runner.base_url else stats.count
+        self.runner.record(name, (time.perf_counter() - started) * 1000, statements, status)
+        return response
+
+    def login(self):
+        self.request('login', 'POST', '/login', data={
+            'email': self.email, 'password': CAMPUS_PASSWORD, 'userType': self.kind})
+
+    def dashboard(self):
+        self.request('dashboard', 'GET', '/dashboard')
+
+    def poll(self):
+        url = f'/api/{self.kind}/refresh-data'
+        if self.sync_cursor:
+            response = self.request('refresh-data (delta)', 'GET', url, query_string={'since': self.sync_cursor})
+            if response is not None and response.status_code == 200:
+                self.sync_cursor = response.get_json().get('cursor') or self.sync_cursor
+        else:
+            response = self.request('refresh-data (full)', 'GET', url)
+            if response is not None:
+                self.sync_cursor = response.headers.get('X-Sync-Cursor')
+
+    def submit(self):
+        assignment_id, class_id = random.choice(self.runner.student_work[self.user_id])
+        self.request('submit', 'POST', '/api/student/submit_assignment', json={
+            'assignment_id': assignment_id, 'class_id': class_id, 'content': 'Load test answer'})
+
+    def grade(self):
+        assignment_id, student_id, points = random.choice(self.runner.professor_work[self.user_id])
+        self.request('grade', 'POST', f'/api/professor/assignments/{assignment_id}/grade', json={
+            'student_id': student_id, 'grade': random.randint(points // 2, points), 'feedback': 'Load test'})
+
+    def run(self, deadline):
+        self.login()
+        self.dashboard()
+        self.poll()
+        if self.kind == 'student':
+            tasks = [(self.poll, 10), (self.dashboard, 1)] + ([(self.submit, 2)] if self.runner.student_work[self.user_id] else [])
+        else:
+            tasks = [(self.poll, 10), (self.dashboard, 1)] + ([(self.grade, 3)] if self.runner.professor_work[self.user_id] else [])
+        actions, weights = zip(*tasks)
+        while time.perf_counter() < deadline:
+            random.choices(actions, weights)[0]()
+            time.sleep(random.uniform(0, self.runner.think_seconds))
+
+class LoadRunner:
+    def __init__(self, think_seconds, base_url=None):
+        self.think_seconds = think_seconds
+        self.base_url = base_url
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.statement_counter = threading.local()
+        self.student_work = {}
+        self.professor_work = {}
+
+    def record(self, name, ms, statements, status):
+        with self.lock:
+            self.samples.setdefault(name, []).append((ms, statements, status))
+
+    def count_statement(self, conn, cursor, statement, parameters, context, executemany):
+        if hasattr(self.statement_counter, 'count'):
+            self.statement_counter.count += 1
+
+    def pick_users(self, students, professors):
+        student_rows = Student.query.filter(Student.username.like(f'%@{CAMPUS_EMAIL_DOMAIN}')).order_by(
+            db.func.random()).limit(students).all()
+        professor_rows = Professor.query.filter(Professor.username.like(f'%@{CAMPUS_EMAIL_DOMAIN}')).order_by(
+            db.func.random()).limit(professors).all()
+        for student in student_rows:
+            self.student_work[student.id] = [(row.id, row.class_id) for row in db.session.query(
+                Assignment.id, Assignment.class_id
+            ).join(enrollments, enrollments.c.class_id == Assignment.class_id).filter(
+                enrollments.c.student_id == student.id, Assignment.due_date > datetime.utcnow()).all()]
+        for professor in professor_rows:
+            self.professor_work[professor.id] = [tuple(row) for row in db.session.query(
+                Submission.assignment_id, Submission.student_id, Assignment.points
+            ).join(Assignment).join(Class).filter(Class.professor_id == professor.id).limit(500).all()]
+        db.session.remove()
+        return ([LoadUser(self, 'student', st.id, st.username) for st in student_rows]
+                + [LoadUser(self, 'professor', pr.id, pr.username) for pr in professor_rows])
+
+    def run(self, users, seconds):
+        if not self.base_url:
+            sa_event.listen(db.engine, 'before_cursor_execute', self.count_statement)
+        deadline = time.perf_counter() + seconds
+        threads = [threading.Thread(target=self.run_user, args=(user, deadline)) for user in users]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if not self.base_url:
+                sa_event.remove(db.engine, 'before_cursor_execute', self.count_statement)
+
+    def run_user(self, user, deadline):
+        with app.app_context():
+            self.statement_counter.count = 0
+            user.run(deadline)
+
+    def report(self):
+        results = {}
+        for name, samples in sorted(self.samples.items()):
+            latencies = sorted(ms for ms, _, _ in samples)
+            statements = [count for _, count, _ in samples if count is not None]
+            results[name] = {
+                'requests': len(samples),
+                'errors': sum(1 for _, _, status in samples if status >= 400 and status != 302),
+                'p50': round(percentile(latencies, 0.50), 2),
+                'p95': round(percentile(latencies, 0.95), 2),
+                'p99': round(percentile(latencies, 0.99), 2),
+                'queries': round(sum(statements) / len(statements), 1) if statements else None
+            }
+        return results
+
+def print_load_report(results, baseline=None, tolerance=0.2):
+    """Print the per-endpoint table; returns the endpoints that regressed against the baseline"""
+    regressions = []
+    print(f"{'endpoint':<24}{'reqs':>7}{'errs':>6}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}"
+          + (f"{'p95 vs base':>13}" if baseline else ''))
+    for name, row in results.items():
+        queries = f"{row['queries']:>9.1f}" if row['queries'] is not None else f"{'-':>9}"
+        line = (f"{name:<24}{row['requests']:>7}{row['errors']:>6}{row['p50']:>9.1f}{row['p95']:>9.1f}"
+                f"{row['p99']:>9.1f}{queries}")
+        base = (baseline or {}).get(name)
+        if base:
+            change = (row['p95'] - base['p95']) / base['p95'] if base['p95'] else 0
+            line += f"{change:>+12.0%}"
+            more_queries = row['queries'] is not None and base.get('queries') is not None and \
+                row['queries'] > base['queries'] * (1 + tolerance)
+            if change > tolerance or more_queries:
+                regressions.append(name)
+                line += '  ⚠️'
+        print(line)
+    return regressions
+
+@app.cli.command('load-test')
+@click.option('--students', default=20, help='Concurrent simulated students')
+@click.option('--professors', default=5, help='Concurrent simulated professors')
+@click.option('--seconds', default=30, help='How long each user keeps issuing requests')
+@click.option('--think', default=0.5, help='Maximum pause between a user\'s requests, in seconds')
+@click.option('--baseline', type=click.Path(dir_okay=False), help='Compare against a saved run')
+@click.option('--save-baseline', type=click.Path(dir_okay=False), help='Write this run\'s results as JSON')
+@click.option('--tolerance', default=0.2, help='Allowed p95 slowdown against the baseline')
+@click.option('--base-url', help='Send requests over HTTP to a running server (e.g. http://localhost:8000) '
+                                 'instead of this process; DATABASE_URL must be that server\'s database')
+def load_test_command(students, professors, seconds, think, baseline, save_baseline, tolerance, base_url):
+    """Simulate students and professors against a `flask seed-campus` database"""
+    runner = LoadRunner(think, base_url)
+    users = runner.pick_users(students, professors)
+    if not users:
+        raise click.ClickException('No generated users found; run `flask seed-campus` first')
+    
+    target = base_url or db.engine.url.render_as_string(hide_password=True)
+    print(f"Running {len(users)} users for {seconds}s against {target}")
+    runner.run(users, seconds)
+    results = runner.report()
+    
+    previous = None
+    if baseline:
+        with open(baseline) as f:
+            previous = json.load(f)['endpoints']
+    regressions = print_load_report(results, previous, tolerance)
+    
+    if save_baseline:
+        with open(save_baseline, 'w') as f:
+            json.dump({'recorded_at': datetime.utcnow().isoformat(), 'users': len(users), 'seconds': seconds,
+                       'endpoints': results}, f, indent=2)
+        print(f"✓ Saved baseline to {save_baseline}")
+    if regressions:
+        raise click.ClickException(f"Slower than baseline: {', '.join(regressions)}")
+
+@app.cli.command('send-mail')
+@click.option('--once', is_flag=True, help='Send what is due and exit instead of polling')
+def send_mail_command(once):
+    """Drain the outbox in this process (use with MAIL_WORKER=external)"""
+    connection = SMTPConnection()
+    try:
+        while True:
+            sent = drain_outbox(connection)
+            if sent:
+                print(f"✓ Sent {sent} emails")
+            if once:
+                break
+            connection.close_if_idle()
+            time.sleep(MAIL_POLL_SECONDS)
+    finally:
+        connection.close()
+
+@app.cli.command('run-scheduler')
+@click.option('--once', is_flag=True, help='Fire what is due and exit instead of waiting')
+def run_scheduler_command(once):
+    """Fire deadline reminders and closes in this process (use with DEADLINE_WORKER=external)"""
+    deadlines = DeadlineQueue()
+    while True:
+        fired, timeout = deadlines.run_due()
+        if fired:
+            print(f"✓ Fired {fired} deadline events")
+        if once:
+            break
+        time.sleep(timeout)
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))
@@ -2206,6 +6528,10 @@ if __name__ == '__main__':
         if not os.environ.get("WERKZEUG_RUN_MAIN"):
             Timer(1, open_browser).start()
     
+    # Local runs have no release step, so bring the schema up to date here
+    with app.app_context():
+        upgrade_database()
+    
     # Use debug=False in production
     debug_mode = os.environ.get("FLASK_ENV") == "development"
     app.run(host='0.0.0.0', port=port, debug=debug_mode)
\ No newline at end of file
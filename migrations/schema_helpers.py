@@ -0,0 +1,67 @@
+"""Operations shared by the revision scripts.
+
+Every helper is a no-op when its object already exists, so the first
+`flask db upgrade` also adopts databases built by the old startup
+db.create_all() / add_missing_columns() code.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+def is_postgres():
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def has_table(table):
+    return sa.inspect(op.get_bind()).has_table(table)
+
+
+def has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def has_index(table, name):
+    return name in {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def create_table(name, *columns, **kw):
+    if not has_table(name):
+        op.create_table(name, *columns, **kw)
+
+
+def add_column(table, column):
+    """Add a column; on SQLite batch mode copies the table if the change needs it"""
+    if has_column(table, column.name):
+        return
+    with op.batch_alter_table(table) as batch_op:
+        batch_op.add_column(column)
+
+
+def drop_column(table, column):
+    if has_column(table, column):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column(column)
+
+
+def create_index(name, table, columns, unique=False, **kw):
+    """Build an index without blocking writes (CONCURRENTLY on PostgreSQL)"""
+    if not is_postgres():
+        if not has_index(table, name):
+            op.create_index(name, table, columns, unique=unique, **kw)
+        return
+
+    with op.get_context().autocommit_block():
+        valid = op.get_bind().execute(sa.text(
+            'SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name'
+        ), {'name': name}).scalar()
+        if valid:
+            return
+        if valid is False:
+            # An interrupted concurrent build leaves an INVALID index behind
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True, **kw)
+
+
+def drop_index(name, table):
+    if has_index(table, name):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,82 @@
+"""full-text search over materials, assignments and submissions
+
+PostgreSQL gets GIN indexes on weighted tsvector expressions, which the
+database keeps current on every write. SQLite gets external-content FTS5
+tables kept in sync by triggers; a later batch migration that recreates
+one of these tables drops its triggers and must put them back.
+
+Revision ID: 0c5e93a7d41b
+Revises: f2c84d19b7e0
+Create Date: 2026-10-17 18:11:37.264930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import create_index, drop_index, has_table, is_postgres
+
+
+# revision identifiers, used by Alembic.
+revision = '0c5e93a7d41b'
+down_revision = 'f2c84d19b7e0'
+branch_labels = None
+depends_on = None
+
+
+# Must match SEARCH_VECTORS in app.py, or PostgreSQL will not use the indexes
+VECTORS = {
+    'material': "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+    'assignment': "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                  "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+                  "setweight(to_tsvector('english', coalesce(instructions, '')), 'C')",
+    'submission': "to_tsvector('english', coalesce(content, ''))",
+}
+
+# Indexed columns of each SQLite FTS5 table
+COLUMNS = {
+    'material': ['title', 'description'],
+    'assignment': ['title', 'description', 'instructions'],
+    'submission': ['content'],
+}
+
+
+def create_fts_table(table, columns):
+    fts = f'search_{table}'
+    if has_table(fts):
+        return
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{table}', content_rowid='id', "
+               f"tokenize='porter unicode61')")
+    op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+               f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END")
+    op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+               f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END")
+    op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} BEGIN "
+               f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+               f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END")
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def upgrade():
+    if is_postgres():
+        for table, vector in VECTORS.items():
+            create_index(f'ix_search_{table}', table, [sa.text(f'({vector})')], postgresql_using='gin')
+        return
+
+    for table, columns in COLUMNS.items():
+        create_fts_table(table, columns)
+
+
+def downgrade():
+    if is_postgres():
+        for table in VECTORS:
+            drop_index(f'ix_search_{table}', table)
+        return
+
+    for table in COLUMNS:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS search_{table}_{suffix}')
+        op.execute(f'DROP TABLE IF EXISTS search_{table}')
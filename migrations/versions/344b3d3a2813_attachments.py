@@ -0,0 +1,134 @@
+"""attachment table replaces the JSON files columns
+
+Revision ID: 344b3d3a2813
+Revises: aa0a95fe60a2
+Create Date: 2026-10-17 11:20:48.115020
+
+"""
+import json
+import re
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import add_column, create_index, create_table, drop_column, has_column
+
+
+# revision identifiers, used by Alembic.
+revision = '344b3d3a2813'
+down_revision = 'aa0a95fe60a2'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+BLOB_URL = re.compile(r'^/uploads/blobs/([0-9a-f]{64})$')
+
+attachment = sa.table('attachment',
+    sa.column('owner_type', sa.String),
+    sa.column('owner_id', sa.Integer),
+    sa.column('class_id', sa.Integer),
+    sa.column('position', sa.Integer),
+    sa.column('name', sa.String),
+    sa.column('mime_type', sa.String),
+    sa.column('size', sa.BigInteger),
+    sa.column('blob_sha256', sa.String),
+    sa.column('url', sa.Text),
+    sa.column('created_at', sa.DateTime)
+)
+
+# (owner type, query returning id, class id and the JSON files text)
+OWNERS = [
+    ('material', 'SELECT id, class_id, files FROM material WHERE files IS NOT NULL AND id > :after ORDER BY id'),
+    ('assignment', 'SELECT id, class_id, files FROM assignment WHERE files IS NOT NULL AND id > :after ORDER BY id'),
+    ('submission', 'SELECT s.id, a.class_id, s.files FROM submission s JOIN assignment a ON a.id = s.assignment_id '
+                   'WHERE s.files IS NOT NULL AND s.id > :after ORDER BY s.id'),
+]
+
+
+def attachment_rows(owner_type, owner_id, class_id, files_json, now):
+    try:
+        files = json.loads(files_json)
+    except ValueError:
+        return []
+    rows = []
+    for position, file_ref in enumerate(files if isinstance(files, list) else []):
+        if not isinstance(file_ref, dict) or not file_ref.get('url'):
+            continue
+        url = file_ref['url']
+        match = BLOB_URL.match(url)
+        size = file_ref.get('size')
+        rows.append({
+            'owner_type': owner_type,
+            'owner_id': owner_id,
+            'class_id': class_id,
+            'position': position,
+            'name': (file_ref.get('name') or url.rsplit('/', 1)[-1])[:255],
+            'mime_type': file_ref.get('type') or None,
+            'size': int(size) if isinstance(size, (int, float)) else None,
+            'blob_sha256': match.group(1) if match else None,
+            'url': url,
+            'created_at': now
+        })
+    return rows
+
+
+def upgrade():
+    create_table('attachment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('owner_type', sa.String(length=20), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=True),
+        sa.Column('mime_type', sa.String(length=150), nullable=True),
+        sa.Column('size', sa.BigInteger(), nullable=True),
+        sa.Column('blob_sha256', sa.String(length=64), nullable=True),
+        sa.Column('url', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    # Copy the JSON columns across in id order, a batch at a time
+    bind = op.get_bind()
+    now = datetime.utcnow()
+    for owner_type, query in OWNERS:
+        if not has_column(owner_type, 'files'):
+            continue
+        after = 0
+        while True:
+            records = bind.execute(sa.text(query + f' LIMIT {BATCH_SIZE}'), {'after': after}).all()
+            if not records:
+                break
+            rows = []
+            for owner_id, class_id, files_json in records:
+                rows.extend(attachment_rows(owner_type, owner_id, class_id, files_json, now))
+            if rows:
+                op.bulk_insert(attachment, rows)
+            after = records[-1][0]
+
+    create_index('ix_attachment_owner', 'attachment', ['owner_type', 'owner_id', 'position'])
+    create_index('ix_attachment_class_id', 'attachment', ['class_id'])
+    create_index('ix_attachment_blob_sha256', 'attachment', ['blob_sha256'])
+
+    for owner_type, _ in OWNERS:
+        drop_column(owner_type, 'files')
+
+
+def downgrade():
+    for owner_type, _ in OWNERS:
+        add_column(owner_type, sa.Column('files', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    files_by_owner = {}
+    for owner_type, owner_id, name, mime_type, size, url in bind.execute(sa.text(
+        'SELECT owner_type, owner_id, name, mime_type, size, url FROM attachment ORDER BY owner_type, owner_id, position'
+    )):
+        files_by_owner.setdefault((owner_type, owner_id), []).append(
+            {'name': name, 'type': mime_type, 'size': size, 'url': url}
+        )
+    for (owner_type, owner_id), files in files_by_owner.items():
+        bind.execute(sa.text(f'UPDATE {owner_type} SET files = :files WHERE id = :id'),
+                     {'files': json.dumps(files), 'id': owner_id})
+
+    op.drop_table('attachment')
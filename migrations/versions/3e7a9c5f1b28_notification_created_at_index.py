@@ -0,0 +1,23 @@
+"""index notifications by age for cleanup
+
+Revision ID: 3e7a9c5f1b28
+Revises: 9d4b6e2a71c3
+Create Date: 2026-10-18 00:12:31.570412
+
+"""
+from schema_helpers import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '3e7a9c5f1b28'
+down_revision = '9d4b6e2a71c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index('ix_notification_created_at', 'notification', ['created_at'])
+
+
+def downgrade():
+    drop_index('ix_notification_created_at', 'notification')
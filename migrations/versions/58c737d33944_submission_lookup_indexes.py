@@ -0,0 +1,68 @@
+"""submission, material and assignment lookup indexes
+
+Revision ID: 58c737d33944
+Revises: 5b33577ea3db
+Create Date: 2026-10-17 10:31:05.266871
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import create_index, drop_index, has_index
+
+
+# revision identifiers, used by Alembic.
+revision = '58c737d33944'
+down_revision = '5b33577ea3db'
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger('alembic.env')
+
+
+def remove_duplicate_submissions():
+    """Older databases allowed several submissions per student and assignment.
+
+    Keep one per pair, preferring a graded row, then the newest; log every
+    row removed so a lost grade or answer can be traced.
+    """
+    conn = op.get_bind()
+    rows = conn.execute(sa.text(
+        'SELECT s.id, s.assignment_id, s.student_id, s.grade, s.date FROM submission s JOIN '
+        '(SELECT assignment_id, student_id FROM submission GROUP BY assignment_id, student_id HAVING COUNT(*) > 1) d '
+        'ON d.assignment_id = s.assignment_id AND d.student_id = s.student_id'
+    )).all()
+    groups = {}
+    for row in rows:
+        groups.setdefault((row.assignment_id, row.student_id), []).append(row)
+
+    removed = []
+    for (assignment_id, student_id), group in groups.items():
+        keep = max(group, key=lambda row: (row.grade is not None, row.date is not None, row.date, row.id))
+        for row in group:
+            if row.id != keep.id:
+                logger.warning('Removing duplicate submission %s (assignment %s, student %s, grade %s, date %s); '
+                               'kept %s', row.id, assignment_id, student_id, row.grade, row.date, keep.id)
+                removed.append(row.id)
+
+    delete = sa.text('DELETE FROM submission WHERE id IN :ids').bindparams(sa.bindparam('ids', expanding=True))
+    for start in range(0, len(removed), 500):
+        conn.execute(delete, {'ids': removed[start:start + 500]})
+
+
+def upgrade():
+    if not has_index('submission', 'uq_submission_assignment_student'):
+        remove_duplicate_submissions()
+    create_index('uq_submission_assignment_student', 'submission', ['assignment_id', 'student_id'], unique=True)
+    create_index('ix_submission_student_id', 'submission', ['student_id'])
+    create_index('ix_material_class_id_date', 'material', ['class_id', 'date'])
+    create_index('ix_assignment_class_id_due_date', 'assignment', ['class_id', 'due_date'])
+
+
+def downgrade():
+    drop_index('ix_assignment_class_id_due_date', 'assignment')
+    drop_index('ix_material_class_id_date', 'material')
+    drop_index('ix_submission_student_id', 'submission')
+    drop_index('uq_submission_assignment_student', 'submission')
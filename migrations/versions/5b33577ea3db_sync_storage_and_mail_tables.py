@@ -0,0 +1,90 @@
+"""sync cursors, blob storage, uploads and mail outbox
+
+Revision ID: 5b33577ea3db
+Revises: ff578fc8e51d
+Create Date: 2026-10-17 10:14:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import add_column, create_index, create_table, drop_column, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '5b33577ea3db'
+down_revision = 'ff578fc8e51d'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ['class', 'material', 'assignment', 'submission', 'enrollments']
+
+
+def upgrade():
+    for table in SYNCED_TABLES:
+        add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+        create_index(f'ix_{table}_updated_at', table, ['updated_at'])
+
+    create_table('tombstone',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=True),
+        sa.Column('student_id', sa.Integer(), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_tombstone_class_id', 'tombstone', ['class_id'])
+    create_index('ix_tombstone_student_id', 'tombstone', ['student_id'])
+    create_index('ix_tombstone_deleted_at', 'tombstone', ['deleted_at'])
+
+    create_table('blob',
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(length=150), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('sha256')
+    )
+
+    create_table('upload_session',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('owner_type', sa.String(length=20), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=False),
+        sa.Column('content_type', sa.String(length=150), nullable=True),
+        sa.Column('total_size', sa.BigInteger(), nullable=False),
+        sa.Column('received', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+    create_table('outbound_email',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sender', sa.String(length=150), nullable=False),
+        sa.Column('recipient', sa.String(length=150), nullable=False),
+        sa.Column('reply_to', sa.String(length=150), nullable=True),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('claim_token', sa.String(length=36), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_outbound_email_next_attempt_at', 'outbound_email', ['next_attempt_at'])
+    create_index('ix_outbound_email_claim_token', 'outbound_email', ['claim_token'])
+
+
+def downgrade():
+    op.drop_table('outbound_email')
+    op.drop_table('upload_session')
+    op.drop_table('blob')
+    op.drop_table('tombstone')
+
+    for table in reversed(SYNCED_TABLES):
+        drop_index(f'ix_{table}_updated_at', table)
+        drop_column(table, 'updated_at')
@@ -0,0 +1,32 @@
+"""server-side session store
+
+Revision ID: 6a1f3e8d2c47
+Revises: 0c5e93a7d41b
+Create Date: 2026-10-17 21:05:42.118530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision = '6a1f3e8d2c47'
+down_revision = '0c5e93a7d41b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table('user_session',
+        sa.Column('id', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.Text(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_user_session_expires_at', 'user_session', ['expires_at'])
+
+
+def downgrade():
+    op.drop_table('user_session')
@@ -0,0 +1,56 @@
+"""make page sort keys stable: material.date not null, submissions paged by id
+
+On SQLite the batch alter recreates the material table, which drops the
+full-text search triggers from 0c5e93a7d41b; they are put back here.
+
+Revision ID: 7b2f5d8e9a14
+Revises: 3e7a9c5f1b28
+Create Date: 2026-10-18 00:47:15.902338
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import create_index, drop_index, is_postgres
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2f5d8e9a14'
+down_revision = '3e7a9c5f1b28'
+branch_labels = None
+depends_on = None
+
+
+def set_material_date_nullable(nullable):
+    with op.batch_alter_table('material') as batch_op:
+        batch_op.alter_column('date', existing_type=sa.DateTime(), nullable=nullable)
+    if is_postgres():
+        return
+
+    # Same triggers as 0c5e93a7d41b creates for search_material
+    for suffix in ('ai', 'ad', 'au'):
+        op.execute(f'DROP TRIGGER IF EXISTS search_material_{suffix}')
+    op.execute("CREATE TRIGGER search_material_ai AFTER INSERT ON material BEGIN "
+               "INSERT INTO search_material(rowid, title, description) VALUES (new.id, new.title, new.description); END")
+    op.execute("CREATE TRIGGER search_material_ad AFTER DELETE ON material BEGIN "
+               "INSERT INTO search_material(search_material, rowid, title, description) "
+               "VALUES ('delete', old.id, old.title, old.description); END")
+    op.execute("CREATE TRIGGER search_material_au AFTER UPDATE OF title, description ON material BEGIN "
+               "INSERT INTO search_material(search_material, rowid, title, description) "
+               "VALUES ('delete', old.id, old.title, old.description); "
+               "INSERT INTO search_material(rowid, title, description) VALUES (new.id, new.title, new.description); END")
+
+
+def upgrade():
+    op.execute('UPDATE material SET date = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE date IS NULL')
+    set_material_date_nullable(False)
+
+    create_index('ix_submission_assignment_id_id', 'submission', ['assignment_id', 'id'])
+    drop_index('ix_submission_assignment_id_date', 'submission')
+
+
+def downgrade():
+    create_index('ix_submission_assignment_id_date', 'submission', ['assignment_id', 'date', 'id'])
+    drop_index('ix_submission_assignment_id_id', 'submission')
+
+    set_material_date_nullable(True)
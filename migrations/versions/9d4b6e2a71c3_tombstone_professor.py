@@ -0,0 +1,27 @@
+"""scope class tombstones to their professor
+
+Revision ID: 9d4b6e2a71c3
+Revises: 6a1f3e8d2c47
+Create Date: 2026-10-17 23:41:09.264117
+
+"""
+import sqlalchemy as sa
+
+from schema_helpers import add_column, create_index, drop_column, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4b6e2a71c3'
+down_revision = '6a1f3e8d2c47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column('tombstone', sa.Column('professor_id', sa.Integer(), nullable=True))
+    create_index('ix_tombstone_professor_id', 'tombstone', ['professor_id'])
+
+
+def downgrade():
+    drop_index('ix_tombstone_professor_id', 'tombstone')
+    drop_column('tombstone', 'professor_id')
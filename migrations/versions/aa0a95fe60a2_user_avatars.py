@@ -0,0 +1,27 @@
+"""user avatars
+
+Revision ID: aa0a95fe60a2
+Revises: 58c737d33944
+Create Date: 2026-10-17 10:45:52.730419
+
+"""
+import sqlalchemy as sa
+
+from schema_helpers import add_column, drop_column
+
+
+# revision identifiers, used by Alembic.
+revision = 'aa0a95fe60a2'
+down_revision = '58c737d33944'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column('student', sa.Column('avatar_url', sa.String(length=500), nullable=True))
+    add_column('professor', sa.Column('avatar_url', sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    drop_column('professor', 'avatar_url')
+    drop_column('student', 'avatar_url')
@@ -0,0 +1,31 @@
+"""shared class-access versions for the authorization cache
+
+Revision ID: c41d7e9b2f60
+Revises: 7b2f5d8e9a14
+Create Date: 2026-10-18 09:14:52.381904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import create_table
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e9b2f60'
+down_revision = '7b2f5d8e9a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table('class_access_version',
+        sa.Column('user_type', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('user_type', 'user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('class_access_version')
@@ -0,0 +1,23 @@
+"""index submissions for keyset pages by date
+
+Revision ID: d3a98c1f6e27
+Revises: b7e2d41c9a05
+Create Date: 2026-10-17 15:12:40.518833
+
+"""
+from schema_helpers import create_index, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a98c1f6e27'
+down_revision = 'b7e2d41c9a05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index('ix_submission_assignment_id_date', 'submission', ['assignment_id', 'date', 'id'])
+
+
+def downgrade():
+    drop_index('ix_submission_assignment_id_date', 'submission')
@@ -0,0 +1,46 @@
+"""server-side notification feed
+
+Revision ID: e61f0b7c3a52
+Revises: d3a98c1f6e27
+Create Date: 2026-10-17 16:20:08.731402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import create_index, create_table
+
+
+# revision identifiers, used by Alembic.
+revision = 'e61f0b7c3a52'
+down_revision = 'd3a98c1f6e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table('notification',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('recipient_type', sa.String(length=20), nullable=False),
+        sa.Column('recipient_id', sa.Integer(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=True),
+        sa.Column('assignment_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_index('ix_notification_recipient', 'notification', ['recipient_type', 'recipient_id', 'id'])
+    create_table('notification_cursor',
+        sa.Column('recipient_type', sa.String(length=20), nullable=False),
+        sa.Column('recipient_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('last_read_id', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('recipient_type', 'recipient_id')
+    )
+
+
+def downgrade():
+    op.drop_table('notification_cursor')
+    op.drop_table('notification')
@@ -0,0 +1,38 @@
+"""deadline scheduler state and indexes
+
+Revision ID: f2c84d19b7e0
+Revises: e61f0b7c3a52
+Create Date: 2026-10-17 17:02:44.915230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import add_column, create_index, drop_column, drop_index
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c84d19b7e0'
+down_revision = 'e61f0b7c3a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    add_column('assignment', sa.Column('reminders_sent', sa.Integer(), nullable=False, server_default='0'))
+    add_column('assignment', sa.Column('closed_at', sa.DateTime(), nullable=True))
+    add_column('material', sa.Column('reminders_sent', sa.Integer(), nullable=False, server_default='0'))
+
+    # Deadlines that passed before the scheduler existed are closed, not replayed
+    op.execute('UPDATE assignment SET closed_at = due_date WHERE due_date <= CURRENT_TIMESTAMP')
+
+    create_index('ix_assignment_closed_at_due_date', 'assignment', ['closed_at', 'due_date'])
+    create_index('ix_material_deadline', 'material', ['deadline'])
+
+
+def downgrade():
+    drop_index('ix_material_deadline', 'material')
+    drop_index('ix_assignment_closed_at_due_date', 'assignment')
+    drop_column('material', 'reminders_sent')
+    drop_column('assignment', 'closed_at')
+    drop_column('assignment', 'reminders_sent')
@@ -0,0 +1,127 @@
+"""initial schema
+
+Revision ID: ff578fc8e51d
+Revises: 
+Create Date: 2026-10-17 10:02:11.418305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from schema_helpers import create_table
+
+
+# revision identifiers, used by Alembic.
+revision = 'ff578fc8e51d'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_table('student',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=150), nullable=False),
+        sa.Column('password', sa.String(length=200), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=True),
+        sa.Column('last_name', sa.String(length=100), nullable=True),
+        sa.Column('student_id', sa.String(length=50), nullable=True),
+        sa.Column('course', sa.String(length=100), nullable=True),
+        sa.Column('year_level', sa.String(length=50), nullable=True),
+        sa.Column('user_type', sa.String(length=20), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('student_id'),
+        sa.UniqueConstraint('username')
+    )
+    create_table('professor',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=150), nullable=False),
+        sa.Column('password', sa.String(length=200), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=True),
+        sa.Column('last_name', sa.String(length=100), nullable=True),
+        sa.Column('professor_id', sa.String(length=50), nullable=True),
+        sa.Column('department', sa.String(length=100), nullable=True),
+        sa.Column('user_type', sa.String(length=20), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('professor_id'),
+        sa.UniqueConstraint('username')
+    )
+    create_table('password_reset_token',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=150), nullable=False),
+        sa.Column('token', sa.String(length=100), nullable=False),
+        sa.Column('user_type', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('used', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('token')
+    )
+    create_table('class',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=150), nullable=False),
+        sa.Column('description', sa.String(length=300), nullable=True),
+        sa.Column('code', sa.String(length=10), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('professor_id', sa.Integer(), nullable=False),
+        sa.Column('archived', sa.Boolean(), nullable=True),
+        sa.ForeignKeyConstraint(['professor_id'], ['professor.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code')
+    )
+    create_table('enrollments',
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['class_id'], ['class.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+        sa.PrimaryKeyConstraint('student_id', 'class_id')
+    )
+    create_table('material',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('date', sa.DateTime(), nullable=True),
+        sa.Column('deadline', sa.DateTime(), nullable=True),
+        sa.Column('resource_link', sa.String(length=500), nullable=True),
+        sa.Column('files', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['class_id'], ['class.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_table('assignment',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('instructions', sa.Text(), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=True),
+        sa.Column('date_created', sa.DateTime(), nullable=True),
+        sa.Column('files', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['class_id'], ['class.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    create_table('submission',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('assignment_id', sa.Integer(), nullable=False),
+        sa.Column('student_id', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('files', sa.Text(), nullable=True),
+        sa.Column('date', sa.DateTime(), nullable=True),
+        sa.Column('grade', sa.Float(), nullable=True),
+        sa.Column('feedback', sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(['assignment_id'], ['assignment.id']),
+        sa.ForeignKeyConstraint(['student_id'], ['student.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('submission')
+    op.drop_table('assignment')
+    op.drop_table('material')
+    op.drop_table('enrollments')
+    op.drop_table('class')
+    op.drop_table('password_reset_token')
+    op.drop_table('professor')
+    op.drop_table('student')
@@ -177,11 +177,30 @@ if (globalSearchInput && searchResultsDropdown) {
   });
 }
 
-function performGlobalSearch(searchTerm) {
+// Assignments, materials and submissions are searched on the server, so
+// archived classes and unloaded pages are included
+let globalSearchRequest = 0;
+
+async function fetchSearchResults(searchTerm) {
+  const response = await fetch(`/api/search?q=${encodeURIComponent(searchTerm)}&limit=30`);
+  if (!response.ok) throw new Error(`Search failed: ${response.status}`);
+  return response.json();
+}
+
+// Snippets arrive with <mark> around matches; everything else is escaped
+function searchSnippetHtml(snippet) {
+  if (!snippet) return '';
+  const escaped = snippet.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+  return escaped.replace(/&lt;mark&gt;/g, '<span class="search-highlight">').replace(/&lt;\/mark&gt;/g, '</span>');
+}
+
+async function performGlobalSearch(searchTerm) {
+  const requestId = ++globalSearchRequest;
   const results = {
     classes: [],
     assignments: [],
     materials: [],
+    submissions: [],
     students: []
   };
   
@@ -202,43 +221,6 @@ function performGlobalSearch(searchTerm) {
       });
     }
     
-    // Search assignments within class
-    if (classItem.assignments) {
-      classItem.assignments.forEach(assignment => {
-        if (assignment.title.toLowerCase().includes(searchLower) ||
-            (assignment.description && assignment.description.toLowerCase().includes(searchLower))) {
-          results.assignments.push({
-            id: assignment.id,
-            classId: classItem.id,
-            className: classItem.name,
-            title: assignment.title,
-            description: assignment.description,
-            dueDate: assignment.dueDate,
-            points: assignment.points,
-            type: 'assignment'
-          });
-        }
-      });
-    }
-    
-    // Search materials within class
-    if (classItem.materials) {
-      classItem.materials.forEach(material => {
-        if (material.title.toLowerCase().includes(searchLower) ||
-            (material.description && material.description.toLowerCase().includes(searchLower))) {
-          results.materials.push({
-            id: material.id,
-            classId: classItem.id,
-            className: classItem.name,
-            title: material.title,
-            description: material.description,
-            date: material.date,
-            type: 'material'
-          });
-        }
-      });
-    }
-    
     // Search students within class
     if (classItem.students) {
       classItem.students.forEach(student => {
@@ -266,12 +248,36 @@ function performGlobalSearch(searchTerm) {
     }
   });
   
+  try {
+    const hits = await fetchSearchResults(searchTerm);
+    hits.forEach(hit => {
+      const item = {
+        id: hit.id,
+        classId: hit.classId,
+        className: hit.className,
+        title: hit.title,
+        snippet: hit.snippet,
+        type: hit.type
+      };
+      if (hit.type === 'assignment') {
+        results.assignments.push({ ...item, dueDate: hit.date });
+      } else if (hit.type === 'material') {
+        results.materials.push({ ...item, date: hit.date });
+      } else {
+        results.submissions.push({ ...item, date: hit.date, assignmentId: hit.assignmentId, studentName: hit.studentName });
+      }
+    });
+  } catch (error) {
+    console.error('Search error:', error);
+  }
+  
+  if (requestId !== globalSearchRequest) return; // A newer search has started
   displaySearchResults(results, searchTerm);
 }
 
 function displaySearchResults(results, searchTerm) {
   const totalResults = results.classes.length + results.assignments.length + 
-                       results.materials.length + results.students.length;
+                       results.materials.length + results.submissions.length + results.students.length;
   
   if (totalResults === 0) {
     searchResultsDropdown.innerHTML = `
@@ -323,7 +329,8 @@ function displaySearchResults(results, searchTerm) {
           <div class="search-result-content">
             <div class="search-result-title">${highlightedTitle}</div>
             <div class="search-result-subtitle">${item.className}</div>
-            <div class="search-result-meta">Due: ${dueDate} • ${item.points} points</div>
+            <div class="search-result-meta">Due: ${dueDate}</div>
+            <div class="search-result-meta">${searchSnippetHtml(item.snippet)}</div>
           </div>
         </div>
       `;
@@ -349,6 +356,7 @@ function displaySearchResults(results, searchTerm) {
             <div class="search-result-title">${highlightedTitle}</div>
             <div class="search-result-subtitle">${item.className}</div>
             <div class="search-result-meta">Posted: ${date}</div>
+            <div class="search-result-meta">${searchSnippetHtml(item.snippet)}</div>
           </div>
         </div>
       `;
@@ -358,6 +366,31 @@ function displaySearchResults(results, searchTerm) {
     }
   }
   
+  // Display Submissions
+  if (results.submissions.length > 0) {
+    html += `<div class="search-category"><i class="fas fa-file-upload"></i> Submissions (${results.submissions.length})</div>`;
+    results.submissions.slice(0, 5).forEach(item => {
+      const date = new Date(item.date).toLocaleDateString();
+      
+      html += `
+        <div class="search-result-item" onclick="navigateToSearchResult('${item.type}', '${item.assignmentId}', '${item.classId}')">
+          <div class="search-result-icon assignment">
+            <i class="fas fa-file-upload"></i>
+          </div>
+          <div class="search-result-content">
+            <div class="search-result-title">${highlightText(item.studentName || 'Student', searchTerm)} • ${highlightText(item.title, searchTerm)}</div>
+            <div class="search-result-subtitle">${item.className}</div>
+            <div class="search-result-meta">Submitted: ${date}</div>
+            <div class="search-result-meta">${searchSnippetHtml(item.snippet)}</div>
+          </div>
+        </div>
+      `;
+    });
+    if (results.submissions.length > 5) {
+      html += `<div style="padding: 0.75rem 1.25rem; text-align: center; color: #666; font-size: 0.85rem;">+${results.submissions.length - 5} more submissions</div>`;
+    }
+  }
+  
   // Display Students
   if (results.students.length > 0) {
     html += `<div class="search-category"><i class="fas fa-users"></i> Students (${results.students.length})</div>`;
@@ -501,6 +534,11 @@ function navigateToSearchResult(type, id, classId = null) {
       }, 300);
       break;
       
+    case 'submission':
+      openClass(classId);
+      setTimeout(() => viewSubmissions(id), 300);
+      break;
+      
     case 'student':
       openClass(classId);
       setTimeout(() => {
@@ -528,18 +566,20 @@ function saveNotifications() {
   updateNotificationBadge();
 }
 
-// Add a new notification
-function addNotification(type, title, message, link = null) {
+// Add a new notification; serverItem is a row from /api/notifications
+function addNotification(type, title, message, link = null, serverItem = null) {
   const notification = {
-    id: Date.now().toString(),
-    type: type, // 'assignment', 'grade', 'material', 'enrollment', 'submission'
+    id: serverItem ? `server-${serverItem.id}` : Date.now().toString(),
+    type: type, // 'assignment', 'grade', 'material', 'enrollment', 'submission', 'deadline'
     title: title,
     message: message,
     link: link,
-    timestamp: new Date().toISOString(),
-    read: false
+    timestamp: serverItem ? serverItem.createdAt : new Date().toISOString(),
+    read: serverItem ? serverItem.read : false
   };
   
+  if (notifications.some(n => n.id === notification.id)) return;
+  
   notifications.unshift(notification); // Add to beginning
   
   // Keep only last 50 notifications
@@ -569,10 +609,40 @@ function markNotificationRead(notificationId) {
   }
 }
 
+// Server notification feed (missed submissions are reported when the deadline scheduler closes an assignment)
+let notificationCursor = Number(localStorage.getItem('professor_notification_cursor') || 0);
+
+async function pollNotifications() {
+  try {
+    // Pages come oldest first; keep reading until a burst is fully caught up
+    let feed;
+    do {
+      const response = await fetch(`/api/notifications?after=${notificationCursor}`);
+      if (!response.ok) return;
+      
+      feed = await response.json();
+      feed.items.forEach(item => {
+        addNotification(item.type, item.title, item.message, 'section:missed-tasks-section', item);
+      });
+      
+      notificationCursor = feed.cursor;
+      localStorage.setItem('professor_notification_cursor', String(notificationCursor));
+    } while (feed.hasMore);
+  } catch (error) {
+    console.error('Error checking notifications:', error);
+  }
+}
+
 // Mark all as read
 function markAllNotificationsRead() {
   notifications.forEach(n => n.read = true);
   saveNotifications();
+  
+  fetch('/api/notifications/read', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ upTo: notificationCursor })
+  }).catch(error => console.error('Error marking notifications read:', error));
 }
 
 // Clear all notifications
@@ -1381,8 +1451,8 @@ function renderClassList() {
   sortedClasses.forEach(classItem => {
     // ✅ FIX: Ensure fresh data calculation
     const studentCount = classItem.students ? classItem.students.length : 0;
-    const materialsCount = classItem.materials ? classItem.materials.length : 0;
-    const assignmentsCount = classItem.assignments ? classItem.assignments.length : 0;
+    const materialsCount = classListTotal(classItem, 'materials');
+    const assignmentsCount = classListTotal(classItem, 'assignments');
 
     console.log(`📊 Rendering Class "${classItem.name}": ${studentCount} students, ${materialsCount} materials, ${assignmentsCount} assignments`);
 
@@ -1497,8 +1567,8 @@ function renderArchivedClassList(archivedClasses) {
     
     // ✅ FIX: Calculate stats even for archived classes
     const studentCount = classItem.students ? classItem.students.length : 0;
-    const materialsCount = classItem.materials ? classItem.materials.length : 0;
-    const assignmentsCount = classItem.assignments ? classItem.assignments.length : 0;
+    const materialsCount = classListTotal(classItem, 'materials');
+    const assignmentsCount = classListTotal(classItem, 'assignments');
     
     classCard.innerHTML = `
       <div class="class-card-header">
@@ -1846,6 +1916,7 @@ async function viewStudentInClass(classId, studentId) {
   // ✅ FIX: Load fresh class data first
   try {
     await loadClassDataFromDatabase(classItem);
+    await loadAllClassItems(classItem, 'assignments');
   } catch (e) {
     console.error('Error loading class data:', e);
   }
@@ -2815,53 +2886,6 @@ function closeReminderModal() {
   }
 }
 
-// UPDATE: Add missed tasks notification check
-function checkMissedTasksForNotifications() {
-  const lastCheck = localStorage.getItem('professor_last_missed_check');
-  const lastCheckTime = lastCheck ? new Date(lastCheck) : new Date(0);
-  const now = new Date();
-  
-  let newMissedCount = 0;
-  const missedDetails = [];
-  
-  classes.forEach(classItem => {
-    if (classItem.assignments) {
-      classItem.assignments.forEach(assignment => {
-        const dueDate = new Date(assignment.dueDate);
-        
-        // âœ… FIX: Check if assignment became overdue since last check
-        if (dueDate < now && dueDate > lastCheckTime) {
-          if (classItem.students) {
-            classItem.students.forEach(student => {
-              const submission = assignment.submissions ? 
-                assignment.submissions.find(s => String(s.studentId) === String(student.id)) : null;
-              
-              if (!submission) {
-                newMissedCount++;
-                const studentName = student.name || `${student.first_name || ''} ${student.last_name || ''}`.trim();
-                missedDetails.push(`${studentName} - ${assignment.title}`);
-              }
-            });
-          }
-        }
-      });
-    }
-  });
-  
-  if (newMissedCount > 0) {
-    console.log(`📢 New missed tasks: ${newMissedCount}`, missedDetails);
-    addNotification(
-      'deadline',
-      'New Missed Submissions',
-      `${newMissedCount} student${newMissedCount > 1 ? 's have' : ' has'} missed assignment deadlines`,
-      'section:missed-tasks-section'
-    );
-  }
-  
-  localStorage.setItem('professor_last_missed_check', now.toISOString());
-}
-
-
 // UPDATE showSection to load archived when viewing that section:
 function showSection(sectionId, element = null) {
   contentSections.forEach(section => {
@@ -2979,8 +3003,8 @@ async function openClass(classId, isArchived = false) {
   });
   
   const studentsCount = classItem.students ? classItem.students.length : 0;
-  const materialsCount = classItem.materials ? classItem.materials.length : 0;
-  const assignmentsCount = classItem.assignments ? classItem.assignments.length : 0;
+  const materialsCount = classListTotal(classItem, 'materials');
+  const assignmentsCount = classListTotal(classItem, 'assignments');
 
   document.getElementById('class-title').textContent = classItem.name;
   document.getElementById('class-desc').textContent = classItem.description || 'No description provided';
@@ -3027,8 +3051,8 @@ function displayArchivedClassView(classItem) {
   });
   
   const studentsCount = classItem.students ? classItem.students.length : 0;
-  const materialsCount = classItem.materials ? classItem.materials.length : 0;
-  const assignmentsCount = classItem.assignments ? classItem.assignments.length : 0;
+  const materialsCount = classListTotal(classItem, 'materials');
+  const assignmentsCount = classListTotal(classItem, 'assignments');
 
   document.getElementById('class-title').textContent = classItem.name + ' (Archived - Read Only)';
   document.getElementById('class-desc').textContent = classItem.description || 'No description provided';
@@ -3354,31 +3378,119 @@ function updateCalendarAfterDeadlineChange(classId, assignmentId, oldDate, newDa
 }
 
 
-// ✅ NEW HELPER FUNCTION: Load class data from database
+// ✅ Keyset pagination: list endpoints return one page as an array, with the
+// next page's cursor in X-Next-Cursor and the total in X-Total-Count (first page)
+const LIST_PAGE_SIZE = 50;
+
+async function fetchPage(url, cursor = null, limit = LIST_PAGE_SIZE) {
+  const params = new URLSearchParams({ limit });
+  if (cursor) params.set('cursor', cursor);
+  const response = await fetch(`${url}${url.includes('?') ? '&' : '?'}${params}`);
+  if (!response.ok) throw new Error(`Failed to load ${url} (${response.status})`);
+  const total = response.headers.get('X-Total-Count');
+  return {
+    items: await response.json(),
+    nextCursor: response.headers.get('X-Next-Cursor'),
+    total: total !== null ? parseInt(total, 10) : null
+  };
+}
+
+// Every page, for views that need the whole list (calendar, reports)
+async function fetchAllPages(url) {
+  const items = [];
+  let cursor = null;
+  do {
+    const page = await fetchPage(url, cursor, 200);
+    items.push(...page.items);
+    cursor = page.nextCursor;
+  } while (cursor);
+  return items;
+}
+
+const classListUrls = {
+  materials: classId => `/api/professor/classes/${classId}/materials`,
+  assignments: classId => `/api/professor/classes/${classId}/assignments`
+};
+
+// First page of materials and assignments; the rest load as the lists scroll
 async function loadClassDataFromDatabase(classItem) {
-  // Load materials from database
-  try {
-    const materialsResponse = await fetch(`/api/professor/classes/${classItem.id}/materials`);
-    if (materialsResponse.ok) {
-      classItem.materials = await materialsResponse.json();
-      console.log(`✅ Loaded ${classItem.materials.length} materials for ${classItem.name}`);
+  classItem.pages = classItem.pages || {};
+  for (const kind of ['materials', 'assignments']) {
+    try {
+      const page = await fetchPage(classListUrls[kind](classItem.id));
+      classItem[kind] = page.items;
+      classItem.pages[kind] = { nextCursor: page.nextCursor, total: page.total ?? page.items.length, loading: false };
+      console.log(`✅ Loaded ${page.items.length} of ${classItem.pages[kind].total} ${kind} for ${classItem.name}`);
+    } catch (e) {
+      console.error(`Error loading ${kind}:`, e);
+      classItem[kind] = [];
+      classItem.pages[kind] = { nextCursor: null, total: 0, loading: false };
     }
-  } catch (e) {
-    console.error('Error loading materials:', e);
-    classItem.materials = [];
   }
+}
+
+function classListTotal(classItem, kind) {
+  const page = classItem.pages && classItem.pages[kind];
+  return page ? page.total : (classItem[kind] ? classItem[kind].length : 0);
+}
+
+async function loadMoreClassItems(classItem, kind) {
+  const page = classItem.pages && classItem.pages[kind];
+  if (!page || !page.nextCursor || page.loading) return;
   
-  // Load assignments from database
+  page.loading = true;
   try {
-    const assignmentsResponse = await fetch(`/api/professor/classes/${classItem.id}/assignments`);
-    if (assignmentsResponse.ok) {
-      classItem.assignments = await assignmentsResponse.json();
-      console.log(`✅ Loaded ${classItem.assignments.length} assignments for ${classItem.name}`);
-    }
+    const next = await fetchPage(classListUrls[kind](classItem.id), page.nextCursor);
+    const seen = new Set(classItem[kind].map(item => String(item.id)));
+    classItem[kind].push(...next.items.filter(item => !seen.has(String(item.id))));
+    page.nextCursor = next.nextCursor;
   } catch (e) {
-    console.error('Error loading assignments:', e);
-    classItem.assignments = [];
+    console.error(`Error loading more ${kind}:`, e);
+  } finally {
+    page.loading = false;
+  }
+  
+  if (String(classItem.id) !== String(currentClassId)) return;
+  if (kind === 'materials') {
+    loadClassPosts();
+  } else {
+    loadClassAssignments(document.getElementById('class-view')?.dataset.archived === 'true');
+  }
+}
+
+// Views that aggregate over a whole list (grades, per-student summaries) need every page
+async function loadAllClassItems(classItem, kind) {
+  const page = classItem.pages && classItem.pages[kind];
+  if (page && !page.nextCursor) return;
+  
+  classItem[kind] = await fetchAllPages(classListUrls[kind](classItem.id));
+  classItem.pages = classItem.pages || {};
+  classItem.pages[kind] = { nextCursor: null, total: classItem[kind].length, loading: false };
+}
+
+// Infinite scroll: a sentinel after the last card fetches the next page when it comes into view
+function attachLoadMoreSentinel(container, classItem, kind) {
+  const page = classItem.pages && classItem.pages[kind];
+  if (!page || !page.nextCursor) return;
+  
+  const sentinel = document.createElement('div');
+  sentinel.className = 'load-more-sentinel';
+  sentinel.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Loading more ${kind}...`;
+  container.appendChild(sentinel);
+  
+  if (!('IntersectionObserver' in window)) {
+    sentinel.innerHTML = `<button class="btn-secondary btn-small">Load more ${kind}</button>`;
+    sentinel.querySelector('button').onclick = () => loadMoreClassItems(classItem, kind);
+    return;
   }
+  
+  const observer = new IntersectionObserver(entries => {
+    if (entries.some(entry => entry.isIntersecting)) {
+      observer.disconnect();
+      loadMoreClassItems(classItem, kind);
+    }
+  }, { rootMargin: '200px' });
+  observer.observe(sentinel);
 }
 
 // Helper function to properly navigate to class from any section
@@ -3487,7 +3599,7 @@ async function deleteAssignment(assignmentId) {
         await loadClassDataFromDatabase(currentClass);
         loadClassAssignments();
         document.getElementById('class-assignments').textContent = 
-          currentClass.assignments ? currentClass.assignments.length : 0;
+          classListTotal(currentClass, 'assignments');
       }
     }
     
@@ -3557,7 +3669,7 @@ async function deleteMaterial(materialId) {
         await loadClassDataFromDatabase(currentClass);
         loadClassPosts();
         document.getElementById('class-materials').textContent = 
-          currentClass.materials ? currentClass.materials.length : 0;
+          classListTotal(currentClass, 'materials');
       }
     }
     
@@ -3651,6 +3763,8 @@ function loadClassPosts() {
     `;
     postsContainer.appendChild(postElement);
   });
+  
+  attachLoadMoreSentinel(postsContainer, classItem, 'materials');
 }
 
 // ✅ Enhanced Video Player with better controls
@@ -3829,7 +3943,8 @@ function loadClassAssignments(isArchived = false) {
   
   assignmentsContainer.innerHTML = '';
   
-  if (!isArchived) {
+  // Paged lists from the server are authoritative; the cache only fills in when they are missing
+  if (!isArchived && !(classItem.pages && classItem.pages.assignments)) {
     const professorClasses = localStorage.getItem('professor_classes');
     if (professorClasses) {
       try {
@@ -3856,11 +3971,8 @@ function loadClassAssignments(isArchived = false) {
     return;
   }
   
-  const sortedAssignments = [...classItem.assignments].sort((a, b) => {
-    const dateA = new Date(a.dateCreated || a.dueDate);
-    const dateB = new Date(b.dateCreated || b.dueDate);
-    return dateB - dateA;
-  });
+  // Same order as the server pages (latest due date first), so loaded pages append at the end
+  const sortedAssignments = [...classItem.assignments].sort((a, b) => new Date(b.dueDate) - new Date(a.dueDate));
   
   sortedAssignments.forEach(assignment => {
     // ✅ FIX: Count submissions correctly from database
@@ -3937,6 +4049,8 @@ function loadClassAssignments(isArchived = false) {
     `;
     assignmentsContainer.appendChild(assignmentElement);
   });
+  
+  attachLoadMoreSentinel(assignmentsContainer, classItem, 'assignments');
 }
 
 // professor-script.js - Replace uploadMaterial function
@@ -3978,19 +4092,7 @@ async function uploadMaterial() {
       
       // Upload each file to server
       for (const file of filesInput.files) {
-        const formData = new FormData();
-        formData.append('file', file);
-        
-        const response = await fetch('/api/upload_file', {
-          method: 'POST',
-          body: formData
-        });
-        
-        if (!response.ok) {
-          throw new Error(`Failed to upload ${file.name}`);
-        }
-        
-        const result = await response.json();
+        const result = await uploadFileInChunks(file);
         
         // Store file reference (not the actual data)
         material.files.push({
@@ -4019,6 +4121,74 @@ async function uploadMaterial() {
   }
 }
 
+// ✅ Chunked, resumable upload: files go up in 8MB pieces so the server never
+// buffers a whole video, and a dropped connection resumes from the last chunk
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+
+async function uploadFileInChunks(file) {
+  const resumeKey = `upload_resume:${file.name}:${file.size}:${file.lastModified}`;
+  let uploadId = localStorage.getItem(resumeKey);
+  let offset = 0;
+  
+  if (uploadId) {
+    const status = await fetch(`/api/uploads/${uploadId}`);
+    if (status.ok) {
+      offset = (await status.json()).offset;
+    } else {
+      uploadId = null;
+    }
+  }
+  
+  if (!uploadId) {
+    const init = await fetch('/api/uploads', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ filename: file.name, size: file.size, content_type: file.type })
+    });
+    const initData = await init.json().catch(() => ({}));
+    if (!init.ok) {
+      throw new Error(initData.error || `Failed to upload ${file.name}`);
+    }
+    uploadId = initData.upload_id;
+    localStorage.setItem(resumeKey, uploadId);
+  }
+  
+  let retries = 0;
+  while (offset < file.size) {
+    let response;
+    try {
+      response = await fetch(`/api/uploads/${uploadId}?offset=${offset}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/octet-stream' },
+        body: file.slice(offset, offset + UPLOAD_CHUNK_SIZE)
+      });
+    } catch (networkError) {
+      // Connection dropped: back off, then ask the server how much it kept
+      if (++retries > 5) throw networkError;
+      await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+      const status = await fetch(`/api/uploads/${uploadId}`).catch(() => null);
+      if (status && status.ok) offset = (await status.json()).offset;
+      continue;
+    }
+    
+    const data = await response.json().catch(() => ({}));
+    if (!response.ok && response.status !== 409) {
+      throw new Error(data.error || `Failed to upload ${file.name}`);
+    }
+    offset = data.offset;
+    retries = 0;
+  }
+  
+  const response = await fetch(`/api/uploads/${uploadId}/finalize`, { method: 'POST' });
+  const result = await response.json().catch(() => ({}));
+  if (!response.ok) {
+    throw new Error(result.error || `Failed to upload ${file.name}`);
+  }
+  
+  localStorage.removeItem(resumeKey);
+  return result;
+}
+
 //ADD THIS HELPER IF NOT EXISTS (same as student)
 function readFileAsDataURL(file) {
   return new Promise((resolve, reject) => {
@@ -4463,20 +4633,7 @@ async function saveAssignment() {
           saveBtn.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Uploading ${i + 1}/${filesInput.files.length}...`;
         }
         
-        const formData = new FormData();
-        formData.append('file', file);
-        
-        const response = await fetch('/api/upload_file', {
-          method: 'POST',
-          body: formData
-        });
-        
-        if (!response.ok) {
-          const errorData = await response.json().catch(() => ({}));
-          throw new Error(errorData.error || `Failed to upload ${file.name}`);
-        }
-        
-        const result = await response.json();
+        const result = await uploadFileInChunks(file);
         console.log('✅ File uploaded successfully:', file.name);
         
         assignment.files.push({
@@ -4713,22 +4870,22 @@ async function viewSubmissions(assignmentId) {
   // ✅ FIX: Load fresh assignment data from DATABASE
   let assignment = null;
   try {
-    const assignmentsResponse = await fetch(`/api/professor/classes/${currentClassId}/assignments`);
-    if (assignmentsResponse.ok) {
-      const assignments = await assignmentsResponse.json();
-      assignment = assignments.find(a => String(a.id) === String(assignmentId));
+    const assignments = await fetchAllPages(`/api/professor/classes/${currentClassId}/assignments`);
+    assignment = assignments.find(a => String(a.id) === String(assignmentId));
+    
+    if (assignment) {
+      console.log('✅ Found assignment from database:', assignment.title);
       
-      if (assignment) {
-        console.log('✅ Found assignment from database:', assignment.title);
-        
-        // ✅ Update class item with fresh data
-        classItem.assignments = assignments;
-        
-        // ✅ Update classes array
-        const classIndex = classes.findIndex(c => c.id === currentClassId);
-        if (classIndex !== -1) {
-          classes[classIndex].assignments = assignments;
-        }
+      // ✅ Update class item with fresh data; every page is loaded now
+      classItem.assignments = assignments;
+      if (classItem.pages && classItem.pages.assignments) {
+        classItem.pages.assignments = { nextCursor: null, total: assignments.length, loading: false };
+      }
+      
+      // ✅ Update classes array
+      const classIndex = classes.findIndex(c => c.id === currentClassId);
+      if (classIndex !== -1) {
+        classes[classIndex].assignments = assignments;
       }
     }
   } catch (e) {
@@ -4742,23 +4899,17 @@ async function viewSubmissions(assignmentId) {
   
   // ✅ FIX: Fetch fresh submissions from database
   try {
-    const response = await fetch(`/api/professor/assignments/${assignmentId}/submissions`);
-    if (response.ok) {
-      const submissions = await response.json();
-      assignment.submissions = submissions;
-      console.log(`✅ Loaded ${submissions.length} submissions from database`);
-      
-      // ✅ Update in classes array
-      const classIndex = classes.findIndex(c => c.id === currentClassId);
-      if (classIndex !== -1) {
-        const assignmentIndex = classes[classIndex].assignments.findIndex(a => String(a.id) === String(assignmentId));
-        if (assignmentIndex !== -1) {
-          classes[classIndex].assignments[assignmentIndex].submissions = submissions;
-        }
+    const submissions = await fetchAllPages(`/api/professor/assignments/${assignmentId}/submissions`);
+    assignment.submissions = submissions;
+    console.log(`✅ Loaded ${submissions.length} submissions from database`);
+    
+    // ✅ Update in classes array
+    const classIndex = classes.findIndex(c => c.id === currentClassId);
+    if (classIndex !== -1) {
+      const assignmentIndex = classes[classIndex].assignments.findIndex(a => String(a.id) === String(assignmentId));
+      if (assignmentIndex !== -1) {
+        classes[classIndex].assignments[assignmentIndex].submissions = submissions;
       }
-    } else {
-      console.warn('⚠️ No submissions found or API error');
-      assignment.submissions = [];
     }
   } catch (e) {
     console.error('❌ Error loading submissions:', e);
@@ -4928,19 +5079,16 @@ async function refreshAndViewSubmissions(assignmentId) {
     
     try {
         // Force refresh from database
-        const response = await fetch(`/api/professor/assignments/${assignmentId}/submissions`);
-        if (response.ok) {
-            const freshSubmissions = await response.json();
-            console.log('✅ Fresh submissions from DB:', freshSubmissions);
-            
-            // Update local state
-            const classItem = classes.find(c => c.id === currentClassId);
-            if (classItem && classItem.assignments) {
-                const assignment = classItem.assignments.find(a => String(a.id) === String(assignmentId));
-                if (assignment) {
-                    assignment.submissions = freshSubmissions;
-                    console.log(`✅ Updated ${freshSubmissions.length} submissions locally`);
-                }
+        const freshSubmissions = await fetchAllPages(`/api/professor/assignments/${assignmentId}/submissions`);
+        console.log('✅ Fresh submissions from DB:', freshSubmissions);
+        
+        // Update local state
+        const classItem = classes.find(c => c.id === currentClassId);
+        if (classItem && classItem.assignments) {
+            const assignment = classItem.assignments.find(a => String(a.id) === String(assignmentId));
+            if (assignment) {
+                assignment.submissions = freshSubmissions;
+                console.log(`✅ Updated ${freshSubmissions.length} submissions locally`);
             }
         }
     } catch (error) {
@@ -5357,17 +5505,15 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }, 500);
 
-    // Check for new missed tasks periodically
-    setInterval(() => {
-      checkMissedTasksForNotifications();
-    }, 60000); // Check every minute
+    // Check the notification feed periodically
+    setInterval(pollNotifications, 60000); // Check every minute
 
     // Initial check on load
-    setTimeout(checkMissedTasksForNotifications, 5000);
+    setTimeout(pollNotifications, 5000);
 
     loadClasses();
     
-      // ✅ ADD THIS: Load materials and assignments when opening a class
+      // ✅ openClass itself loads the first page of materials and assignments
   const originalOpenClass = openClass;
   openClass = async function(classId) {
     currentClassId = classId;
@@ -5375,26 +5521,6 @@ document.addEventListener('DOMContentLoaded', function() {
     
     if (!classItem) return;
     
-    // Load materials from database
-    try {
-      const materialsResponse = await fetch(`/api/professor/classes/${classId}/materials`);
-      if (materialsResponse.ok) {
-        classItem.materials = await materialsResponse.json();
-      }
-    } catch (e) {
-      console.error('Error loading materials:', e);
-    }
-    
-    // Load assignments from database
-    try {
-      const assignmentsResponse = await fetch(`/api/professor/classes/${classId}/assignments`);
-      if (assignmentsResponse.ok) {
-        classItem.assignments = await assignmentsResponse.json();
-      }
-    } catch (e) {
-      console.error('Error loading assignments:', e);
-    }
-    
     // Call original function
     originalOpenClass.call(this, classId);
   };
@@ -5402,30 +5528,28 @@ document.addEventListener('DOMContentLoaded', function() {
 
 
 // Load class grades
-function loadClassGrades() {
-  const classItem = classes.find(c => c.id === currentClassId);
+async function loadClassGrades() {
+  const classId = currentClassId;
   const gradesContainer = document.getElementById('grades-container');
   
-  if (!classItem || !gradesContainer) return;
+  if (!classId || !gradesContainer) return;
   
-  gradesContainer.innerHTML = '';
-  
-  // ✅ Load fresh assignment data from professor's localStorage
-  const professorClasses = localStorage.getItem('professor_classes');
-  if (professorClasses) {
-    try {
-      const profClasses = JSON.parse(professorClasses);
-      const matchingClass = profClasses.find(pc => pc.code === classItem.code);
-      if (matchingClass && matchingClass.assignments) {
-        classItem.assignments = matchingClass.assignments;
-        console.log('✅ Loaded assignments for grades view:', classItem.assignments.length);
-      }
-    } catch (e) {
-      console.error('Error loading professor data:', e);
-    }
+  // ✅ The columnar gradebook covers every assignment without loading the paged lists
+  let gradebook;
+  try {
+    const response = await fetch(`/api/professor/classes/${classId}/gradebook`);
+    if (!response.ok) throw new Error(`status ${response.status}`);
+    gradebook = await response.json();
+  } catch (e) {
+    console.error('Error loading gradebook:', e);
+    gradesContainer.innerHTML = '';
+    return;
   }
+  if (classId !== currentClassId) return;
   
-  if (!classItem.students || classItem.students.length === 0) {
+  const { assignments, students } = gradebook;
+  
+  if (students.id.length === 0) {
     gradesContainer.innerHTML = `
       <div class="empty-state">
         <i class="fas fa-chart-line"></i>
@@ -5447,11 +5571,9 @@ function loadClassGrades() {
   `;
   
   // Add assignment columns
-  if (classItem.assignments && classItem.assignments.length > 0) {
-    classItem.assignments.forEach(assignment => {
-      gradesHTML += `<th>${assignment.title} (${assignment.points}pts)</th>`;
-    });
-  }
+  assignments.id.forEach((_, column) => {
+    gradesHTML += `<th>${assignments.title[column]} (${assignments.points[column]}pts)</th>`;
+  });
   
   gradesHTML += `
             <th>Average</th>
@@ -5461,44 +5583,25 @@ function loadClassGrades() {
   `;
   
   // Add student rows
-  classItem.students.forEach(student => {
-    const studentName = student.name || `${student.first_name || ''} ${student.last_name || ''}`.trim();
-    const studentId = student.student_id || student.id;
-    
+  students.id.forEach((_, row) => {
     gradesHTML += `
       <tr>
-        <td>${studentName}</td>
-        <td>${studentId}</td>
+        <td>${students.name[row]}</td>
+        <td>${students.studentId[row] || students.id[row]}</td>
     `;
     
-    let totalScore = 0;
-    let totalMaxPoints = 0;
-    let gradedCount = 0;
-    
-    // Add grades for each assignment
-    if (classItem.assignments && classItem.assignments.length > 0) {
-      classItem.assignments.forEach(assignment => {
-        const submission = assignment.submissions ? 
-          assignment.submissions.find(s => String(s.studentId) === String(student.id)) : null;
-        
-        if (submission && submission.grade !== undefined && submission.grade !== null) {
-          gradesHTML += `<td>${submission.grade}/${assignment.points}</td>`;
-          totalScore += submission.grade;
-          totalMaxPoints += assignment.points;
-          gradedCount++;
-        } else if (submission) {
-          gradesHTML += '<td>Submitted</td>';
-          totalMaxPoints += assignment.points;
-        } else {
-          gradesHTML += '<td>-</td>';
-        }
-      });
-    }
-    
-    // Calculate average
-    const average = gradedCount > 0 ? ((totalScore / totalMaxPoints) * 100).toFixed(2) : '-';
+    gradebook.grades[row].forEach((grade, column) => {
+      if (grade !== null) {
+        gradesHTML += `<td>${grade}/${assignments.points[column]}</td>`;
+      } else if (gradebook.submitted[row][column]) {
+        gradesHTML += '<td>Submitted</td>';
+      } else {
+        gradesHTML += '<td>-</td>';
+      }
+    });
     
-    gradesHTML += `<td><strong>${average}${average !== '-' ? '%' : ''}</strong></td>`;
+    const average = students.average[row];
+    gradesHTML += `<td><strong>${average !== null ? `${average.toFixed(2)}%` : '-'}</strong></td>`;
     gradesHTML += `</tr>`;
   });
   
@@ -5534,41 +5637,14 @@ function exportStudentList() {
 
 // Export grades
 function exportGrades() {
-  const classItem = classes.find(c => c.id === currentClassId);
-  if (!classItem) return;
-  
-  let csvContent = 'Student,Student ID';
-  
-  // Add assignment headers
-  classItem.assignments.forEach(assignment => {
-    csvContent += `,"${assignment.title} (Score)","${assignment.title} (Points)"`; // Export score and max points
-  });
-  
-  csvContent += ',Average (%)\n';
-  
-  // Add student data
-  classItem.students.forEach(student => {
-    csvContent += `"${student.name}",${student.id}`;
-    
-    let totalScore = 0;
-    let totalMaxPoints = 0;
-    
-    classItem.assignments.forEach(assignment => {
-      const submission = assignment.submissions.find(s => s.studentId === student.id);
-      if (submission && submission.grade !== undefined) {
-        csvContent += `,${submission.grade},${assignment.points}`;
-        totalScore += submission.grade;
-        totalMaxPoints += assignment.points;
-      } else {
-        csvContent += ',-,-';
-      }
-    });
-    
-    const average = totalMaxPoints > 0 ? ((totalScore / totalMaxPoints) * 100).toFixed(2) : '-';
-    csvContent += `,${average}\n`;
-  });
+  if (!currentClassId) return;
   
-  downloadCSV(csvContent, `${classItem.name}_grades.csv`);
+  // The server streams the CSV from the materialized gradebook
+  const a = document.createElement('a');
+  a.href = `/api/professor/classes/${currentClassId}/gradebook?format=csv`;
+  document.body.appendChild(a);
+  a.click();
+  document.body.removeChild(a);
 }
 
 // Download CSV file
@@ -6658,13 +6734,86 @@ function exportAllStudents() {
 // Auto-refresh data every 30 seconds
 let refreshInterval = null;
 
+// ✅ Delta sync: each poll asks /refresh-data?since=<cursor> what changed and
+// only runs the full reload when the server reports something new
+let syncCursor = document.querySelector('meta[name="sync-cursor"]')?.content || null;
+// The server repeats a short window behind the cursor; remember what the last
+// poll reported so those repeats don't trigger another reload
+let seenChanges = new Set();
+
+async function hasRemoteChanges() {
+    const role = document.body.classList.contains('professor-dashboard') ? 'professor' : 'student';
+    
+    if (!syncCursor) return true;
+    
+    try {
+        const response = await fetch(`/api/${role}/refresh-data?since=${encodeURIComponent(syncCursor)}`);
+        if (!response.ok) return true;
+        
+        const delta = await response.json();
+        syncCursor = delta.cursor;
+        const changes = delta.changes || [];
+        const hasNew = changes.some(key => !seenChanges.has(key));
+        seenChanges = new Set(changes);
+        return hasNew;
+    } catch (error) {
+        console.error('Delta sync error:', error);
+        return true;
+    }
+}
+
+// ✅ Server-sent events: refresh as soon as the server reports a change and
+// skip the 30-second poll while the stream is connected
+let changeEvents = null;
+let changeEventsConnected = false;
+let changeRefreshTimer = null;
+
+function connectChangeEvents() {
+    if (!window.EventSource || changeEvents) return;
+    
+    changeEvents = new EventSource('/api/events');
+    changeEvents.onopen = () => { changeEventsConnected = true; };
+    changeEvents.onerror = () => {
+        changeEventsConnected = false;
+        // A refused stream (503 when the server is at its stream limit) is not retried by
+        // the browser; keep polling and try again later
+        if (changeEvents.readyState === EventSource.CLOSED) {
+            changeEvents = null;
+            setTimeout(connectChangeEvents, 60000 + Math.random() * 30000);
+        }
+    };
+    
+    ['assignment', 'material', 'deadline', 'grade', 'submission'].forEach(type => {
+        changeEvents.addEventListener(type, () => {
+            if (type === 'deadline') {
+                pollNotifications();
+            }
+            if (document.hidden) return; // visibilitychange refreshes when the tab comes back
+            
+            // Coalesce bursts (e.g. a batch of grades) into one refresh
+            clearTimeout(changeRefreshTimer);
+            changeRefreshTimer = setTimeout(() => {
+                if (document.body.classList.contains('professor-dashboard')) {
+                    refreshProfessorData();
+                } else {
+                    refreshStudentData();
+                }
+            }, 500);
+        });
+    });
+}
+
 function startAutoRefresh() {
+    connectChangeEvents();
+    
     if (refreshInterval) {
         clearInterval(refreshInterval);
     }
     
     refreshInterval = setInterval(async () => {
         if (document.hidden) return; // Don't refresh when tab is hidden
+        if (changeEventsConnected) return; // Server pushes changes while the stream is open
+        if (!(await hasRemoteChanges())) return; // Nothing changed since the last poll
         
         console.log('🔄 Auto-refreshing data...');
         
@@ -6740,62 +6889,6 @@ style.textContent = `
 `;
 document.head.appendChild(style);
 
-// Run this in browser console on both dashboards:
-
-
-function checkForNewAssignments() {
-  const lastCheck = localStorage.getItem('student_last_assignment_check');
-  const lastCheckTime = lastCheck ? new Date(lastCheck) : new Date(Date.now() - 24 * 60 * 60 * 1000); // 24 hours ago
-  const now = new Date();
-  
-  let newAssignments = 0;
-  let newMaterials = 0;
-  const notifiedItems = new Set(JSON.parse(localStorage.getItem('student_notified_items') || '[]'));
-  
-  enrolledClasses.forEach(classItem => {
-    if (classItem.assignments) {
-      classItem.assignments.forEach(assignment => {
-        const assignmentDate = new Date(assignment.dateCreated || assignment.dueDate);
-        const notificationKey = `assignment-${assignment.id}`;
-        
-        if (assignmentDate > lastCheckTime && !notifiedItems.has(notificationKey)) {
-          newAssignments++;
-          notifiedItems.add(notificationKey);
-          
-          addNotification(
-            'assignment',
-            'New Assignment Posted',
-            `"${assignment.title}" in ${classItem.name}`,
-            `class:${classItem.id}`
-          );
-        }
-      });
-    }
-    
-    if (classItem.materials) {
-      classItem.materials.forEach(material => {
-        const materialDate = new Date(material.date);
-        const notificationKey = `material-${material.id}`;
-        
-        if (materialDate > lastCheckTime && !notifiedItems.has(notificationKey)) {
-          newMaterials++;
-          notifiedItems.add(notificationKey);
-          
-          addNotification(
-            'material',
-            'New Material Uploaded',
-            `"${material.title}" in ${classItem.name}`,
-            `class:${classItem.id}`
-          );
-        }
-      });
-    }
-  });
-  
-  localStorage.setItem('student_notified_items', JSON.stringify([...notifiedItems]));
-  localStorage.setItem('student_last_assignment_check', now.toISOString());
-}
-
 // Add global error handler
 window.addEventListener('error', function(e) {
   console.error('Global error:', e.error);
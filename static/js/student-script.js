@@ -71,8 +71,9 @@ function saveNotifications() {
   updateNotificationBadge();
 }
 
-// ✅ FIX #2: Add a new notification with settings check
-function addNotification(type, title, message, link = null) {
+// ✅ FIX #2: Add a new notification with settings check; serverItem is a
+// row from /api/notifications, which carries its own id, time and read state
+function addNotification(type, title, message, link = null, serverItem = null) {
   const settings = getNotificationSettings();
   
   const typeToSetting = {
@@ -91,15 +92,17 @@ function addNotification(type, title, message, link = null) {
   }
   
   const notification = {
-    id: Date.now().toString(),
+    id: serverItem ? `server-${serverItem.id}` : Date.now().toString(),
     type: type,
     title: title,
     message: message,
     link: link,
-    timestamp: new Date().toISOString(),
-    read: false
+    timestamp: serverItem ? serverItem.createdAt : new Date().toISOString(),
+    read: serverItem ? serverItem.read : false
   };
   
+  if (notifications.some(n => n.id === notification.id)) return;
+  
   notifications.unshift(notification);
   
   if (notifications.length > 50) {
@@ -108,7 +111,7 @@ function addNotification(type, title, message, link = null) {
   
   saveNotifications();
   
-  if (settings[settingKey] && "Notification" in window) {
+  if (!notification.read && settings[settingKey] && "Notification" in window) {
     if (Notification.permission === "granted") {
       new Notification(title, {
         body: message,
@@ -119,6 +122,30 @@ function addNotification(type, title, message, link = null) {
   }
 }
 
+// ✅ Server notification feed: each check is one read past the last id seen
+let notificationCursor = Number(localStorage.getItem('student_notification_cursor') || 0);
+
+async function pollNotifications() {
+  try {
+    // Pages come oldest first; keep reading until a burst is fully caught up
+    let feed;
+    do {
+      const response = await fetch(`/api/notifications?after=${notificationCursor}`);
+      if (!response.ok) return;
+      
+      feed = await response.json();
+      feed.items.forEach(item => {
+        addNotification(item.type, item.title, item.message, item.classId ? `class:${item.classId}` : null, item);
+      });
+      
+      notificationCursor = feed.cursor;
+      localStorage.setItem('student_notification_cursor', String(notificationCursor));
+    } while (feed.hasMore);
+  } catch (error) {
+    console.error('Error checking notifications:', error);
+  }
+}
+
 // ✅ FIX #2: Get notification settings
 function getNotificationSettings() {
   const saved = localStorage.getItem('student_notification_settings');
@@ -160,6 +187,12 @@ function markNotificationRead(notificationId) {
 function markAllNotificationsRead() {
   notifications.forEach(n => n.read = true);
   saveNotifications();
+  
+  fetch('/api/notifications/read', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ upTo: notificationCursor })
+  }).catch(error => console.error('Error marking notifications read:', error));
 }
 
 // Clear all notifications
@@ -393,22 +426,22 @@ function initializeMainSearch() {
   });
 }
 
-function performSearch(query, inputElement) {
+// Assignments, materials and the student's own submissions are searched on the server
+let searchRequest = 0;
+
+// Snippets arrive with <mark> around matches; everything else is escaped
+function searchSnippetHtml(snippet) {
+  if (!snippet) return '';
+  const escaped = snippet.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;');
+  return escaped.replace(/&lt;mark&gt;/g, '<mark style="background: #fff3cd; padding: 0 2px; border-radius: 2px;">')
+                .replace(/&lt;\/mark&gt;/g, '</mark>');
+}
+
+async function performSearch(query, inputElement) {
+  const requestId = ++searchRequest;
   const results = [];
   
-  const professorClasses = localStorage.getItem('professor_classes');
-  let profClasses = [];
-  if (professorClasses) {
-    try {
-      profClasses = JSON.parse(professorClasses);
-    } catch (e) {
-      console.error('Error loading professor data:', e);
-    }
-  }
-  
   enrolledClasses.forEach(classItem => {
-    const matchingClass = profClasses.find(pc => pc.code === classItem.code);
-    
     if (classItem.name.toLowerCase().includes(query) || 
         classItem.code.toLowerCase().includes(query) ||
         (classItem.description && classItem.description.toLowerCase().includes(query))) {
@@ -422,57 +455,65 @@ function performSearch(query, inputElement) {
         action: () => openClass(classItem.id)
       });
     }
-    
-    const assignments = matchingClass && matchingClass.assignments ? 
-                       matchingClass.assignments : (classItem.assignments || []);
-    
-    if (assignments) {
-      assignments.forEach(assignment => {
-        if (assignment.title.toLowerCase().includes(query) || 
-            assignment.description.toLowerCase().includes(query) ||
-            (assignment.instructions && assignment.instructions.toLowerCase().includes(query))) {
-          
-          const submission = assignment.submissions ? 
-            assignment.submissions.find(s => String(s.studentId) === String(studentData.id)) : null;
-          const isSubmitted = !!submission;
-          const isOverdue = new Date(assignment.dueDate) < new Date() && !isSubmitted;
-          
-          results.push({
-            type: 'assignment',
-            title: assignment.title,
-            subtitle: `Assignment • ${classItem.name}`,
-            description: `Due: ${new Date(assignment.dueDate).toLocaleDateString()} • ${assignment.points} pts`,
-            icon: isOverdue ? 'fa-exclamation-triangle' : (isSubmitted ? 'fa-check-circle' : 'fa-tasks'),
-            color: isOverdue ? '#dc3545' : (isSubmitted ? '#28a745' : '#17a2b8'),
-            action: () => {
-              openClass(classItem.id);
-              setTimeout(() => switchTab('assignments'), 300);
-            }
-          });
-        }
-      });
+  });
+  
+  let hits = [];
+  try {
+    const response = await fetch(`/api/search?q=${encodeURIComponent(query)}&limit=15`);
+    if (response.ok) {
+      hits = await response.json();
     }
+  } catch (error) {
+    console.error('Search error:', error);
+  }
+  if (requestId !== searchRequest) return; // A newer search has started
+  
+  hits.forEach(hit => {
+    const openTab = tab => () => {
+      openClass(hit.classId);
+      setTimeout(() => switchTab(tab), 300);
+    };
     
-    const materials = matchingClass && matchingClass.materials ? 
-                     matchingClass.materials : (classItem.materials || []);
-    
-    if (materials) {
-      materials.forEach(material => {
-        if (material.title.toLowerCase().includes(query) || 
-            material.description.toLowerCase().includes(query)) {
-          results.push({
-            type: 'material',
-            title: material.title,
-            subtitle: `Material • ${classItem.name}`,
-            description: `Posted: ${new Date(material.date).toLocaleDateString()}`,
-            icon: 'fa-file-alt',
-            color: '#fd7e14',
-            action: () => {
-              openClass(classItem.id);
-              setTimeout(() => switchTab('posts'), 300);
-            }
-          });
-        }
+    if (hit.type === 'assignment') {
+      const classItem = enrolledClasses.find(c => String(c.id) === hit.classId);
+      const assignment = classItem && classItem.assignments ?
+        classItem.assignments.find(a => String(a.id) === hit.id) : null;
+      const submission = assignment && assignment.submissions ? 
+        assignment.submissions.find(s => String(s.studentId) === String(studentData.id)) : null;
+      const isSubmitted = !!submission;
+      const isOverdue = new Date(hit.date) < new Date() && !isSubmitted;
+      
+      results.push({
+        type: 'assignment',
+        title: hit.title,
+        subtitle: `Assignment • ${hit.className}`,
+        description: `Due: ${new Date(hit.date).toLocaleDateString()}${assignment ? ` • ${assignment.points} pts` : ''}`,
+        snippet: hit.snippet,
+        icon: isOverdue ? 'fa-exclamation-triangle' : (isSubmitted ? 'fa-check-circle' : 'fa-tasks'),
+        color: isOverdue ? '#dc3545' : (isSubmitted ? '#28a745' : '#17a2b8'),
+        action: openTab('assignments')
+      });
+    } else if (hit.type === 'material') {
+      results.push({
+        type: 'material',
+        title: hit.title,
+        subtitle: `Material • ${hit.className}`,
+        description: `Posted: ${new Date(hit.date).toLocaleDateString()}`,
+        snippet: hit.snippet,
+        icon: 'fa-file-alt',
+        color: '#fd7e14',
+        action: openTab('posts')
+      });
+    } else {
+      results.push({
+        type: 'submission',
+        title: hit.title,
+        subtitle: `Your submission • ${hit.className}`,
+        description: `Submitted: ${new Date(hit.date).toLocaleDateString()}`,
+        snippet: hit.snippet,
+        icon: 'fa-file-upload',
+        color: '#6f42c1',
+        action: openTab('assignments')
       });
     }
   });
@@ -572,6 +613,11 @@ function showSearchResults(results, inputElement, query) {
             ${result.description}
           </div>
         ` : ''}
+        ${result.snippet ? `
+          <div style="font-size: 0.8rem; color: #666; margin-top: 0.25rem;">
+            ${searchSnippetHtml(result.snippet)}
+          </div>
+        ` : ''}
       </div>
       ${result.action ? `
         <div style="display: flex; align-items: center; color: #cbd5e0;">
@@ -1258,12 +1304,7 @@ async function loadEnrolledClasses() {
             for (let classItem of enrolledClasses) {
                 // Load materials from database
                 try {
-                    const materialsResponse = await fetch(`/api/professor/classes/${classItem.id}/materials`);
-                    if (materialsResponse.ok) {
-                        classItem.materials = await materialsResponse.json();
-                    } else {
-                        classItem.materials = [];
-                    }
+                    classItem.materials = await fetchAllPages(`/api/professor/classes/${classItem.id}/materials`);
                 } catch (e) {
                     console.error('Error loading materials:', e);
                     classItem.materials = [];
@@ -1271,12 +1312,7 @@ async function loadEnrolledClasses() {
                 
                 // Load assignments from database
                 try {
-                    const assignmentsResponse = await fetch(`/api/professor/classes/${classItem.id}/assignments`);
-                    if (assignmentsResponse.ok) {
-                        classItem.assignments = await assignmentsResponse.json();
-                    } else {
-                        classItem.assignments = [];
-                    }
+                    classItem.assignments = await fetchAllPages(`/api/professor/classes/${classItem.id}/assignments`);
                 } catch (e) {
                     console.error('Error loading assignments:', e);
                     classItem.assignments = [];
@@ -1295,8 +1331,7 @@ async function loadEnrolledClasses() {
                 updateDashboardStats();
             }, 100);
             
-            checkForNewAssignments();
-            checkUpcomingDeadlines();
+            pollNotifications();
         } else {
             console.error('Failed to load classes:', response.status);
         }
@@ -1325,175 +1360,6 @@ async function forceReloadClassData() {
   }
 }
 
-// ✅ FIX #2: Check for new assignments and notify
-function checkForNewAssignments() {
-  const lastCheck = localStorage.getItem('student_last_assignment_check');
-  const lastCheckTime = lastCheck ? new Date(lastCheck) : new Date(Date.now() - 24 * 60 * 60 * 1000); // 24 hours ago
-  const now = new Date();
-  
-  let newAssignments = 0;
-  let newMaterials = 0;
-  const notifiedItems = new Set(JSON.parse(localStorage.getItem('student_notified_items') || '[]'));
-  
-  enrolledClasses.forEach(classItem => {
-    if (classItem.assignments) {
-      classItem.assignments.forEach(assignment => {
-        const assignmentDate = new Date(assignment.dateCreated || assignment.dueDate);
-        const notificationKey = `assignment-${assignment.id}`;
-        
-        if (assignmentDate > lastCheckTime && !notifiedItems.has(notificationKey)) {
-          newAssignments++;
-          notifiedItems.add(notificationKey);
-          
-          addNotification(
-            'assignment',
-            'New Assignment Posted',
-            `"${assignment.title}" in ${classItem.name}`,
-            `class:${classItem.id}`
-          );
-        }
-      });
-    }
-    
-    if (classItem.materials) {
-      classItem.materials.forEach(material => {
-        const materialDate = new Date(material.date);
-        const notificationKey = `material-${material.id}`;
-        
-        if (materialDate > lastCheckTime && !notifiedItems.has(notificationKey)) {
-          newMaterials++;
-          notifiedItems.add(notificationKey);
-          
-          addNotification(
-            'material',
-            'New Material Uploaded',
-            `"${material.title}" in ${classItem.name}`,
-            `class:${classItem.id}`
-          );
-        }
-      });
-    }
-  });
-  
-  localStorage.setItem('student_notified_items', JSON.stringify([...notifiedItems]));
-  localStorage.setItem('student_last_assignment_check', now.toISOString());
-}
-
-// âœ… FIX #2: Check for upcoming deadlines with accurate countdown
-function checkUpcomingDeadlines() {
-  const now = new Date();
-  const threeDaysFromNow = new Date(now.getTime() + (3 * 24 * 60 * 60 * 1000));
-  
-  const notifiedDeadlines = JSON.parse(localStorage.getItem('student_notified_deadlines') || '[]');
-  const newNotifications = [];
-  
-  enrolledClasses.forEach(classItem => {
-    if (classItem.assignments) {
-      classItem.assignments.forEach(assignment => {
-        const dueDate = new Date(assignment.dueDate);
-        const submission = assignment.submissions ? 
-          assignment.submissions.find(s => String(s.studentId) === String(studentData.id)) : null;
-        
-        if (!submission && dueDate > now && dueDate <= threeDaysFromNow) {
-          const notificationKey = `${assignment.id}-${dueDate.toISOString()}`;
-          
-          // âœ… FIX: Only notify once per assignment-deadline combo
-          if (!notifiedDeadlines.includes(notificationKey)) {
-            const daysUntil = Math.ceil((dueDate - now) / (1000 * 60 * 60 * 24));
-            
-            console.log(`â° Upcoming deadline: ${assignment.title} in ${daysUntil} days`);
-            
-            addNotification(
-              'deadline',
-              'Upcoming Deadline',
-              `"${assignment.title}" due in ${daysUntil} day${daysUntil > 1 ? 's' : ''} (${classItem.name})`,
-              `class:${classItem.id}`
-            );
-            
-            newNotifications.push(notificationKey);
-          }
-        }
-      });
-    }
-  });
-  
-  if (newNotifications.length > 0) {
-    const updatedNotifications = [...notifiedDeadlines, ...newNotifications];
-    localStorage.setItem('student_notified_deadlines', JSON.stringify(updatedNotifications));
-  }
-}
-
-// âœ… FIX #2: Check for new grades
-function checkForNewGrades() {
-  const lastCheck = localStorage.getItem('student_last_grade_check');
-  const lastCheckTime = lastCheck ? new Date(lastCheck) : new Date(0);
-  
-  enrolledClasses.forEach(classItem => {
-    if (classItem.assignments) {
-      classItem.assignments.forEach(assignment => {
-        const submission = assignment.submissions ? 
-          assignment.submissions.find(s => String(s.studentId) === String(studentData.id)) : null;
-        
-        if (submission && submission.grade !== undefined) {
-          const gradedDate = new Date(submission.gradedDate || submission.date);
-          
-          // âœ… FIX: Only notify if grade was added after last check
-          if (gradedDate > lastCheckTime) {
-            const percentage = ((submission.grade / assignment.points) * 100).toFixed(1);
-            
-            console.log(`📊 New grade: ${assignment.title} - ${percentage}%`);
-            
-            addNotification(
-              'grade',
-              'Grade Released',
-              `"${assignment.title}" - ${submission.grade}/${assignment.points} (${percentage}%)`,
-              `class:${classItem.id}`
-            );
-            
-            if (submission.feedback) {
-              addNotification(
-                'feedback',
-                'Feedback Received',
-                `Your professor left feedback on "${assignment.title}"`,
-                `class:${classItem.id}`
-              );
-            }
-          }
-        }
-      });
-    }
-  });
-  
-  localStorage.setItem('student_last_grade_check', new Date().toISOString());
-}
-
-// ✅ FIX #2: Check for upcoming deadlines
-function checkUpcomingDeadlines() {
-  const now = new Date();
-  const threeDaysFromNow = new Date(now.getTime() + (3 * 24 * 60 * 60 * 1000));
-  
-  enrolledClasses.forEach(classItem => {
-    if (classItem.assignments) {
-      classItem.assignments.forEach(assignment => {
-        const dueDate = new Date(assignment.dueDate);
-        const submission = assignment.submissions ? 
-          assignment.submissions.find(s => String(s.studentId) === String(studentData.id)) : null;
-        
-        if (!submission && dueDate > now && dueDate <= threeDaysFromNow) {
-          const daysUntil = Math.ceil((dueDate - now) / (1000 * 60 * 60 * 24));
-          
-          addNotification(
-            'deadline',
-            'Upcoming Deadline',
-            `"${assignment.title}" due in ${daysUntil} day${daysUntil > 1 ? 's' : ''} (${classItem.name})`,
-            `class:${classItem.id}`
-          );
-        }
-      });
-    }
-  });
-}
-
 async function loadArchivedClasses() {
   try {
     const response = await fetch('/api/professor/classes?archived=true');
@@ -1724,15 +1590,8 @@ async function openClass(classId, isArchived = false) {
         
         if (classItem) {
           // ✅ CRITICAL: Load fresh data specific to THIS class
-          const materialsResponse = await fetch(`/api/professor/classes/${classId}/materials`);
-          if (materialsResponse.ok) {
-            classItem.materials = await materialsResponse.json();
-          }
-          
-          const assignmentsResponse = await fetch(`/api/professor/classes/${classId}/assignments`);
-          if (assignmentsResponse.ok) {
-            classItem.assignments = await assignmentsResponse.json();
-          }
+          classItem.materials = await fetchAllPages(`/api/professor/classes/${classId}/materials`);
+          classItem.assignments = await fetchAllPages(`/api/professor/classes/${classId}/assignments`);
           
           // ✅ Display with isolated data
           displayClassView(classItem, true);
@@ -1757,14 +1616,26 @@ async function openClass(classId, isArchived = false) {
 }
 
 // ✅ NEW HELPER FUNCTION: Load class data from database (add this after openClass)
+// ✅ List endpoints are paged (cursor in X-Next-Cursor); follow it to the end
+async function fetchAllPages(url) {
+  const items = [];
+  let cursor = null;
+  do {
+    const params = new URLSearchParams({ limit: 200 });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${url}?${params}`);
+    if (!response.ok) throw new Error(`Failed to load ${url} (${response.status})`);
+    items.push(...await response.json());
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+}
+
 async function loadClassDataFromDatabase(classItem) {
   // Load materials from database
   try {
-    const materialsResponse = await fetch(`/api/professor/classes/${classItem.id}/materials`);
-    if (materialsResponse.ok) {
-      classItem.materials = await materialsResponse.json();
-      console.log(`✅ Loaded ${classItem.materials.length} materials for ${classItem.name}`);
-    }
+    classItem.materials = await fetchAllPages(`/api/professor/classes/${classItem.id}/materials`);
+    console.log(`✅ Loaded ${classItem.materials.length} materials for ${classItem.name}`);
   } catch (e) {
     console.error('Error loading materials:', e);
     classItem.materials = [];
@@ -1772,11 +1643,8 @@ async function loadClassDataFromDatabase(classItem) {
   
   // Load assignments from database
   try {
-    const assignmentsResponse = await fetch(`/api/professor/classes/${classItem.id}/assignments`);
-    if (assignmentsResponse.ok) {
-      classItem.assignments = await assignmentsResponse.json();
-      console.log(`✅ Loaded ${classItem.assignments.length} assignments for ${classItem.name}`);
-    }
+    classItem.assignments = await fetchAllPages(`/api/professor/classes/${classItem.id}/assignments`);
+    console.log(`✅ Loaded ${classItem.assignments.length} assignments for ${classItem.name}`);
   } catch (e) {
     console.error('Error loading assignments:', e);
     classItem.assignments = [];
@@ -2096,15 +1964,9 @@ async function loadClassAssignments(isArchived = false) {
   
   try {
     // ✅ FIX: Always load fresh assignments from database
-    const response = await fetch(`/api/professor/classes/${currentClassId}/assignments`);
-    if (response.ok) {
-      const assignments = await response.json();
-      classItem.assignments = assignments;
-      console.log(`✅ Loaded ${assignments.length} assignments for ${classItem.name}`);
-    } else {
-      console.error('Failed to load assignments');
-      classItem.assignments = [];
-    }
+    const assignments = await fetchAllPages(`/api/professor/classes/${currentClassId}/assignments`);
+    classItem.assignments = assignments;
+    console.log(`✅ Loaded ${assignments.length} assignments for ${classItem.name}`);
   } catch (e) {
     console.error('Error loading assignments:', e);
     classItem.assignments = [];
@@ -2289,15 +2151,12 @@ async function openSubmissionModal(assignmentId) {
   // ✅ Load fresh assignment data from DATABASE
   let assignment = null;
   try {
-    const assignmentsResponse = await fetch(`/api/professor/classes/${currentClassId}/assignments`);
-    if (assignmentsResponse.ok) {
-      const assignments = await assignmentsResponse.json();
-      assignment = assignments.find(a => String(a.id) === String(assignmentId));
-      
-      if (assignment) {
-        console.log('✅ Found assignment from database:', assignment.title);
-        classItem.assignments = assignments;
-      }
+    const assignments = await fetchAllPages(`/api/professor/classes/${currentClassId}/assignments`);
+    assignment = assignments.find(a => String(a.id) === String(assignmentId));
+    
+    if (assignment) {
+      console.log('✅ Found assignment from database:', assignment.title);
+      classItem.assignments = assignments;
     }
   } catch (e) {
     console.error('❌ Error loading assignments:', e);
@@ -2374,6 +2233,74 @@ async function openSubmissionModal(assignmentId) {
   console.log('✅ Submission modal opened successfully');
 }
 
+// ✅ Chunked, resumable upload: files go up in 8MB pieces so the server never
+// buffers a whole video, and a dropped connection resumes from the last chunk
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024;
+
+async function uploadFileInChunks(file) {
+  const resumeKey = `upload_resume:${file.name}:${file.size}:${file.lastModified}`;
+  let uploadId = localStorage.getItem(resumeKey);
+  let offset = 0;
+  
+  if (uploadId) {
+    const status = await fetch(`/api/uploads/${uploadId}`);
+    if (status.ok) {
+      offset = (await status.json()).offset;
+    } else {
+      uploadId = null;
+    }
+  }
+  
+  if (!uploadId) {
+    const init = await fetch('/api/uploads', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ filename: file.name, size: file.size, content_type: file.type })
+    });
+    const initData = await init.json().catch(() => ({}));
+    if (!init.ok) {
+      throw new Error(initData.error || `Failed to upload ${file.name}`);
+    }
+    uploadId = initData.upload_id;
+    localStorage.setItem(resumeKey, uploadId);
+  }
+  
+  let retries = 0;
+  while (offset < file.size) {
+    let response;
+    try {
+      response = await fetch(`/api/uploads/${uploadId}?offset=${offset}`, {
+        method: 'PUT',
+        headers: { 'Content-Type': 'application/octet-stream' },
+        body: file.slice(offset, offset + UPLOAD_CHUNK_SIZE)
+      });
+    } catch (networkError) {
+      // Connection dropped: back off, then ask the server how much it kept
+      if (++retries > 5) throw networkError;
+      await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+      const status = await fetch(`/api/uploads/${uploadId}`).catch(() => null);
+      if (status && status.ok) offset = (await status.json()).offset;
+      continue;
+    }
+    
+    const data = await response.json().catch(() => ({}));
+    if (!response.ok && response.status !== 409) {
+      throw new Error(data.error || `Failed to upload ${file.name}`);
+    }
+    offset = data.offset;
+    retries = 0;
+  }
+  
+  const response = await fetch(`/api/uploads/${uploadId}/finalize`, { method: 'POST' });
+  const result = await response.json().catch(() => ({}));
+  if (!response.ok) {
+    throw new Error(result.error || `Failed to upload ${file.name}`);
+  }
+  
+  localStorage.removeItem(resumeKey);
+  return result;
+}
+
 async function submitAssignment() {
   console.log('📤 SUBMIT ASSIGNMENT - Starting submission process');
   
@@ -2442,21 +2369,18 @@ async function submitAssignment() {
 
   try {
     // ✅ Verify assignment still exists in database
-    const verifyResponse = await fetch(`/api/professor/classes/${classId}/assignments`);
-    if (verifyResponse.ok) {
-      const assignments = await verifyResponse.json();
-      const assignment = assignments.find(a => String(a.id) === String(assignmentId));
-      
-      if (!assignment) {
-        throw new Error('Assignment not found. It may have been deleted by your professor.');
-      }
-      
-      // Check deadline again
-      const dueDate = new Date(assignment.dueDate);
-      const now = new Date();
-      if (now > dueDate) {
-        console.log('⚠️ Submitting past deadline');
-      }
+    const assignments = await fetchAllPages(`/api/professor/classes/${classId}/assignments`);
+    const assignment = assignments.find(a => String(a.id) === String(assignmentId));
+    
+    if (!assignment) {
+      throw new Error('Assignment not found. It may have been deleted by your professor.');
+    }
+    
+    // Check deadline again
+    const dueDate = new Date(assignment.dueDate);
+    const now = new Date();
+    if (now > dueDate) {
+      console.log('⚠️ Submitting past deadline');
     }
   } catch (e) {
     console.error('❌ Error verifying assignment:', e);
@@ -2485,20 +2409,7 @@ async function submitAssignment() {
         
         submitBtn.innerHTML = `<i class="fas fa-spinner fa-spin"></i> Uploading ${i + 1}/${filesInput.files.length}...`;
         
-        const formData = new FormData();
-        formData.append('file', file);
-        
-        const response = await fetch('/api/upload_file', {
-          method: 'POST',
-          body: formData
-        });
-        
-        if (!response.ok) {
-          const errorData = await response.json();
-          throw new Error(errorData.error || `Failed to upload ${file.name}`);
-        }
-        
-        const result = await response.json();
+        const result = await uploadFileInChunks(file);
         submissionData.files.push({
           name: file.name,
           type: file.type,
@@ -2656,13 +2567,86 @@ async function refreshAfterUnsubmit() {
 // Auto-refresh data every 30 seconds
 let refreshInterval = null;
 
+// ✅ Delta sync: each poll asks /refresh-data?since=<cursor> what changed and
+// only runs the full reload when the server reports something new
+let syncCursor = document.querySelector('meta[name="sync-cursor"]')?.content || null;
+// The server repeats a short window behind the cursor; remember what the last
+// poll reported so those repeats don't trigger another reload
+let seenChanges = new Set();
+
+async function hasRemoteChanges() {
+    const role = document.body.classList.contains('professor-dashboard') ? 'professor' : 'student';
+    
+    if (!syncCursor) return true;
+    
+    try {
+        const response = await fetch(`/api/${role}/refresh-data?since=${encodeURIComponent(syncCursor)}`);
+        if (!response.ok) return true;
+        
+        const delta = await response.json();
+        syncCursor = delta.cursor;
+        const changes = delta.changes || [];
+        const hasNew = changes.some(key => !seenChanges.has(key));
+        seenChanges = new Set(changes);
+        return hasNew;
+    } catch (error) {
+        console.error('Delta sync error:', error);
+        return true;
+    }
+}
+
+// ✅ Server-sent events: refresh as soon as the server reports a change and
+// skip the 30-second poll while the stream is connected
+let changeEvents = null;
+let changeEventsConnected = false;
+let changeRefreshTimer = null;
+
+function connectChangeEvents() {
+    if (!window.EventSource || changeEvents) return;
+    
+    changeEvents = new EventSource('/api/events');
+    changeEvents.onopen = () => { changeEventsConnected = true; };
+    changeEvents.onerror = () => {
+        changeEventsConnected = false;
+        // A refused stream (503 when the server is at its stream limit) is not retried by
+        // the browser; keep polling and try again later
+        if (changeEvents.readyState === EventSource.CLOSED) {
+            changeEvents = null;
+            setTimeout(connectChangeEvents, 60000 + Math.random() * 30000);
+        }
+    };
+    
+    ['assignment', 'material', 'deadline', 'grade', 'submission'].forEach(type => {
+        changeEvents.addEventListener(type, () => {
+            if (type !== 'submission' && !document.body.classList.contains('professor-dashboard')) {
+                pollNotifications();
+            }
+            if (document.hidden) return; // visibilitychange refreshes when the tab comes back
+            
+            // Coalesce bursts (e.g. a batch of grades) into one refresh
+            clearTimeout(changeRefreshTimer);
+            changeRefreshTimer = setTimeout(() => {
+                if (document.body.classList.contains('professor-dashboard')) {
+                    refreshProfessorData();
+                } else {
+                    refreshStudentData();
+                }
+            }, 500);
+        });
+    });
+}
+
 function startAutoRefresh() {
+    connectChangeEvents();
+    
     if (refreshInterval) {
         clearInterval(refreshInterval);
     }
     
     refreshInterval = setInterval(async () => {
         if (document.hidden) return; // Don't refresh when tab is hidden
+        if (changeEventsConnected) return; // Server pushes changes while the stream is open
+        if (!(await hasRemoteChanges())) return; // Nothing changed since the last poll
         
         console.log('🔄 Auto-refreshing data...');
         
@@ -3207,11 +3191,8 @@ async function loadClassGrades() {
   
   try {
     // ✅ FIX: Always fetch fresh assignments from database
-    const response = await fetch(`/api/professor/classes/${currentClassId}/assignments`);
-    if (response.ok) {
-      classItem.assignments = await response.json();
-      console.log('✅ Loaded fresh assignments for grades:', classItem.assignments.length);
-    }
+    classItem.assignments = await fetchAllPages(`/api/professor/classes/${currentClassId}/assignments`);
+    console.log('✅ Loaded fresh assignments for grades:', classItem.assignments.length);
   } catch (e) {
     console.error('Error loading assignments:', e);
   }
@@ -4168,53 +4149,10 @@ function showMessage(message, type) {
   }, 5000);
 }
 
-// ✅ FIX #2: Monitor for new grades and send notifications
-function checkForNewGrades() {
-  const lastCheck = localStorage.getItem('student_last_grade_check');
-  const lastCheckTime = lastCheck ? new Date(lastCheck) : new Date(0);
-  
-  enrolledClasses.forEach(classItem => {
-    if (classItem.assignments) {
-      classItem.assignments.forEach(assignment => {
-        const submission = assignment.submissions ? 
-          assignment.submissions.find(s => String(s.studentId) === String(studentData.id)) : null;
-        
-        if (submission && submission.grade !== undefined) {
-          const submissionDate = new Date(submission.date);
-          
-          if (submissionDate > lastCheckTime) {
-            const percentage = ((submission.grade / assignment.points) * 100).toFixed(1);
-            
-            addNotification(
-              'grade',
-              'Grade Released',
-              `"${assignment.title}" - ${submission.grade}/${assignment.points} (${percentage}%)`,
-              `class:${classItem.id}`
-            );
-            
-            if (submission.feedback) {
-              addNotification(
-                'feedback',
-                'Feedback Received',
-                `Your professor left feedback on "${assignment.title}"`,
-                `class:${classItem.id}`
-              );
-            }
-          }
-        }
-      });
-    }
-  });
-  
-  localStorage.setItem('student_last_grade_check', new Date().toISOString());
-}
-
 // ✅ FIX #2: Call check functions periodically
 setInterval(() => {
   if (studentData && studentData.id) {
-    checkForNewAssignments();
-    checkUpcomingDeadlines();
-    checkForNewGrades();
+    pollNotifications();
   }
 }, 60000);
 
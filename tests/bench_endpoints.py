@@ -0,0 +1,69 @@
+"""Latency benchmarks for the hot dashboard endpoints, on a small in-process campus.
+
+Run with ``pytest tests/bench_endpoints.py --benchmark-only`` (add
+``--benchmark-autosave`` / ``--benchmark-compare`` to track a baseline);
+``flask load-test --base-url`` covers a deployed server under concurrency.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as learnsync
+
+pytest.importorskip('pytest_benchmark')
+
+CLASSES = 10
+STUDENTS_PER_CLASS = 30
+
+
+@pytest.fixture
+def campus(app, factory):
+    professor_id = factory.professor()
+    student_ids = [factory.student() for _ in range(STUDENTS_PER_CLASS)]
+    class_ids = [factory.classroom(professor_id, student_ids, materials=5, assignments=10) for _ in range(CLASSES)]
+    with app.app_context():
+        assignments = learnsync.Assignment.query.filter(learnsync.Assignment.class_id == class_ids[0]).all()
+        learnsync.db.session.add_all(learnsync.Submission(
+            assignment_id=assignment.id, student_id=student_id, content='Answer',
+            date=datetime.utcnow(), grade=80
+        ) for assignment in assignments for student_id in student_ids)
+        learnsync.db.session.flush()
+        learnsync.refresh_gradebook_students(class_ids[0])
+        learnsync.refresh_gradebook_assignments(class_ids[0])
+        learnsync.db.session.commit()
+    return {'professor': professor_id, 'student': student_ids[0], 'classes': class_ids}
+
+
+def get_ok(client, url, **kwargs):
+    response = client.get(url, **kwargs)
+    assert response.status_code == 200
+    return response
+
+
+def test_professor_class_list(benchmark, login, campus):
+    client = login('professor', campus['professor'])
+    benchmark(get_ok, client, '/api/professor/classes')
+
+
+def test_student_class_list(benchmark, login, campus):
+    client = login('student', campus['student'])
+    benchmark(get_ok, client, '/api/student/classes')
+
+
+def test_idle_delta_poll(benchmark, monkeypatch, login, campus):
+    # The campus was just written, so without this the overlap window re-reads all of it
+    monkeypatch.setattr(learnsync, 'SYNC_CURSOR_OVERLAP', timedelta(0))
+    client = login('professor', campus['professor'])
+    cursor = get_ok(client, '/api/professor/refresh-data').headers['X-Sync-Cursor']
+    benchmark(get_ok, client, '/api/professor/refresh-data', query_string={'since': cursor})
+
+
+def test_idle_notification_poll(benchmark, login, campus):
+    client = login('student', campus['student'])
+    cursor = get_ok(client, '/api/notifications').get_json()['cursor']
+    benchmark(get_ok, client, '/api/notifications', query_string={'after': cursor})
+
+
+def test_gradebook(benchmark, login, campus):
+    client = login('professor', campus['professor'])
+    benchmark(get_ok, client, f"/api/professor/classes/{campus['classes'][0]}/gradebook")
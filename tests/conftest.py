@@ -0,0 +1,147 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import event
+from werkzeug.security import generate_password_hash
+
+# app.py reads its configuration at import time
+TEST_DIR = tempfile.mkdtemp(prefix='learnsync-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ['SECRET_KEY'] = 'test-secret'
+os.environ['MAIL_WORKER'] = 'external'
+os.environ['DEADLINE_WORKER'] = 'external'
+
+import app as learnsync  # noqa: E402
+
+# Keep uploaded test files out of the working tree
+learnsync.blob_store = learnsync.BlobStore(learnsync.FilesystemBlobBackend(os.path.join(TEST_DIR, 'blobs')))
+learnsync.PARTIAL_UPLOAD_FOLDER = os.path.join(TEST_DIR, 'partial')
+
+PASSWORD = 'Passw0rd!'
+PASSWORD_HASH = generate_password_hash(PASSWORD)
+
+
+@pytest.fixture(scope='session')
+def schema():
+    """Builds the schema through the migrations, so the raw-SQL search tables and triggers exist too"""
+    with learnsync.app.app_context():
+        upgrade(directory=os.path.join(os.path.dirname(learnsync.__file__), 'migrations'))
+
+
+@pytest.fixture
+def app(schema):
+    """Empty tables per test. No app context stays pushed, so each request gets its own ``g``"""
+    flask_app = learnsync.app
+    flask_app.config['TESTING'] = True
+    for cache in (learnsync.user_cache, learnsync.class_access_cache, learnsync.stats_cache):
+        cache.clear()
+    yield flask_app
+    with flask_app.app_context():
+        learnsync.db.session.remove()
+        # Row deletes go through the search triggers, so the search tables empty with them
+        for table in reversed(learnsync.db.metadata.sorted_tables):
+            learnsync.db.session.execute(table.delete())
+        learnsync.db.session.commit()
+
+
+class Factory:
+    """Creates rows in their own app context and returns plain ids"""
+
+    def __init__(self, app):
+        self.app = app
+        self.count = 0
+
+    def _add(self, record):
+        with self.app.app_context():
+            learnsync.db.session.add(record)
+            learnsync.db.session.commit()
+            return record.id
+
+    def professor(self):
+        self.count += 1
+        return self._add(learnsync.Professor(
+            username=f'prof{self.count}@school.edu', password=PASSWORD_HASH,
+            first_name='Prof', last_name=str(self.count), professor_id=f'P{self.count}', department='CE'
+        ))
+
+    def student(self):
+        self.count += 1
+        return self._add(learnsync.Student(
+            username=f'student{self.count}@school.edu', password=PASSWORD_HASH,
+            first_name='Student', last_name=str(self.count), student_id=f'S{self.count}',
+            course='BSCE', year_level='1'
+        ))
+
+    def classroom(self, professor_id, student_ids=(), materials=0, assignments=0):
+        self.count += 1
+        class_id = self._add(learnsync.Class(name=f'Class {self.count}', code=f'C{self.count:05d}',
+                                             professor_id=professor_id))
+        with self.app.app_context():
+            if student_ids:
+                learnsync.enroll_students(class_id, list(student_ids))
+            for index in range(materials):
+                learnsync.db.session.add(learnsync.Material(
+                    class_id=class_id, title=f'Material {index}', description='Notes', date=datetime.utcnow()
+                ))
+            for index in range(assignments):
+                learnsync.db.session.add(learnsync.Assignment(
+                    class_id=class_id, title=f'Assignment {index}', description='Work',
+                    due_date=datetime.utcnow() + timedelta(days=7)
+                ))
+            learnsync.db.session.commit()
+        return class_id
+
+    def assignment(self, class_id, due_date=None):
+        return self._add(learnsync.Assignment(
+            class_id=class_id, title='Assignment', description='Work',
+            due_date=due_date or datetime.utcnow() + timedelta(days=7)
+        ))
+
+    def material(self, class_id):
+        return self._add(learnsync.Material(class_id=class_id, title='Material', description='Notes',
+                                            date=datetime.utcnow()))
+
+    def submission(self, assignment_id, student_id, grade=None):
+        return self._add(learnsync.Submission(assignment_id=assignment_id, student_id=student_id,
+                                              content='Answer', date=datetime.utcnow(), grade=grade))
+
+
+@pytest.fixture
+def factory(app):
+    return Factory(app)
+
+
+@pytest.fixture
+def login(app):
+    """``login(user_type, user_id)`` returns a test client with that user's session"""
+    def client_for(user_type, user_id):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+            session['user_type'] = user_type
+        return client
+    return client_for
+
+
+@pytest.fixture
+def count_queries(app):
+    """``count_queries(fn)`` returns ``(fn(), statements)`` for every SQL statement ``fn`` ran"""
+    with app.app_context():
+        engine = learnsync.db.engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+
+    def run(fn):
+        del statements[:]
+        result = fn()
+        return result, list(statements)
+
+    yield run
+    event.remove(engine, 'before_cursor_execute', record)
@@ -0,0 +1,31 @@
+import app as learnsync
+
+DIGEST = 'a' * 64
+
+
+def test_blob_attachments_take_size_and_type_from_the_blob(app, login, factory):
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id)
+    with app.app_context():
+        learnsync.db.session.add(learnsync.Blob(sha256=DIGEST, size=2048, content_type='application/pdf'))
+        learnsync.db.session.commit()
+    client = login('professor', professor_id)
+
+    response = client.post('/api/professor/materials', json={'class_id': class_id, 'material': {
+        'title': 'Notes', 'description': '', 'date': '2026-10-17T00:00:00Z',
+        'files': [
+            {'name': 'notes.pdf', 'type': 'text/html', 'size': 10 ** 12, 'url': f'{learnsync.BLOB_URL_PREFIX}{DIGEST}'},
+            {'name': 'missing.pdf', 'type': 'text/html', 'size': 10 ** 12, 'url': f"{learnsync.BLOB_URL_PREFIX}{'b' * 64}"},
+            {'name': 'Syllabus', 'type': 'text/html', 'size': 300, 'url': 'https://example.edu/syllabus'},
+        ]
+    }})
+    assert response.status_code == 201
+
+    with app.app_context():
+        attachments = learnsync.Attachment.query.order_by(learnsync.Attachment.position).all()
+        assert [(a.name, a.size, a.mime_type) for a in attachments] == [
+            ('notes.pdf', 2048, 'application/pdf'),
+            ('missing.pdf', None, None),
+            ('Syllabus', 300, 'text/html'),
+        ]
+    assert client.get('/api/professor/storage').get_json()['totalBytes'] == 2048
@@ -0,0 +1,98 @@
+import pytest
+
+import app as learnsync
+
+
+@pytest.fixture
+def course(app, factory):
+    professor_id = factory.professor()
+    student_id = factory.student()
+    class_id = factory.classroom(professor_id, [student_id], materials=1)
+    with app.app_context():
+        code = learnsync.db.session.get(learnsync.Class, class_id).code
+    return {
+        'professor': professor_id,
+        'other_professor': factory.professor(),
+        'student': student_id,
+        'outsider': factory.student(),
+        'class': class_id,
+        'code': code,
+    }
+
+
+def member_url(course):
+    return f"/api/student/classes/{course['class']}/materials"
+
+
+def owner_url(course):
+    return f"/api/professor/classes/{course['class']}/gradebook"
+
+
+def test_anonymous_requests_are_unauthorized(app, course):
+    client = app.test_client()
+    assert client.get(member_url(course)).status_code == 401
+    assert client.get(owner_url(course)).status_code == 401
+
+
+def test_owner_routes_are_for_the_owning_professor_only(login, course):
+    assert login('professor', course['professor']).get(owner_url(course)).status_code == 200
+    assert login('professor', course['other_professor']).get(owner_url(course)).status_code == 404
+    assert login('student', course['student']).get(owner_url(course)).status_code == 401
+
+
+def test_member_routes_admit_the_professor_and_enrolled_students(login, course):
+    assert login('professor', course['professor']).get(member_url(course)).status_code == 200
+    assert login('student', course['student']).get(member_url(course)).status_code == 200
+    assert login('student', course['outsider']).get(member_url(course)).status_code == 404
+    assert login('professor', course['other_professor']).get(member_url(course)).status_code == 404
+
+
+def test_joining_grants_access_despite_a_cached_refusal(login, course):
+    client = login('student', course['outsider'])
+    assert client.get(member_url(course)).status_code == 404
+
+    assert client.post('/api/student/join_class', json={'code': course['code']}).status_code == 200
+    assert client.get(member_url(course)).status_code == 200
+
+
+def test_leaving_revokes_a_cached_grant(login, course):
+    client = login('student', course['student'])
+    assert client.get(member_url(course)).status_code == 200
+
+    assert client.post('/api/student/unenroll_class', json={'class_id': course['class']}).status_code == 200
+    assert client.get(member_url(course)).status_code == 404
+
+
+def test_removed_students_lose_access(login, course):
+    client = login('student', course['student'])
+    assert client.get(member_url(course)).status_code == 200
+
+    response = login('professor', course['professor']).post(
+        '/api/professor/remove_student', json={'class_id': course['class'], 'student_id': course['student']}
+    )
+    assert response.status_code == 200
+    assert client.get(member_url(course)).status_code == 404
+
+
+def test_another_professor_cannot_remove_students(login, course):
+    response = login('professor', course['other_professor']).post(
+        '/api/professor/remove_student', json={'class_id': course['class'], 'student_id': course['student']}
+    )
+    assert response.status_code == 404
+    assert login('student', course['student']).get(member_url(course)).status_code == 200
+
+
+def test_removal_by_another_worker_revokes_a_cached_grant(app, login, course):
+    """Another worker only shares the database with this one; its removal must still end access here"""
+    client = login('student', course['student'])
+    assert client.get(member_url(course)).status_code == 200
+
+    with app.app_context():
+        learnsync.unenroll_student(course['student'], course['class'])
+        learnsync.db.session.execute(learnsync.db.text(
+            'INSERT INTO class_access_version (user_type, user_id, version) VALUES (:type, :id, 1) '
+            'ON CONFLICT (user_type, user_id) DO UPDATE SET version = class_access_version.version + 1'
+        ), {'type': 'student', 'id': course['student']})
+        learnsync.db.session.commit()
+
+    assert client.get(member_url(course)).status_code == 404
@@ -0,0 +1,125 @@
+from io import BytesIO
+
+import pytest
+
+import app as learnsync
+
+
+@pytest.fixture
+def graded_class(app, factory):
+    """A class with three students who submitted, one who did not, and a stranger"""
+    professor_id = factory.professor()
+    submitted = [factory.student() for _ in range(3)]
+    missing, stranger = factory.student(), factory.student()
+    class_id = factory.classroom(professor_id, submitted + [missing])
+    assignment_id = factory.assignment(class_id)
+    for student_id in submitted:
+        factory.submission(assignment_id, student_id)
+    return {'professor_id': professor_id, 'class_id': class_id, 'assignment_id': assignment_id,
+            'submitted': submitted, 'missing': missing, 'stranger': stranger}
+
+
+def post_grades(login, graded_class, **kwargs):
+    client = login('professor', graded_class['professor_id'])
+    return client.post(f"/api/professor/assignments/{graded_class['assignment_id']}/grades", **kwargs)
+
+
+def grades(app, assignment_id):
+    with app.app_context():
+        return {row.student_id: (row.grade, row.feedback)
+                for row in learnsync.Submission.query.filter_by(assignment_id=assignment_id)}
+
+
+def notifications(app):
+    with app.app_context():
+        return sorted((row.recipient_id, row.type) for row in learnsync.Notification.query.all())
+
+
+def test_valid_rows_are_saved_and_bad_rows_reported_by_number(app, login, graded_class):
+    first, second, third = graded_class['submitted']
+    response = post_grades(login, graded_class, json={'grades': [
+        {'student_id': first, 'grade': 90, 'feedback': 'Well done'},
+        {'student_id': graded_class['missing'], 'grade': 80},
+        {'student_id': graded_class['stranger'], 'grade': 80},
+        {'student_id': second, 'grade': 101},
+        {'student_id': third, 'grade': 'abc'},
+        {'grade': 50},
+        {'student_id': first, 'grade': 70},
+        {'student_id': second, 'grade': 75},
+    ]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['updated'] == 2
+    assert [(error['row'], error['error']) for error in body['errors']] == [
+        (2, 'Student has not submitted yet'),
+        (3, 'Student not enrolled in this class'),
+        (4, 'Grade must be between 0 and 100'),
+        (5, 'Grade must be a number'),
+        (6, 'Student is required'),
+        (7, 'Student appears more than once'),
+    ]
+    assert grades(app, graded_class['assignment_id']) == {
+        first: (90, 'Well done'), second: (75, None), third: (None, None)
+    }
+
+
+def test_atomic_mode_writes_nothing_when_any_row_fails(app, login, graded_class):
+    first, second, _ = graded_class['submitted']
+    response = post_grades(login, graded_class, json={'atomic': True, 'grades': [
+        {'student_id': first, 'grade': 90},
+        {'student_id': second, 'grade': -1},
+    ]})
+
+    assert response.status_code == 400
+    assert response.get_json()['updated'] == 0
+    assert [error['row'] for error in response.get_json()['errors']] == [2]
+    assert all(grade is None for grade, _ in grades(app, graded_class['assignment_id']).values())
+    assert notifications(app) == []
+
+
+def test_bulk_grades_refresh_the_gradebook_and_notify_students(app, login, graded_class):
+    first, second, _ = graded_class['submitted']
+    response = post_grades(login, graded_class, json=[
+        {'student_id': first, 'grade': 90, 'feedback': 'Well done'},
+        {'student_id': second, 'grade': 60},
+    ])
+    assert response.status_code == 200
+
+    with app.app_context():
+        students = {row.student_id: (row.graded_count, row.points_earned)
+                    for row in learnsync.GradebookStudent.query.filter_by(class_id=graded_class['class_id'])}
+        assignment = learnsync.db.session.get(learnsync.GradebookAssignment, graded_class['assignment_id'])
+        assert (assignment.submitted_count, assignment.graded_count, assignment.grade_sum) == (3, 2, 150)
+    assert students == {first: (1, 90), second: (1, 60)}
+    assert notifications(app) == sorted([(first, 'grade'), (first, 'feedback'), (second, 'grade')])
+
+
+def test_csv_rows_match_by_email_or_school_id(app, login, graded_class):
+    first, second, _ = graded_class['submitted']
+    with app.app_context():
+        first_email = learnsync.db.session.get(learnsync.Student, first).username
+        second_number = learnsync.db.session.get(learnsync.Student, second).student_id
+    upload = (f'Email,Student ID,Grade,Feedback\n'
+              f'{first_email.upper()},,88,Good\n'
+              f',{second_number},77,\n'
+              f',S-unknown,50,\n'
+              f',,,\n').encode()
+
+    response = post_grades(login, graded_class, data={'file': (BytesIO(upload), 'grades.csv')},
+                           content_type='multipart/form-data')
+
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['updated'], body['skipped']) == (2, 1)
+    assert [(error['row'], error['student']) for error in body['errors']] == [(3, 'S-unknown')]
+    assert grades(app, graded_class['assignment_id'])[first] == (88, 'Good')
+    assert grades(app, graded_class['assignment_id'])[second] == (77, None)
+
+
+def test_other_professors_cannot_grade(login, factory, graded_class):
+    client = login('professor', factory.professor())
+    response = client.post(f"/api/professor/assignments/{graded_class['assignment_id']}/grades",
+                           json=[{'student_id': graded_class['submitted'][0], 'grade': 90}])
+
+    assert response.status_code == 404
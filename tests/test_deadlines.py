@@ -0,0 +1,114 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as learnsync
+
+
+@pytest.fixture(autouse=True)
+def reminders(monkeypatch):
+    monkeypatch.setattr(learnsync, 'DEADLINE_REMINDERS', learnsync.parse_reminder_offsets('3d,1d,1h'))
+
+
+@pytest.fixture
+def course(factory):
+    professor_id = factory.professor()
+    submitted, missed = factory.student(), factory.student()
+    class_id = factory.classroom(professor_id, [submitted, missed])
+    return {'professor': professor_id, 'submitted': submitted, 'missed': missed, 'class': class_id}
+
+
+def notifications(app, **filters):
+    with app.app_context():
+        return learnsync.Notification.query.filter_by(**filters).all()
+
+
+def test_missed_reminder_stages_collapse_into_one():
+    now = datetime(2026, 1, 10, 12)
+    deadline = now + timedelta(hours=2)  # The 3d and 1d stages are past, 1h is still ahead
+
+    events = learnsync.reminder_events('assignment', 7, deadline, 0, now, now + timedelta(hours=4))
+
+    assert events == [
+        (now, 'assignment', 7, 1, deadline),
+        (deadline - timedelta(hours=1), 'assignment', 7, 2, deadline),
+    ]
+
+
+def test_reminder_events_skip_sent_stages_and_stop_at_the_horizon():
+    now = datetime(2026, 1, 10, 12)
+    deadline = now + timedelta(hours=2)
+
+    assert learnsync.reminder_events('material', 7, deadline, 2, now, now + timedelta(minutes=30)) == []
+    assert learnsync.reminder_events('material', 7, deadline, 2, now, now + timedelta(hours=1)) == [
+        (deadline - timedelta(hours=1), 'material', 7, 2, deadline)
+    ]
+    assert learnsync.reminder_events('material', 7, deadline, 3, now, now + timedelta(hours=4)) == []
+    assert learnsync.reminder_events('material', 7, now, 0, now, now + timedelta(hours=4)) == []
+
+
+def test_a_collapsed_reminder_is_sent_once_and_claims_the_skipped_stages(app, factory, course):
+    now = datetime.utcnow()
+    assignment_id = factory.assignment(course['class'], due_date=now + timedelta(hours=2))
+    with app.app_context():
+        deadline = learnsync.db.session.get(learnsync.Assignment, assignment_id).due_date
+        (event, _) = learnsync.reminder_events('assignment', assignment_id, deadline, 0, now, now + timedelta(hours=4))
+
+        assert learnsync.fire_deadline_event(event, now)
+        # A stale event for a stage the collapsed one covered is refused
+        assert not learnsync.fire_deadline_event((now, 'assignment', assignment_id, 0, deadline), now)
+        assert learnsync.db.session.get(learnsync.Assignment, assignment_id).reminders_sent == 2
+
+    assert len(notifications(app, type='deadline', recipient_type='student')) == 2  # Once per enrolled student
+
+
+def test_racing_workers_close_an_assignment_once(app, factory, course):
+    due_date = datetime.utcnow() - timedelta(minutes=1)
+    assignment_id = factory.assignment(course['class'], due_date=due_date)
+    factory.submission(assignment_id, course['submitted'])
+    now = datetime.utcnow()
+    with app.app_context():
+        events = [event for event in learnsync.load_deadline_events(now, now + timedelta(minutes=5))
+                  if event[1] == 'close']
+    assert len(events) == 1
+
+    start = threading.Barrier(2)
+    fired = []
+
+    def worker():
+        with app.app_context():
+            start.wait()
+            fired.append(learnsync.fire_deadline_event(events[0], now))
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(fired) == [False, True]
+    missed = notifications(app, recipient_type='professor', recipient_id=course['professor'])
+    assert [notification.message.split(' missed')[0] for notification in missed] == ['1 student']
+    with app.app_context():
+        assert learnsync.db.session.get(learnsync.Assignment, assignment_id).closed_at == now
+
+
+def test_submits_are_refused_once_closed_until_the_deadline_moves(app, login, factory, course):
+    # Another worker's clock ran ahead and closed the assignment a moment early
+    due_date = datetime.utcnow() + timedelta(seconds=30)
+    assignment_id = factory.assignment(course['class'], due_date=due_date)
+    with app.app_context():
+        assert learnsync.close_assignment(assignment_id, due_date, due_date) is not None
+        learnsync.db.session.commit()
+
+    client = login('student', course['missed'])
+    submit = {'assignment_id': assignment_id, 'content': 'late'}
+    assert client.post('/api/student/submit_assignment', json=submit).status_code == 400
+
+    extended = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    response = login('professor', course['professor']).post(
+        f'/api/professor/assignments/{assignment_id}/update-deadline', json={'due_date': extended})
+    assert response.status_code == 200
+
+    assert client.post('/api/student/submit_assignment', json=submit).status_code == 200
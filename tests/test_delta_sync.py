@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import app as learnsync
+
+
+def cursor_before(seconds=0):
+    return (datetime.utcnow() - timedelta(seconds=seconds)).isoformat()
+
+
+def delta(client, role, since):
+    response = client.get(f'/api/{role}/refresh-data', query_string={'since': since})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_class_delete_reaches_only_its_professor_and_students(login, factory):
+    professor_id, other_professor_id = factory.professor(), factory.professor()
+    student_id, outsider_id = factory.student(), factory.student()
+    class_id = factory.classroom(professor_id, [student_id])
+    factory.classroom(other_professor_id, [outsider_id])
+    since = cursor_before(1)
+
+    response = login('professor', professor_id).delete('/api/professor/classes', json={'class_id': class_id})
+    assert response.status_code == 200
+
+    deleted_class = {'type': 'class', 'id': str(class_id), 'classId': str(class_id)}
+    assert delta(login('professor', professor_id), 'professor', since)['deleted'] == [deleted_class]
+    assert deleted_class in delta(login('student', student_id), 'student', since)['deleted']
+    assert delta(login('professor', other_professor_id), 'professor', since)['deleted'] == []
+    assert delta(login('student', outsider_id), 'student', since)['deleted'] == []
+
+
+def test_rows_stamped_just_behind_the_cursor_are_repeated(app, login, factory):
+    """A write that commits after the cursor was handed out but was stamped before it still shows up"""
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id)
+    since = datetime.utcnow()
+    material_id = factory.material(class_id)
+    with app.app_context():
+        learnsync.db.session.get(learnsync.Material, material_id).updated_at = since - timedelta(seconds=5)
+        learnsync.db.session.commit()
+
+    client = login('professor', professor_id)
+    first = delta(client, 'professor', since.isoformat())
+    second = delta(client, 'professor', first['cursor'])
+
+    assert [m['id'] for cls in first['classes'] for m in cls['materials']] == [str(material_id)]
+    # The repeat carries the same change keys, which is what clients de-dupe on
+    assert set(first['changes']) >= set(second['changes'])
+    assert any(key.startswith(f'material:{material_id}:') for key in first['changes'])
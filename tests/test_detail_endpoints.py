@@ -0,0 +1,60 @@
+import pytest
+
+
+@pytest.fixture
+def course(factory):
+    professor_id = factory.professor()
+    student_id, classmate_id, outsider_id = factory.student(), factory.student(), factory.student()
+    class_id = factory.classroom(professor_id, [student_id, classmate_id])
+    assignment_id = factory.assignment(class_id)
+    return {
+        'professor': professor_id,
+        'student': student_id,
+        'classmate': classmate_id,
+        'outsider': outsider_id,
+        'class': class_id,
+        'assignment': assignment_id,
+        'material': factory.material(class_id),
+        'submission': factory.submission(assignment_id, student_id, grade=90),
+        'classmate_submission': factory.submission(assignment_id, classmate_id, grade=55),
+    }
+
+
+def test_student_sees_only_their_own_submission(login, course):
+    client = login('student', course['student'])
+
+    detail = client.get(f"/api/professor/assignments/{course['assignment']}")
+    assert detail.status_code == 200
+    assert [s['studentId'] for s in detail.get_json()['submissions']] == [str(course['student'])]
+
+    for view in ('', '?view=summary'):
+        listing = client.get(f"/api/professor/classes/{course['class']}/assignments{view}")
+        assert listing.status_code == 200
+        (assignment,) = listing.get_json()
+        assert [s['studentId'] for s in assignment['submissions']] == [str(course['student'])]
+
+
+def test_professor_sees_every_submission(login, course):
+    detail = login('professor', course['professor']).get(f"/api/professor/assignments/{course['assignment']}")
+    assert detail.status_code == 200
+    assert len(detail.get_json()['submissions']) == 2
+
+
+@pytest.mark.parametrize('path', [
+    '/api/professor/assignments/{assignment}',
+    '/api/professor/materials/{material}',
+    '/api/professor/classes/{class}/assignments',
+    '/api/professor/classes/{class}/materials',
+])
+def test_detail_and_listing_refuse_users_outside_the_class(factory, login, course, path):
+    url = path.format(**course)
+    assert login('student', course['outsider']).get(url).status_code == 404
+    assert login('professor', factory.professor()).get(url).status_code == 404
+    assert login('student', course['student']).get(url).status_code == 200
+
+
+def test_submission_detail_is_for_the_owning_professor(factory, login, course):
+    url = f"/api/professor/submissions/{course['classmate_submission']}"
+    assert login('professor', course['professor']).get(url).status_code == 200
+    assert login('professor', factory.professor()).get(url).status_code == 403
+    assert login('student', course['student']).get(url).status_code == 401
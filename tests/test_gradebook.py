@@ -0,0 +1,56 @@
+import app as learnsync
+
+
+def gradebook_rows(app, class_id):
+    with app.app_context():
+        students = {row.student_id: (row.submitted_count, row.graded_count, row.points_earned)
+                    for row in learnsync.GradebookStudent.query.filter_by(class_id=class_id)}
+        assignments = {row.assignment_id: (row.submitted_count, row.graded_count, row.grade_sum)
+                       for row in learnsync.GradebookAssignment.query.filter_by(class_id=class_id)}
+    return students, assignments
+
+
+def refresh(app, class_id, student_ids=None, assignment_ids=None):
+    with app.app_context():
+        learnsync.refresh_gradebook_students(class_id, student_ids)
+        learnsync.refresh_gradebook_assignments(class_id, assignment_ids)
+        learnsync.db.session.commit()
+
+
+def test_refresh_overwrites_rows_another_writer_already_stored(app, factory):
+    """Concurrent refreshes upsert instead of DELETE + INSERT, so an existing key is updated, not a conflict"""
+    student_id = factory.student()
+    class_id = factory.classroom(factory.professor(), [student_id])
+    assignment_id = factory.assignment(class_id)
+    factory.submission(assignment_id, student_id, grade=80)
+    with app.app_context():
+        learnsync.db.session.add(learnsync.GradebookStudent(class_id=class_id, student_id=student_id,
+                                                            submitted_count=9, graded_count=9))
+        learnsync.db.session.add(learnsync.GradebookAssignment(assignment_id=assignment_id, class_id=class_id,
+                                                               submitted_count=9, graded_count=9))
+        learnsync.db.session.commit()
+
+    refresh(app, class_id, [student_id], [assignment_id])
+    refresh(app, class_id, [student_id], [assignment_id])
+
+    students, assignments = gradebook_rows(app, class_id)
+    assert students == {student_id: (1, 1, 80)}
+    assert assignments == {assignment_id: (1, 1, 80)}
+
+
+def test_refresh_deletes_only_keys_that_disappeared(app, factory):
+    kept, leaving = factory.student(), factory.student()
+    class_id = factory.classroom(factory.professor(), [kept, leaving])
+    assignment_id = factory.assignment(class_id)
+    factory.submission(assignment_id, kept, grade=70)
+    factory.submission(assignment_id, leaving, grade=90)
+    refresh(app, class_id)
+
+    with app.app_context():
+        learnsync.unenroll_student(leaving, class_id)
+        learnsync.db.session.commit()
+    refresh(app, class_id)
+
+    students, assignments = gradebook_rows(app, class_id)
+    assert students == {kept: (1, 1, 70)}
+    assert assignments == {assignment_id: (1, 1, 70)}
@@ -0,0 +1,116 @@
+import pytest
+
+import app as learnsync
+from conftest import PASSWORD
+
+WINDOW = learnsync.LOGIN_WINDOW_SECONDS
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fresh in-memory throttle on a clock the test moves; starts a third of the way into a window"""
+    clock = Clock(1000 * WINDOW + WINDOW / 3)
+    monkeypatch.setattr(learnsync, 'throttle_backend', learnsync.MemoryThrottleBackend())
+    monkeypatch.setattr(learnsync.time, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def email(app, factory):
+    professor_id = factory.professor()
+    with app.app_context():
+        return learnsync.db.session.get(learnsync.Professor, professor_id).username
+
+
+def attempt(app, email, password):
+    """True when the login went through"""
+    response = app.test_client().post('/login', data={'email': email, 'password': password,
+                                                      'userType': 'professor'})
+    return response.location.endswith('/dashboard')
+
+
+@pytest.mark.parametrize('state, limit', [
+    ((1000, 5, 0), 5),    # Over on this window alone: wait for it to end
+    ((1000, 8, 0), 5),    # Far over: the next window must also decay part of it
+    ((1000, 2, 6), 5),    # Only the previous window keeps us over
+    ((1000, 0, 9), 5),
+    ((1000, 50, 40), 50),
+])
+def test_retry_after_is_when_the_estimate_drops_under_the_limit(state, limit):
+    now = 1000 * WINDOW + WINDOW / 3
+    assert learnsync.throttle_estimate(state, WINDOW, now) >= limit
+
+    retry_after = learnsync.throttle_retry_after(state, limit, WINDOW, now)
+    later = now + retry_after + 1
+    index = int(later // WINDOW)
+    rolled = learnsync.roll_window(state, index)
+
+    assert retry_after > 0
+    assert learnsync.throttle_estimate(state, WINDOW, now + retry_after - 1) >= limit
+    assert learnsync.throttle_estimate(rolled, WINDOW, later) < limit
+
+
+def test_previous_window_decays_linearly():
+    state = (1000, 1, 4)
+    start = 1000 * WINDOW
+
+    assert learnsync.throttle_estimate(state, WINDOW, start) == 5
+    assert learnsync.throttle_estimate(state, WINDOW, start + WINDOW / 2) == 3
+    assert learnsync.throttle_estimate(state, WINDOW, start + WINDOW) == 1
+
+
+def test_failed_logins_lock_the_account(app, clock, email):
+    for _ in range(learnsync.MAX_LOGIN_ATTEMPTS):
+        assert not attempt(app, email, 'wrong')
+
+    assert not attempt(app, email, PASSWORD)
+    with app.test_request_context():
+        allowed, message = learnsync.check_login_attempts(email)
+    # The failures all landed in this window, so it must end first
+    assert not allowed
+    assert message == 'Account locked. Try again in 10 minutes.'
+
+
+def test_lockout_lifts_once_the_sliding_window_moves_on(app, clock, email):
+    for _ in range(learnsync.MAX_LOGIN_ATTEMPTS):
+        attempt(app, email, 'wrong')
+
+    clock.now = 1001 * WINDOW - 1
+    assert not attempt(app, email, PASSWORD)
+
+    # Past the window edge the old failures start to decay, but still weigh
+    # almost fully: one more failure locks the account again
+    clock.now = 1001 * WINDOW + 1
+    assert not attempt(app, email, 'wrong')
+    assert not attempt(app, email, PASSWORD)
+
+    # Two windows on, nothing is left of them
+    clock.now = 1003 * WINDOW
+    for _ in range(learnsync.MAX_LOGIN_ATTEMPTS - 1):
+        attempt(app, email, 'wrong')
+    assert attempt(app, email, PASSWORD)
+
+
+def test_a_success_clears_the_failures(app, clock, email):
+    for _ in range(learnsync.MAX_LOGIN_ATTEMPTS - 1):
+        attempt(app, email, 'wrong')
+    assert attempt(app, email, PASSWORD)
+
+    for _ in range(learnsync.MAX_LOGIN_ATTEMPTS - 1):
+        attempt(app, email, 'wrong')
+    assert attempt(app, email, PASSWORD)
+
+
+def test_unknown_emails_count_against_the_client_ip(app, clock, email):
+    for index in range(learnsync.MAX_LOGIN_ATTEMPTS_PER_IP):
+        assert not attempt(app, f'nobody{index}@school.edu', 'guess')
+
+    assert not attempt(app, email, PASSWORD)
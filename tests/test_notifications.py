@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import app as learnsync
+
+
+def add_notifications(app, student_id, count, created_at=None):
+    with app.app_context():
+        learnsync.db.session.add_all(learnsync.Notification(
+            recipient_type='student', recipient_id=student_id, type='material',
+            title=f'Notice {index}', message='', created_at=created_at or datetime.utcnow()
+        ) for index in range(count))
+        learnsync.db.session.commit()
+
+
+def test_feed_pages_oldest_first_without_skipping(app, login, factory):
+    student_id = factory.student()
+    add_notifications(app, student_id, 5)
+    client = login('student', student_id)
+
+    titles, cursor, has_more = [], 0, True
+    while has_more:
+        feed = client.get('/api/notifications', query_string={'after': cursor, 'limit': 2}).get_json()
+        titles += [item['title'] for item in feed['items']]
+        cursor, has_more = feed['cursor'], feed['hasMore']
+
+    assert titles == [f'Notice {index}' for index in range(5)]
+    idle = client.get('/api/notifications', query_string={'after': cursor, 'limit': 2}).get_json()
+    assert (idle['items'], idle['cursor'], idle['hasMore']) == ([], cursor, False)
+
+
+def test_cleanup_prunes_old_notifications(app, factory):
+    student_id = factory.student()
+    expired = datetime.utcnow() - timedelta(days=learnsync.NOTIFICATION_RETENTION_DAYS + 1)
+    add_notifications(app, student_id, 3, created_at=expired)
+    add_notifications(app, student_id, 2)
+
+    with app.app_context():
+        assert learnsync.run_cleanup()['notifications_deleted'] == 3
+        assert learnsync.Notification.query.count() == 2
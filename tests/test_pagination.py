@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import app as learnsync
+
+
+def read_all_pages(client, url, on_page=None):
+    ids, cursor = [], None
+    while True:
+        response = client.get(url, query_string={'limit': 2, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        ids += [str(item['id']) for item in response.get_json()]
+        if on_page:
+            on_page()
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return ids
+
+
+def test_resubmitting_while_paging_neither_skips_nor_repeats(app, login, factory):
+    professor_id = factory.professor()
+    student_ids = [factory.student() for _ in range(5)]
+    class_id = factory.classroom(professor_id, student_ids)
+    assignment_id = factory.assignment(class_id)
+    submission_ids = [factory.submission(assignment_id, student_id) for student_id in student_ids]
+
+    def resubmit_oldest():
+        with app.app_context():
+            learnsync.db.session.get(learnsync.Submission, submission_ids[0]).date = datetime.utcnow()
+            learnsync.db.session.commit()
+
+    client = login('professor', professor_id)
+    ids = read_all_pages(client, f'/api/professor/assignments/{assignment_id}/submissions', resubmit_oldest)
+
+    assert sorted(ids) == sorted(str(submission_id) for submission_id in submission_ids)
+
+
+def test_material_pages_cover_every_material(login, factory):
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id, materials=5)
+
+    ids = read_all_pages(login('professor', professor_id), f'/api/professor/classes/{class_id}/materials')
+
+    assert len(ids) == len(set(ids)) == 5
@@ -0,0 +1,39 @@
+def test_professor_classes_query_count_does_not_grow_with_classes(factory, login, count_queries):
+    """The class listing is batch-loaded: a professor with 10 classes costs what one with 2 does"""
+    counts = {}
+    for n_classes in (2, 10):
+        professor_id = factory.professor()
+        students = [factory.student() for _ in range(3)]
+        for _ in range(n_classes):
+            factory.classroom(professor_id, students, materials=2, assignments=2)
+
+        client = login('professor', professor_id)
+        client.get('/api/professor/classes')  # Warm the per-user caches
+
+        response, statements = count_queries(lambda: client.get('/api/professor/classes'))
+        assert response.status_code == 200
+        assert len(response.get_json()) == n_classes
+        assert all(len(cls['students']) == 3 for cls in response.get_json())
+        counts[n_classes] = len(statements)
+
+    assert counts[2] == counts[10]
+    # Session, classes, rosters, then materials and assignments with their attachments
+    assert counts[10] <= 7
+
+
+def test_student_classes_query_count_does_not_grow_with_classes(factory, login, count_queries):
+    counts = {}
+    for n_classes in (2, 10):
+        student_id = factory.student()
+        for _ in range(n_classes):
+            factory.classroom(factory.professor(), [student_id])
+
+        client = login('student', student_id)
+        client.get('/api/professor/classes')
+
+        response, statements = count_queries(lambda: client.get('/api/professor/classes'))
+        assert response.status_code == 200
+        assert len(response.get_json()) == n_classes
+        counts[n_classes] = len(statements)
+
+    assert counts[2] == counts[10]
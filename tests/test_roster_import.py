@@ -0,0 +1,101 @@
+from io import BytesIO
+
+import pytest
+
+import app as learnsync
+
+
+@pytest.fixture
+def roster(app, factory):
+    """A class with one enrolled student and two who are not, with their emails and school IDs"""
+    professor_id = factory.professor()
+    enrolled, joining, other = factory.student(), factory.student(), factory.student()
+    class_id = factory.classroom(professor_id, [enrolled])
+    with app.app_context():
+        students = {student_id: learnsync.db.session.get(learnsync.Student, student_id)
+                    for student_id in (enrolled, joining, other)}
+        keys = {student_id: (student.username, student.student_id) for student_id, student in students.items()}
+    return {'professor_id': professor_id, 'class_id': class_id,
+            'enrolled': enrolled, 'joining': joining, 'other': other, 'keys': keys}
+
+
+def import_roster(login, roster, **kwargs):
+    client = login('professor', roster['professor_id'])
+    return client.post(f"/api/professor/classes/{roster['class_id']}/roster", **kwargs)
+
+
+def can_see_class(login, student_id, class_id):
+    return login('student', student_id).get(f'/api/student/classes/{class_id}/materials').status_code == 200
+
+
+def test_every_row_gets_a_status(login, roster):
+    joining_email, _ = roster['keys'][roster['joining']]
+    enrolled_email, _ = roster['keys'][roster['enrolled']]
+    _, other_number = roster['keys'][roster['other']]
+
+    response = import_roster(login, roster, json={'students': [
+        joining_email.upper(),
+        enrolled_email,
+        {'student_id': other_number},
+        other_number,
+        'nobody@school.edu',
+        '   ',
+        {'name': 'No key'},
+        42,
+    ]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert [(row['row'], row['status']) for row in body['rows']] == [
+        (1, 'enrolled'), (2, 'already_enrolled'), (3, 'enrolled'), (4, 'duplicate'),
+        (5, 'not_found'), (6, 'invalid'), (7, 'invalid'), (8, 'invalid'),
+    ]
+    assert body['rows'][0]['studentId'] == str(roster['joining'])
+    assert body['summary'] == {'enrolled': 2, 'already_enrolled': 1, 'duplicate': 1, 'not_found': 1, 'invalid': 3}
+
+
+def test_imported_students_gain_access_at_once(login, roster):
+    # A denial cached before the import must not outlive it
+    assert not can_see_class(login, roster['joining'], roster['class_id'])
+
+    joining_email, _ = roster['keys'][roster['joining']]
+    assert import_roster(login, roster, json=[joining_email]).status_code == 200
+
+    assert can_see_class(login, roster['joining'], roster['class_id'])
+    assert can_see_class(login, roster['enrolled'], roster['class_id'])
+    assert not can_see_class(login, roster['other'], roster['class_id'])
+
+
+def test_csv_rows_match_by_email_or_school_id(login, roster):
+    joining_email, _ = roster['keys'][roster['joining']]
+    _, other_number = roster['keys'][roster['other']]
+    upload = f'Email,Student ID\n{joining_email},\n,{other_number}\n,\n'.encode()
+
+    response = import_roster(login, roster, data={'file': (BytesIO(upload), 'roster.csv')},
+                             content_type='multipart/form-data')
+
+    assert response.status_code == 200
+    assert [row['status'] for row in response.get_json()['rows']] == ['enrolled', 'enrolled', 'invalid']
+    assert can_see_class(login, roster['other'], roster['class_id'])
+
+
+def test_archived_classes_take_no_imports(app, login, roster):
+    with app.app_context():
+        learnsync.db.session.get(learnsync.Class, roster['class_id']).archived = True
+        learnsync.db.session.commit()
+
+    joining_email, _ = roster['keys'][roster['joining']]
+    response = import_roster(login, roster, json=[joining_email])
+
+    assert response.status_code == 400
+    assert not can_see_class(login, roster['joining'], roster['class_id'])
+
+
+def test_only_the_owner_can_import(login, factory, roster):
+    joining_email, _ = roster['keys'][roster['joining']]
+    client = login('professor', factory.professor())
+
+    response = client.post(f"/api/professor/classes/{roster['class_id']}/roster", json=[joining_email])
+
+    assert response.status_code == 404
+    assert not can_see_class(login, roster['joining'], roster['class_id'])
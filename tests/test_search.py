@@ -0,0 +1,147 @@
+from datetime import datetime
+
+import pytest
+
+import app as learnsync
+
+
+def add_material(app, class_id, title, description='Notes'):
+    with app.app_context():
+        material = learnsync.Material(class_id=class_id, title=title, description=description, date=datetime.utcnow())
+        learnsync.db.session.add(material)
+        learnsync.db.session.commit()
+        return material.id
+
+
+def add_submission(app, assignment_id, student_id, content):
+    with app.app_context():
+        submission = learnsync.Submission(assignment_id=assignment_id, student_id=student_id,
+                                          content=content, date=datetime.utcnow())
+        learnsync.db.session.add(submission)
+        learnsync.db.session.commit()
+        return submission.id
+
+
+def search(client, q, **params):
+    response = client.get('/api/search', query_string={'q': q, **params})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def hits(items):
+    return [(item['type'], item['id']) for item in items]
+
+
+def test_title_matches_rank_above_description_matches(app, login, factory):
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id)
+    in_description = add_material(app, class_id, 'Week one', 'Reading on thermodynamics')
+    in_title = add_material(app, class_id, 'Thermodynamics primer')
+    add_material(app, class_id, 'Statics')
+
+    items = search(login('professor', professor_id), 'thermodynamics')
+
+    assert hits(items) == [('material', str(in_title)), ('material', str(in_description))]
+    assert '<mark>' in items[1]['snippet']
+
+
+def test_last_term_matches_as_a_prefix(app, login, factory):
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id)
+    material_id = add_material(app, class_id, 'Fluid mechanics')
+
+    assert hits(search(login('professor', professor_id), 'fluid mech')) == [('material', str(material_id))]
+
+
+def test_results_stay_in_the_callers_classes(app, login, factory):
+    professor_id, other_professor_id = factory.professor(), factory.professor()
+    student_id, outsider_id = factory.student(), factory.student()
+    class_id = factory.classroom(professor_id, [student_id])
+    other_class_id = factory.classroom(other_professor_id, [outsider_id])
+    material_id = add_material(app, class_id, 'Circuits lab')
+    other_material_id = add_material(app, other_class_id, 'Circuits lecture')
+
+    assert hits(search(login('professor', professor_id), 'circuits')) == [('material', str(material_id))]
+    assert hits(search(login('student', student_id), 'circuits')) == [('material', str(material_id))]
+    assert hits(search(login('student', outsider_id), 'circuits')) == [('material', str(other_material_id))]
+    assert search(login('professor', professor_id), 'circuits', class_id=other_class_id) == []
+
+
+def test_students_find_only_their_own_submissions(app, login, factory):
+    professor_id = factory.professor()
+    student_id, classmate_id = factory.student(), factory.student()
+    class_id = factory.classroom(professor_id, [student_id, classmate_id])
+    assignment_id = factory.assignment(class_id)
+    own_id = add_submission(app, assignment_id, student_id, 'Kirchhoff laws applied')
+    classmate_submission_id = add_submission(app, assignment_id, classmate_id, 'Kirchhoff laws derived')
+
+    student_items = search(login('student', student_id), 'kirchhoff', type='submission')
+    professor_items = search(login('professor', professor_id), 'kirchhoff', type='submission')
+
+    assert hits(student_items) == [('submission', str(own_id))]
+    assert 'studentName' not in student_items[0]
+    assert sorted(hits(professor_items)) == sorted([('submission', str(own_id)),
+                                                    ('submission', str(classmate_submission_id))])
+    assert all(item['studentName'] for item in professor_items)
+
+
+def test_edits_and_deletes_reach_the_index(app, login, factory):
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id)
+    material_id = add_material(app, class_id, 'Beam deflection')
+    client = login('professor', professor_id)
+
+    with app.app_context():
+        learnsync.db.session.get(learnsync.Material, material_id).title = 'Column buckling'
+        learnsync.db.session.commit()
+    assert search(client, 'deflection') == []
+    assert hits(search(client, 'buckling')) == [('material', str(material_id))]
+
+    with app.app_context():
+        learnsync.db.session.delete(learnsync.db.session.get(learnsync.Material, material_id))
+        learnsync.db.session.commit()
+    assert search(client, 'buckling') == []
+
+
+@pytest.mark.parametrize('q', ['"', 'beam"', 'beam AND', 'AND', 'OR beam', 'NOT', '*', 'beam*', 'title:beam',
+                               '(beam', 'NEAR(beam load)', '^beam', '-beam'])
+def test_query_syntax_is_searched_as_text(app, login, factory, q):
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id)
+    add_material(app, class_id, 'Beam loads')
+
+    response = login('professor', professor_id).get('/api/search', query_string={'q': q})
+
+    assert response.status_code == 200
+    assert isinstance(response.get_json(), list)
+
+
+def test_operators_are_matched_as_words(app, login, factory):
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id)
+    material_id = add_material(app, class_id, 'Truss and beam')
+    add_material(app, class_id, 'Beam only')
+
+    assert hits(search(login('professor', professor_id), 'beam AND truss')) == [('material', str(material_id))]
+
+
+def test_pages_cover_every_hit_once(app, login, factory):
+    professor_id = factory.professor()
+    class_id = factory.classroom(professor_id)
+    material_ids = {str(add_material(app, class_id, f'Torsion {index}')) for index in range(5)}
+    client = login('professor', professor_id)
+
+    seen, cursor = [], None
+    while True:
+        response = client.get('/api/search', query_string={'q': 'torsion', 'limit': 2,
+                                                           **({'cursor': cursor} if cursor else {})})
+        seen += [item['id'] for item in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+
+    assert sorted(seen) == sorted(material_ids)
+
+
+def test_search_needs_a_session(app):
+    assert app.test_client().get('/api/search', query_string={'q': 'beam'}).status_code == 401
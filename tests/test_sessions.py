@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as learnsync
+from conftest import PASSWORD
+
+PROFILE_URL = '/api/professor/classes'
+
+
+@pytest.fixture
+def professor(app, factory):
+    professor_id = factory.professor()
+    with app.app_context():
+        return professor_id, learnsync.db.session.get(learnsync.Professor, professor_id).username
+
+
+def log_in(client, email):
+    response = client.post('/login', data={'email': email, 'password': PASSWORD, 'userType': 'professor'})
+    assert response.status_code == 302
+    return session_id(client)
+
+
+def session_id(client):
+    cookie = client.get_cookie(learnsync.app.config['SESSION_COOKIE_NAME'])
+    return cookie.value if cookie else None
+
+
+def stored_sessions(app):
+    with app.app_context():
+        return {row.id: row for row in learnsync.UserSession.query.all()}
+
+
+def test_cookie_holds_only_an_id_and_the_store_only_its_hash(app, professor):
+    client = app.test_client()
+    sid = log_in(client, professor[1])
+
+    assert learnsync.SESSION_ID_PATTERN.match(sid)
+    assert list(stored_sessions(app)) == [learnsync.session_key(sid)]
+    assert client.get(PROFILE_URL).status_code == 200
+
+
+def test_login_replaces_an_id_planted_before_it(app, professor):
+    client = app.test_client()
+    client.post('/login', data={'email': 'nobody@school.edu', 'password': 'x', 'userType': 'professor'})
+    planted = session_id(client)
+    assert planted  # the flash message needed a session
+
+    sid = log_in(client, professor[1])
+
+    assert sid != planted
+    assert learnsync.session_key(planted) not in stored_sessions(app)
+    attacker = app.test_client()
+    attacker.set_cookie(learnsync.app.config['SESSION_COOKIE_NAME'], planted)
+    assert attacker.get(PROFILE_URL).status_code == 401
+
+
+def test_logout_deletes_the_server_side_session(app, professor):
+    client = app.test_client()
+    sid = log_in(client, professor[1])
+
+    client.get('/logout')
+
+    assert learnsync.session_key(sid) not in stored_sessions(app)
+    replay = app.test_client()
+    replay.set_cookie(learnsync.app.config['SESSION_COOKIE_NAME'], sid)
+    assert replay.get(PROFILE_URL).status_code == 401
+
+
+def test_expired_sessions_are_refused(app, professor):
+    client = app.test_client()
+    sid = log_in(client, professor[1])
+    with app.app_context():
+        record = learnsync.db.session.get(learnsync.UserSession, learnsync.session_key(sid))
+        record.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        learnsync.db.session.commit()
+
+    assert client.get(PROFILE_URL).status_code == 401
+
+
+def test_requests_that_skip_the_session_write_nothing(app, professor):
+    client = app.test_client()
+    log_in(client, professor[1])
+    before = {key: row.expires_at for key, row in stored_sessions(app).items()}
+
+    response = client.get('/login.css')
+
+    assert 'Set-Cookie' not in response.headers
+    assert {key: row.expires_at for key, row in stored_sessions(app).items()} == before
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import pytest
+
+import app as learnsync
+
+
+@pytest.fixture
+def course(factory):
+    professor_id = factory.professor()
+    student_id, outsider_id = factory.student(), factory.student()
+    class_id = factory.classroom(professor_id, [student_id])
+    return {
+        'student': student_id,
+        'outsider': outsider_id,
+        'class': class_id,
+        'assignment': factory.assignment(class_id),
+    }
+
+
+def form_submit(client, assignment_id, **data):
+    return client.post(f'/api/student/assignments/{assignment_id}/submit', data=data,
+                       content_type='multipart/form-data')
+
+
+def test_form_submit_saves_the_submission_file_and_gradebook(app, login, course):
+    response = form_submit(login('student', course['student']), course['assignment'],
+                           text='My answer', file=(BytesIO(b'%PDF-1.4 answer'), 'answer.pdf'))
+    assert response.status_code == 200
+
+    with app.app_context():
+        submission = learnsync.Submission.query.one()
+        assert (submission.student_id, submission.content) == (course['student'], 'My answer')
+        assert [(a.name, a.mime_type) for a in submission.attachments] == [('answer.pdf', 'application/pdf')]
+        row = learnsync.db.session.get(learnsync.GradebookStudent, (course['class'], course['student']))
+        assert row.submitted_count == 1
+
+
+def test_form_submit_resubmits_in_place(app, login, course):
+    client = login('student', course['student'])
+    assert form_submit(client, course['assignment'], text='First').status_code == 200
+    assert form_submit(client, course['assignment'], text='Second').status_code == 200
+
+    with app.app_context():
+        assert [s.content for s in learnsync.Submission.query.all()] == ['Second']
+
+
+def test_form_submit_refuses_outsiders(login, course):
+    assert form_submit(login('student', course['outsider']), course['assignment'], text='x').status_code == 403
+
+
+def test_form_submit_refuses_archived_classes(app, login, course):
+    with app.app_context():
+        learnsync.db.session.get(learnsync.Class, course['class']).archived = True
+        learnsync.db.session.commit()
+    assert form_submit(login('student', course['student']), course['assignment'], text='x').status_code == 400
+
+
+@pytest.mark.parametrize('route', ['form', 'json'])
+def test_submit_refuses_closed_assignments(app, login, factory, course, route):
+    assignment_id = factory.assignment(course['class'], due_date=datetime.utcnow() - timedelta(hours=1))
+    client = login('student', course['student'])
+    if route == 'form':
+        response = form_submit(client, assignment_id, text='late')
+    else:
+        response = client.post('/api/student/submit_assignment', json={'assignment_id': assignment_id, 'content': 'late'})
+    assert response.status_code == 400
+
+    with app.app_context():
+        assert learnsync.Submission.query.count() == 0
@@ -0,0 +1,131 @@
+import hashlib
+import os
+from io import BytesIO
+
+import pytest
+
+import app as learnsync
+
+CONTENT = b'0123456789' * 10
+
+
+@pytest.fixture
+def client(login, factory):
+    return login('student', factory.student())
+
+
+def start(client, size=len(CONTENT)):
+    response = client.post('/api/uploads', json={'filename': 'notes.pdf', 'size': size})
+    assert response.status_code == 201
+    return response.get_json()['upload_id']
+
+
+def put(client, upload_id, offset, data, **kwargs):
+    return client.put(f'/api/uploads/{upload_id}', query_string={'offset': offset}, data=data, **kwargs)
+
+
+def partial_file(upload_id):
+    with open(learnsync.partial_upload_path(upload_id), 'rb') as f:
+        return f.read()
+
+
+def test_init_reports_an_empty_session(client):
+    response = client.post('/api/uploads', json={'filename': 'notes.pdf', 'size': len(CONTENT)})
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['offset'], body['size']) == (0, len(CONTENT))
+    assert client.get(f"/api/uploads/{body['upload_id']}").get_json()['offset'] == 0
+
+
+@pytest.mark.parametrize('filename, size', [('notes.exe', 10), ('notes.pdf', -1), ('', 10),
+                                            ('notes.pdf', learnsync.MAX_FILE_SIZE + 1)])
+def test_init_refuses_bad_files(client, filename, size):
+    assert client.post('/api/uploads', json={'filename': filename, 'size': size}).status_code == 400
+
+
+def test_chunks_resume_and_finalize_into_a_blob(client):
+    upload_id = start(client)
+    assert put(client, upload_id, 0, CONTENT[:40]).get_json()['offset'] == 40
+    # A retried chunk overwrites from its offset
+    assert put(client, upload_id, 40, CONTENT[40:70]).status_code == 200
+    assert put(client, upload_id, 70, CONTENT[70:]).get_json()['offset'] == len(CONTENT)
+
+    response = client.post(f'/api/uploads/{upload_id}/finalize')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['file_id'] == hashlib.sha256(CONTENT).hexdigest()
+    assert (body['filename'], body['size']) == ('notes.pdf', len(CONTENT))
+    assert client.get(f'/api/uploads/{upload_id}').status_code == 404
+
+
+def test_finalize_refuses_an_incomplete_upload(client):
+    upload_id = start(client)
+    put(client, upload_id, 0, CONTENT[:40])
+
+    response = client.post(f'/api/uploads/{upload_id}/finalize')
+
+    assert response.status_code == 409
+    assert response.get_json()['offset'] == 40
+
+
+@pytest.mark.parametrize('offset', [0, 60, None])
+def test_out_of_order_chunks_are_refused_with_the_resume_offset(client, offset):
+    upload_id = start(client)
+    put(client, upload_id, 0, CONTENT[:40])
+
+    response = put(client, upload_id, offset, CONTENT[40:60])
+
+    assert response.status_code == 409
+    assert response.get_json()['offset'] == 40
+    assert partial_file(upload_id) == CONTENT[:40]
+
+
+def test_a_chunk_past_the_declared_size_is_refused(client):
+    upload_id = start(client)
+    put(client, upload_id, 0, CONTENT[:40])
+
+    response = put(client, upload_id, 40, CONTENT[40:] + b'extra')
+
+    assert response.status_code == 400
+    assert client.get(f'/api/uploads/{upload_id}').get_json()['offset'] == 40
+    assert partial_file(upload_id) == CONTENT[:40]
+
+
+def test_only_one_of_two_racing_chunks_is_written(client):
+    """Both requests pass the offset check; the loser's claim matches no row"""
+    upload_id = start(client)
+
+    class RacingStream(BytesIO):
+        """Sends a competing chunk for the same offset while this request is being read"""
+        raced = None
+
+        def race(self):
+            if self.raced is None:
+                self.raced = put(client, upload_id, 0, CONTENT[:50])
+
+        def read(self, size=-1):
+            self.race()
+            return super().read(size)
+
+        def readinto(self, buffer):
+            self.race()
+            return super().readinto(buffer)
+
+    stream = RacingStream(b'x' * 30)
+    response = put(client, upload_id, 0, None, input_stream=stream, content_length=30)
+
+    assert stream.raced.status_code == 200
+    assert response.status_code == 409
+    assert response.get_json()['offset'] == 50
+    assert partial_file(upload_id) == CONTENT[:50]
+    assert [name for name in os.listdir(learnsync.PARTIAL_UPLOAD_FOLDER) if name.startswith(upload_id)] == [upload_id]
+
+
+def test_uploads_belong_to_their_owner(client, login, factory):
+    upload_id = start(client)
+    other = login('student', factory.student())
+
+    assert other.get(f'/api/uploads/{upload_id}').status_code == 404
+    assert put(other, upload_id, 0, CONTENT).status_code == 404